@@ -0,0 +1,99 @@
+from posts.models import Post
+from posts.utils import POST_KEYS
+
+
+class FieldsError(ValueError):
+    """В параметре fields= запрошены неизвестные поля."""
+
+
+def media_url(name):
+    return Post.image.field.storage.url(name) if name else None
+
+
+class Resource:
+    """Описание выдачи модели в API: поле ответа — путь поля в ORM.
+
+    Строки выбираются одним queryset.values() только с нужными
+    столбцами, связанные автор и группа приходят тем же запросом через
+    JOIN, а ответ собирается из словарей без создания объектов модели.
+    """
+
+    def __init__(self, fields, keys=POST_KEYS, converters=None):
+        self.fields = fields
+        self.keys = tuple(keys)
+        self.converters = converters or {}
+
+    def parse_fields(self, value):
+        """Поля ответа из параметра fields=; без параметра — все."""
+        if not value:
+            return list(self.fields)
+        names = list(dict.fromkeys(
+            name.strip() for name in value.split(',') if name.strip()
+        ))
+        unknown = [name for name in names if name not in self.fields]
+        if unknown or not names:
+            raise FieldsError(
+                'Неизвестные поля: {}. Доступны: {}'.format(
+                    ', '.join(unknown) or '-', ', '.join(self.fields),
+                )
+            )
+        return names
+
+    def rows(self, queryset, names):
+        """queryset.values() со столбцами полей names и ключа сортировки."""
+        columns = [self.fields[name] for name in names]
+        columns += [
+            key.lstrip('-') for key in self.keys
+            if key.lstrip('-') not in columns
+        ]
+        return queryset.order_by(*self.keys).values(*columns)
+
+    def serialize(self, row, names):
+        result = {}
+        for name in names:
+            value = row[self.fields[name]]
+            converter = self.converters.get(name)
+            result[name] = value if converter is None else converter(value)
+        return result
+
+
+POSTS = Resource(
+    {
+        'id': 'id',
+        'text': 'text',
+        'pub_date': 'pub_date',
+        'updated_at': 'updated_at',
+        'author': 'author__username',
+        'group': 'group__slug',
+        'image': 'image',
+        'comments_count': 'comments_count',
+    },
+    converters={'image': media_url},
+)
+GROUPS = Resource(
+    {
+        'id': 'id',
+        'slug': 'slug',
+        'title': 'title',
+        'description': 'description',
+    },
+    keys=('slug', 'id'),
+)
+COMMENTS = Resource(
+    {
+        'id': 'id',
+        'post': 'post_id',
+        'author': 'author__username',
+        'text': 'text',
+        'created': 'created',
+    },
+    keys=('-created', '-id'),
+)
+FOLLOWS = Resource(
+    {
+        'id': 'id',
+        'user': 'user__username',
+        'author': 'author__username',
+    },
+    keys=('-id',),
+)
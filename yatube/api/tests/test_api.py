@@ -0,0 +1,161 @@
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post, User
+
+USERNAME = 'NoName'
+FOLLOWER_USERNAME = 'NoName2'
+GROUP_SLUG = 'test-slug'
+POSTS_URL = reverse('api:posts')
+GROUPS_URL = reverse('api:groups')
+GROUP_URL = reverse('api:group', args=[GROUP_SLUG])
+FOLLOWS_URL = reverse('api:follows')
+
+
+@override_settings(QUERY_BUDGET_STRICT=True)
+class ApiTest(TestCase):
+    """JSON API только для чтения."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.follower = User.objects.create_user(username=FOLLOWER_USERNAME)
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug=GROUP_SLUG,
+            description='Тестовое описание',
+        )
+        cls.posts = [
+            Post.objects.create(
+                author=cls.user,
+                group=cls.group if i % 2 else None,
+                text=f'Тестовый пост {i}',
+            )
+            for i in range(5)
+        ]
+        cls.comment = Comment.objects.create(
+            post=cls.posts[-1],
+            author=cls.follower,
+            text='Комментарий',
+        )
+        Follow.objects.create(user=cls.follower, author=cls.user)
+        cls.POST_URL = reverse('api:post', args=[cls.posts[-1].pk])
+        cls.COMMENTS_URL = reverse('api:comments', args=[cls.posts[-1].pk])
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.follower_client = Client()
+        self.follower_client.force_login(self.follower)
+
+    def test_posts_pages(self):
+        """Посты отдаются по курсору, ссылка next ведёт дальше."""
+        data = self.guest_client.get(POSTS_URL, {'limit': 3}).json()
+        self.assertEqual(
+            [post['text'] for post in data['results']],
+            ['Тестовый пост 4', 'Тестовый пост 3', 'Тестовый пост 2'],
+        )
+        self.assertEqual(data['results'][1]['group'], GROUP_SLUG)
+        self.assertEqual(data['results'][0]['author'], USERNAME)
+        data = self.guest_client.get(data['next']).json()
+        self.assertEqual(
+            [post['text'] for post in data['results']],
+            ['Тестовый пост 1', 'Тестовый пост 0'],
+        )
+        self.assertIsNone(data['next'])
+
+    def test_sparse_fields(self):
+        """fields= оставляет в ответе только перечисленные поля."""
+        data = self.guest_client.get(
+            POSTS_URL,
+            {'fields': 'id,author', 'group': GROUP_SLUG},
+        ).json()
+        self.assertEqual(
+            data['results'],
+            [
+                {'id': self.posts[3].pk, 'author': USERNAME},
+                {'id': self.posts[1].pk, 'author': USERNAME},
+            ],
+        )
+        response = self.guest_client.get(POSTS_URL, {'fields': 'password'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('error', response.json())
+
+    def test_details(self):
+        """Пост, комментарии и группа; несуществующие дают 404 в JSON."""
+        self.assertEqual(
+            self.guest_client.get(self.POST_URL).json()['comments_count'],
+            1,
+        )
+        self.assertEqual(
+            self.guest_client.get(self.COMMENTS_URL).json()['results'],
+            [{
+                'id': self.comment.pk,
+                'post': self.posts[-1].pk,
+                'author': FOLLOWER_USERNAME,
+                'text': 'Комментарий',
+                'created': DjangoJSONEncoder().default(self.comment.created),
+            }],
+        )
+        self.assertEqual(
+            self.guest_client.get(GROUPS_URL).json()['results'][0]['slug'],
+            GROUP_SLUG,
+        )
+        self.assertEqual(
+            self.guest_client.get(GROUP_URL).json()['title'],
+            self.group.title,
+        )
+        for url in (
+            reverse('api:post', args=[0]),
+            reverse('api:comments', args=[0]),
+            reverse('api:group', args=['missing']),
+        ):
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertEqual(response.status_code, 404)
+                self.assertIn('error', response.json())
+
+    def test_follows(self):
+        """Подписки видны только их владельцу."""
+        self.assertEqual(self.guest_client.get(FOLLOWS_URL).status_code, 401)
+        data = self.follower_client.get(FOLLOWS_URL).json()
+        self.assertEqual(
+            [(row['user'], row['author']) for row in data['results']],
+            [(FOLLOWER_USERNAME, USERNAME)],
+        )
+
+    def test_read_only(self):
+        """Изменяющие запросы не принимаются."""
+        response = self.follower_client.post(POSTS_URL, {'text': 'Пост'})
+        self.assertEqual(response.status_code, 405)
+
+    @override_settings(ALLOWED_HOSTS=['testserver', 'api.example.com'])
+    def test_cache_per_host_and_scheme(self):
+        """Ссылка next из кэша ведёт на хост и схему запроса."""
+        for host, secure in (
+            ('testserver', False),
+            ('api.example.com', False),
+            ('api.example.com', True),
+        ):
+            with self.subTest(host=host, secure=secure):
+                data = self.guest_client.get(
+                    POSTS_URL,
+                    {'limit': 3},
+                    HTTP_HOST=host,
+                    secure=secure,
+                ).json()
+                scheme = 'https' if secure else 'http'
+                self.assertTrue(
+                    data['next'].startswith(f'{scheme}://{host}/'),
+                )
+
+    def test_cache_reset_on_change(self):
+        """Ответ берётся из кэша, пока данные не изменятся."""
+        self.guest_client.get(POSTS_URL)
+        with self.assertNumQueries(0):
+            self.guest_client.get(POSTS_URL)
+        Post.objects.create(author=self.user, text='Новый пост')
+        data = self.guest_client.get(POSTS_URL).json()
+        self.assertEqual(data['results'][0]['text'], 'Новый пост')
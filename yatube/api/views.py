@@ -0,0 +1,211 @@
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404, HttpResponse, JsonResponse
+from django.views.decorators.http import require_safe
+
+from posts import freshness
+from posts.models import Comment, Follow, Group, Post
+from posts.utils import CURSOR_PARAM, CursorPaginator
+
+from .resources import COMMENTS, FOLLOWS, GROUPS, POSTS, FieldsError
+
+LIMIT_PARAM = 'limit'
+FIELDS_PARAM = 'fields'
+CACHE_KEY = 'api:{name}:{url}:{stamps}'
+JSON_CONTENT_TYPE = 'application/json'
+
+
+class ApiError(Exception):
+    """Ошибка запроса к API с кодом ответа."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _error(message, status):
+    return JsonResponse(
+        {'error': str(message)},
+        status=status,
+        json_dumps_params={'ensure_ascii': False},
+    )
+
+
+def api_view(view):
+    """Только чтение; ошибки отдаются в JSON, а не HTML-страницей."""
+
+    @require_safe
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view(request, *args, **kwargs)
+        except ApiError as error:
+            return _error(error, error.status)
+        except FieldsError as error:
+            return _error(error, 400)
+        except Http404:
+            return _error('Не найдено', 404)
+
+    return wrapper
+
+
+def cached(name, resources):
+    """Кэширует ответ представления на API_CACHE_TIMEOUTS[name] секунд.
+
+    Ключ включает полный адрес со схемой, хостом и параметрами — в
+    ответе абсолютные ссылки next — и штампы свежести ресурсов,
+    которые вернула resources(request, **kwargs), поэтому изменение
+    данных сбрасывает ответ сразу, а время жизни только ограничивает
+    объём кэша.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, **kwargs):
+            keys = [
+                freshness.stamp_key(freshness.GROUPS),
+                freshness.stamp_key(freshness.USERS),
+                *resources(request, **kwargs),
+            ]
+            url = request.build_absolute_uri().encode()
+            key = CACHE_KEY.format(
+                name=name,
+                url=hashlib.md5(url).hexdigest(),
+                stamps='.'.join(
+                    repr(stamp) for stamp in freshness.stamps(keys)
+                ),
+            )
+            content = cache.get(key)
+            if content is not None:
+                return HttpResponse(content, content_type=JSON_CONTENT_TYPE)
+            response = view(request, **kwargs)
+            if response.status_code == 200:
+                cache.set(
+                    key,
+                    response.content,
+                    settings.API_CACHE_TIMEOUTS[name],
+                )
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def _json(data):
+    return JsonResponse(data, json_dumps_params={'ensure_ascii': False})
+
+
+def _limit(request):
+    value = request.GET.get(LIMIT_PARAM)
+    if value is None:
+        return settings.API_PAGE_SIZE
+    limit = settings.API_MAX_PAGE_SIZE
+    if not value.isdigit() or not 0 < int(value) <= limit:
+        raise ApiError(f'limit должен быть от 1 до {limit}')
+    return int(value)
+
+
+def _page(request, resource, queryset):
+    """Страница списка по курсору: {'results': [...], 'next': адрес}."""
+    names = resource.parse_fields(request.GET.get(FIELDS_PARAM))
+    paginator = CursorPaginator(
+        resource.rows(queryset, names),
+        _limit(request),
+        resource.keys,
+    )
+    page = paginator.page_from_cursor(request.GET.get(CURSOR_PARAM))
+    next_url = None
+    if paginator.next_cursor:
+        params = request.GET.copy()
+        params[CURSOR_PARAM] = paginator.next_cursor
+        next_url = request.build_absolute_uri(
+            f'{request.path}?{params.urlencode()}'
+        )
+    return _json({
+        'results': [resource.serialize(row, names) for row in page],
+        'next': next_url,
+    })
+
+
+def _detail(request, resource, queryset):
+    names = resource.parse_fields(request.GET.get(FIELDS_PARAM))
+    row = resource.rows(queryset, names).first()
+    if row is None:
+        raise Http404
+    return _json(resource.serialize(row, names))
+
+
+def _posts_resources(request):
+    keys = []
+    if request.GET.get('group'):
+        keys.append(
+            freshness.stamp_key(freshness.GROUP, request.GET['group'])
+        )
+    if request.GET.get('author'):
+        keys.append(
+            freshness.stamp_key(freshness.AUTHOR, request.GET['author'])
+        )
+    return keys or [freshness.stamp_key(freshness.SITE)]
+
+
+@api_view
+@cached('posts', _posts_resources)
+def posts(request):
+    """Посты, новые первыми; фильтры ?group=slug и ?author=username."""
+    queryset = Post.objects.all()
+    if request.GET.get('group'):
+        queryset = queryset.filter(group__slug=request.GET['group'])
+    if request.GET.get('author'):
+        queryset = queryset.filter(author__username=request.GET['author'])
+    return _page(request, POSTS, queryset)
+
+
+@api_view
+@cached(
+    'post',
+    lambda request, post_id: [freshness.stamp_key(freshness.POST, post_id)],
+)
+def post(request, post_id):
+    """Один пост."""
+    return _detail(request, POSTS, Post.objects.filter(pk=post_id))
+
+
+@api_view
+@cached(
+    'comments',
+    lambda request, post_id: [freshness.stamp_key(freshness.POST, post_id)],
+)
+def comments(request, post_id):
+    """Комментарии поста, новые первыми."""
+    if not Post.objects.filter(pk=post_id).exists():
+        raise Http404
+    return _page(request, COMMENTS, Comment.objects.filter(post_id=post_id))
+
+
+@api_view
+@cached('groups', lambda request: [])
+def groups(request):
+    """Группы по алфавиту slug."""
+    return _page(request, GROUPS, Group.objects.all())
+
+
+@api_view
+@cached('group', lambda request, slug: [])
+def group(request, slug):
+    """Одна группа."""
+    return _detail(request, GROUPS, Group.objects.filter(slug=slug))
+
+
+@api_view
+def follows(request):
+    """Подписки текущего пользователя; не кэшируются."""
+    if not request.user.is_authenticated:
+        raise ApiError('Требуется авторизация', status=401)
+    queryset = Follow.objects.filter(user=request.user)
+    if request.GET.get('author'):
+        queryset = queryset.filter(author__username=request.GET['author'])
+    return _page(request, FOLLOWS, queryset)
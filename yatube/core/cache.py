@@ -0,0 +1,288 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS cache ('
+    ' key TEXT PRIMARY KEY,'
+    ' value BLOB NOT NULL,'
+    ' expires REAL,'
+    ' stored REAL NOT NULL'
+    ') WITHOUT ROWID',
+    'CREATE INDEX IF NOT EXISTS cache_stored ON cache (stored)',
+    'CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires)',
+    'CREATE TABLE IF NOT EXISTS cache_stats ('
+    ' name TEXT PRIMARY KEY,'
+    ' value INTEGER NOT NULL'
+    ') WITHOUT ROWID',
+)
+ALIVE = '(expires IS NULL OR expires > ?)'
+MAX_VARIABLES = 500
+
+
+class SQLiteCache(BaseCache):
+    """Кэш в общем файле SQLite для всех процессов одного сервера.
+
+    В отличие от LocMemCache запись или удаление ключа сразу видны всем
+    воркерам. Целые числа хранятся как есть, поэтому incr атомарен;
+    остальные значения сериализуются pickle. При переполнении удаляются
+    сначала просроченные, затем самые старые записи; число вытеснений
+    сохраняется в файле и доступно через stats().
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        self._path = location
+        self._local = threading.local()
+        self._sets = 0
+        self._hits = 0
+        self._misses = 0
+        options = params.get('OPTIONS', {})
+        self._check_every = int(options.get('CULL_CHECK_EVERY', 100))
+        self._busy_timeout = float(options.get('BUSY_TIMEOUT', 5))
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None and self._local.pid == os.getpid():
+            return connection
+        directory = os.path.dirname(self._path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = sqlite3.connect(
+            self._path,
+            timeout=self._busy_timeout,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        for statement in SCHEMA:
+            connection.execute(statement)
+        self._local.connection = connection
+        self._local.pid = os.getpid()
+        return connection
+
+    @staticmethod
+    def _dump(value):
+        if type(value) is int:
+            return value
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def _load(value):
+        if isinstance(value, int):
+            return value
+        return pickle.loads(value)
+
+    def _key(self, key, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    def _count(self, hit):
+        if hit:
+            self._hits += 1
+        else:
+            self._misses += 1
+
+    def get(self, key, default=None, version=None):
+        key = self._key(key, version)
+        row = self._connection().execute(
+            f'SELECT value FROM cache WHERE key = ? AND {ALIVE}',
+            (key, time.time()),
+        ).fetchone()
+        self._count(row is not None)
+        if row is None:
+            return default
+        return self._load(row[0])
+
+    def get_many(self, keys, version=None):
+        keys = {self._key(key, version): key for key in keys}
+        names = list(keys)
+        found = {}
+        connection = self._connection()
+        now = time.time()
+        for start in range(0, len(names), MAX_VARIABLES):
+            chunk = names[start:start + MAX_VARIABLES]
+            rows = connection.execute(
+                'SELECT key, value FROM cache WHERE key IN ({}) AND {}'.format(
+                    ','.join('?' * len(chunk)),
+                    ALIVE,
+                ),
+                chunk + [now],
+            )
+            for name, value in rows:
+                found[keys[name]] = self._load(value)
+        self._hits += len(found)
+        self._misses += len(keys) - len(found)
+        return found
+
+    def _write(self, connection, items, timeout):
+        expires = self.get_backend_timeout(timeout)
+        now = time.time()
+        connection.executemany(
+            'REPLACE INTO cache (key, value, expires, stored) '
+            'VALUES (?, ?, ?, ?)',
+            [(key, self._dump(value), expires, now) for key, value in items],
+        )
+        self._sets += len(items)
+        if self._sets >= self._check_every:
+            self._sets = 0
+            self._cull(connection)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        self._write(self._connection(), [(key, value)], timeout)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        items = [
+            (self._key(key, version), value) for key, value in data.items()
+        ]
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            self._write(connection, items, timeout)
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+        return []
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            connection.execute(
+                'DELETE FROM cache WHERE key = ? AND NOT ' + ALIVE,
+                (key, time.time()),
+            )
+            added = connection.execute(
+                'INSERT OR IGNORE INTO cache (key, value, expires, stored) '
+                'VALUES (?, ?, ?, ?)',
+                (
+                    key,
+                    self._dump(value),
+                    self.get_backend_timeout(timeout),
+                    time.time(),
+                ),
+            ).rowcount == 1
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+        return added
+
+    def incr(self, key, delta=1, version=None):
+        name = self._key(key, version)
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            row = connection.execute(
+                f'SELECT value FROM cache WHERE key = ? AND {ALIVE}',
+                (name, time.time()),
+            ).fetchone()
+            if row is None:
+                raise ValueError("Key '%s' not found" % key)
+            value = self._load(row[0]) + delta
+            connection.execute(
+                'UPDATE cache SET value = ? WHERE key = ?',
+                (self._dump(value), name),
+            )
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+        return value
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        return self._connection().execute(
+            f'UPDATE cache SET expires = ? WHERE key = ? AND {ALIVE}',
+            (self.get_backend_timeout(timeout), key, time.time()),
+        ).rowcount == 1
+
+    def has_key(self, key, version=None):
+        key = self._key(key, version)
+        return self._connection().execute(
+            f'SELECT 1 FROM cache WHERE key = ? AND {ALIVE}',
+            (key, time.time()),
+        ).fetchone() is not None
+
+    def delete(self, key, version=None):
+        key = self._key(key, version)
+        self._connection().execute('DELETE FROM cache WHERE key = ?', (key,))
+
+    def delete_many(self, keys, version=None):
+        names = [self._key(key, version) for key in keys]
+        connection = self._connection()
+        for start in range(0, len(names), MAX_VARIABLES):
+            chunk = names[start:start + MAX_VARIABLES]
+            connection.execute(
+                'DELETE FROM cache WHERE key IN ({})'.format(
+                    ','.join('?' * len(chunk)),
+                ),
+                chunk,
+            )
+
+    def keys(self, prefix, version=None):
+        """Живые ключи, начинающиеся с prefix (для thumbnail clear)."""
+        start = self._key(prefix, version)
+        offset = len(self.make_key('', version=version))
+        rows = self._connection().execute(
+            f'SELECT key FROM cache WHERE key >= ? AND key < ? AND {ALIVE}',
+            (start, start + '\uffff', time.time()),
+        )
+        return [name[offset:] for name, in rows]
+
+    def clear(self):
+        self._connection().execute('DELETE FROM cache')
+
+    def _bump_stat(self, connection, name, delta):
+        if delta:
+            connection.execute(
+                'INSERT INTO cache_stats (name, value) VALUES (?, ?) '
+                'ON CONFLICT (name) DO UPDATE SET value = value + ?',
+                (name, delta, delta),
+            )
+
+    def _cull(self, connection):
+        """Удаляет просроченные и, при переполнении, самые старые записи."""
+        expired = connection.execute(
+            'DELETE FROM cache WHERE expires <= ?',
+            (time.time(),),
+        ).rowcount
+        self._bump_stat(connection, 'expired', expired)
+        entries = connection.execute('SELECT COUNT(*) FROM cache').fetchone()
+        if entries[0] <= self._max_entries:
+            return
+        evicted = connection.execute(
+            'DELETE FROM cache WHERE key IN ('
+            ' SELECT key FROM cache ORDER BY stored LIMIT ?'
+            ')',
+            (max(entries[0] // self._cull_frequency, 1),),
+        ).rowcount
+        self._bump_stat(connection, 'evicted', evicted)
+
+    def stats(self):
+        """Счётчики кэша: общие для всех процессов и текущего процесса."""
+        connection = self._connection()
+        stats = dict(connection.execute('SELECT name, value FROM cache_stats'))
+        return {
+            'entries': connection.execute(
+                'SELECT COUNT(*) FROM cache'
+            ).fetchone()[0],
+            'evicted': stats.get('evicted', 0),
+            'expired': stats.get('expired', 0),
+            'hits': self._hits,
+            'misses': self._misses,
+        }
+
+    def close(self, **kwargs):
+        # Соединение живёт всё время работы потока: открывать файл
+        # заново на каждый запрос дороже, чем держать его открытым.
+        pass
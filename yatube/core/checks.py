@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+
+from .media import X_ACCEL, X_SENDFILE
+
+
+@register()
+def rate_limit_client_ip(app_configs, **kwargs):
+    """За прокси адрес клиента для лимитов должен браться из заголовка."""
+    if (
+        settings.MEDIA_SERVE_MODE in (X_ACCEL, X_SENDFILE)
+        and not settings.RATE_LIMIT_IP_HEADER
+    ):
+        return [Warning(
+            'Сайт работает за прокси, но RATE_LIMIT_IP_HEADER не задан: '
+            'лимиты анонимных клиентов общие для всех.',
+            hint="Задайте RATE_LIMIT_IP_HEADER, например 'HTTP_X_REAL_IP'.",
+            id='core.W001',
+        )]
+    return []
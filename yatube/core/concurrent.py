@@ -0,0 +1,85 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import close_old_connections, connections
+
+from . import db_router, metrics
+
+_executor = None
+_workers = 0
+_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor, _workers
+    workers = settings.VIEW_LOOKUP_WORKERS
+    with _lock:
+        if _executor is None or _workers != workers:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            _executor = ThreadPoolExecutor(
+                max_workers=workers,
+                thread_name_prefix='lookup',
+            )
+            _workers = workers
+        return _executor
+
+
+def _call(function, measurement, pinned, written):
+    """Вызов в потоке пула с состоянием маршрутизатора вызвавшего потока.
+
+    Возвращает результат и признак записи в основную базу; после вызова
+    состояние потока сбрасывается, чтобы не достаться следующей задаче.
+    """
+    db_router.reset(written)
+    with ExitStack() as stack:
+        if measurement is not None:
+            stack.enter_context(metrics.attached(measurement))
+        if pinned:
+            stack.enter_context(db_router.use_primary())
+        try:
+            return function(), db_router.wrote()
+        finally:
+            db_router.reset()
+            close_old_connections()
+
+
+def gather(*functions):
+    """Выполняет независимые чтения одновременно, возвращает их результаты.
+
+    Первая функция выполняется в текущем потоке, остальные — в пуле из
+    VIEW_LOOKUP_WORKERS потоков со своими подключениями к БД, так что
+    задержки запросов складываются не последовательно, а по самому
+    долгому. Запросы потоков входят в замер текущего запроса, закрепление
+    за основной базой и отметка о записи переносятся в потоки, а запись
+    в потоке отмечается в текущем. При VIEW_LOOKUP_WORKERS = 0
+    и внутри транзакции, изменения которой другие подключения не видят,
+    функции выполняются по очереди.
+    """
+    if (
+        not settings.VIEW_LOOKUP_WORKERS
+        or len(functions) < 2
+        or any(connection.in_atomic_block for connection in connections.all())
+    ):
+        return [function() for function in functions]
+    executor = _get_executor()
+    measurement = metrics.current()
+    futures = [
+        executor.submit(
+            _call,
+            function,
+            measurement,
+            db_router.is_pinned(),
+            db_router.wrote(),
+        )
+        for function in functions[1:]
+    ]
+    results = [functions[0]()]
+    for future in futures:
+        result, written = future.result()
+        if written:
+            db_router.mark_written()
+        results.append(result)
+    return results
@@ -0,0 +1,40 @@
+import re
+
+from django.conf import settings
+from django.db import connections
+
+PRAGMA_NAME = re.compile(r'^[a-z_]+$')
+PRAGMA_VALUE = re.compile(r'^-?\w+$')
+
+
+def apply_pragmas(sender, connection, **kwargs):
+    """Выставляет PRAGMA из настроек базы новому соединению SQLite.
+
+    Обработчик сигнала connection_created. PRAGMA выполняются на
+    исходном соединении sqlite3 и не попадают в замеры запросов.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    for name, value in connection.settings_dict.get('PRAGMAS', {}).items():
+        if not (PRAGMA_NAME.match(name) and PRAGMA_VALUE.match(str(value))):
+            raise ValueError(f'Некорректная PRAGMA {name}={value}')
+        connection.connection.execute(f'PRAGMA {name}={value}')
+
+
+def use_profile(name):
+    """Переключает все базы на профиль settings.DB_PROFILES[name].
+
+    Открытые соединения текущего потока закрываются, чтобы следующие
+    соединения, в том числе в других потоках, открылись с настройками
+    профиля.
+    """
+    profile = settings.DB_PROFILES[name]
+    for alias in connections:
+        connections[alias].close()
+        database = connections.databases[alias]
+        database['CONN_MAX_AGE'] = profile['CONN_MAX_AGE']
+        database['OPTIONS'] = {
+            **database.get('OPTIONS', {}),
+            **profile['OPTIONS'],
+        }
+        database['PRAGMAS'] = dict(profile['PRAGMAS'])
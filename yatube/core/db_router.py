@@ -0,0 +1,85 @@
+import random
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PRIMARY = DEFAULT_DB_ALIAS
+
+_state = threading.local()
+
+
+def replicas():
+    """Псевдонимы реплик из settings.REPLICA_DATABASES."""
+    return settings.REPLICA_DATABASES
+
+
+def is_pinned():
+    return getattr(_state, 'pinned', 0) > 0
+
+
+def wrote():
+    """Была ли запись в основную базу с начала запроса."""
+    return getattr(_state, 'wrote', False)
+
+
+def reset(written=False):
+    """Начинает отсчёт записей заново: в новом запросе или потоке пула.
+
+    written переносит отметку о записи из потока, который передал
+    работу, чтобы чтения после неё тоже шли в основную базу.
+    """
+    _state.wrote = written
+
+
+def mark_written():
+    _state.wrote = True
+
+
+@contextmanager
+def use_primary():
+    """Направляет чтение внутри блока в основную базу."""
+    _state.pinned = getattr(_state, 'pinned', 0) + 1
+    try:
+        yield
+    finally:
+        _state.pinned -= 1
+
+
+class ReplicaRouter:
+    """Читает из реплик, пишет в основную базу.
+
+    Чтение остаётся в основной базе, если поток закреплён за ней
+    (use_primary), уже писал в неё с начала запроса или открыл
+    транзакцию: внутри неё нужно видеть собственные изменения. Запись
+    отмечается, чтобы ReplicaPinMiddleware закрепил за основной базой
+    и следующие запросы того же клиента.
+    """
+
+    def db_for_read(self, model, **hints):
+        aliases = replicas()
+        if (
+            not aliases
+            or is_pinned()
+            or wrote()
+            or connections[PRIMARY].in_atomic_block
+        ):
+            return PRIMARY
+        return random.choice(aliases)
+
+    def db_for_write(self, model, **hints):
+        mark_written()
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Все базы проекта — копии основной, связи между ними допустимы.
+        if {obj1._state.db, obj2._state.db} <= set(settings.DATABASES):
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Реплики получают схему и данные копированием основной базы.
+        if db in replicas():
+            return False
+        return None
@@ -0,0 +1,22 @@
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Показывает статистику общего кэша'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--alias',
+            default='default',
+            help='Имя кэша из settings.CACHES',
+        )
+
+    def handle(self, *args, **options):
+        cache = caches[options['alias']]
+        if not hasattr(cache, 'stats'):
+            raise CommandError(
+                f'Кэш {options["alias"]} не поддерживает статистику'
+            )
+        for name, value in cache.stats().items():
+            self.stdout.write(f'{name}: {value}')
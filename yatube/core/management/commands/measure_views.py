@@ -0,0 +1,59 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+from core.metrics import METRICS, registry
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Запрашивает страницы несколько раз и показывает перцентили '
+        'запросов к БД, времени БД, шаблонов и ответа'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', help='Адреса страниц')
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Сколько раз запросить каждую страницу',
+        )
+        parser.add_argument(
+            '--username',
+            help='Пользователь, от имени которого делаются запросы',
+        )
+
+    def handle(self, *args, **options):
+        client = Client()
+        if options['username']:
+            try:
+                client.force_login(
+                    User.objects.get(username=options['username'])
+                )
+            except User.DoesNotExist:
+                raise CommandError(
+                    f'Пользователь {options["username"]} не найден'
+                )
+        registry.reset()
+        for path in options['paths']:
+            for _ in range(options['repeat']):
+                response = client.get(path)
+                if response.status_code != 200:
+                    raise CommandError(
+                        f'{path}: код ответа {response.status_code}'
+                    )
+        for view_name, summary in registry.snapshot().items():
+            self.stdout.write(f'{view_name} (запросов: {summary["count"]})')
+            for name in METRICS:
+                self.stdout.write(
+                    '  {}: {}'.format(
+                        name,
+                        ', '.join(
+                            f'{key}={value}'
+                            for key, value in summary[name].items()
+                        ),
+                    )
+                )
@@ -0,0 +1,50 @@
+import sqlite3
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+SQLITE_ENGINE = 'django.db.backends.sqlite3'
+
+
+def copy_database(source, target):
+    """Копирует файл SQLite онлайн-бэкапом: источник можно не закрывать."""
+    source = sqlite3.connect(source)
+    target = sqlite3.connect(target)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу SQLite в файлы реплик: '
+        'заменяет репликацию при локальной проверке'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'aliases',
+            nargs='*',
+            help='Псевдонимы реплик из settings.DATABASES; '
+                 'по умолчанию все, кроме основной',
+        )
+
+    def handle(self, *args, **options):
+        aliases = options['aliases'] or [
+            alias for alias in connections if alias != DEFAULT_DB_ALIAS
+        ]
+        primary = connections[DEFAULT_DB_ALIAS].settings_dict
+        for alias in [DEFAULT_DB_ALIAS, *aliases]:
+            if alias not in connections:
+                raise CommandError(f'Нет базы {alias}')
+            if connections[alias].settings_dict['ENGINE'] != SQLITE_ENGINE:
+                raise CommandError(f'База {alias} не SQLite')
+        for alias in aliases:
+            connections[alias].close()
+            copy_database(
+                primary['NAME'],
+                connections[alias].settings_dict['NAME'],
+            )
+            self.stdout.write(f'{alias}: скопирована основная база')
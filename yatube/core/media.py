@@ -0,0 +1,161 @@
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+SENDFILE = 'sendfile'
+X_ACCEL = 'x-accel'
+X_SENDFILE = 'x-sendfile'
+# Имена по хэшу содержимого: файлы постов и миниатюры sorl не меняются.
+HASHED_NAME = re.compile(r'(^|/)[0-9a-f]{32,}\.\w+$')
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+
+
+class RangeFile:
+    """Открытый файл, читаемый только в пределах [start, start + length).
+
+    Сервер WSGI с wsgi.file_wrapper (gunicorn, uWSGI) отдаёт его через
+    os.sendfile с текущей позиции на Content-Length байт, а при обычной
+    итерации read() не выходит за границу диапазона.
+    """
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.remaining = length
+        file.seek(start)
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def tell(self):
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """(start, length) из заголовка Range с одним диапазоном.
+
+    None — заголовка нет или он не поддерживается, тогда отдаётся весь
+    файл; ValueError — диапазон за пределами файла (ответ 416).
+    """
+    match = RANGE.match(header or '')
+    if not match or not any(match.groups()):
+        return None
+    first, last = match.groups()
+    if not first:
+        length = min(int(last), size)
+        if not length:
+            raise ValueError(header)
+        return size - length, length
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        raise ValueError(header)
+    return start, end - start + 1
+
+
+def _etag(stat):
+    return quote_etag(f'{stat.st_size:x}-{stat.st_mtime_ns:x}')
+
+
+def _offload(mode, name, path):
+    response = HttpResponse()
+    if mode == X_ACCEL:
+        response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_PREFIX + name
+    else:
+        response['X-Sendfile'] = path
+    return response
+
+
+def _stream(request, path, stat):
+    etag = _etag(stat)
+    if_range = request.META.get('HTTP_IF_RANGE')
+    header = request.META.get('HTTP_RANGE')
+    if if_range and if_range not in (etag, http_date(stat.st_mtime)):
+        header = None
+    try:
+        part = parse_range(header, stat.st_size)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{stat.st_size}'
+        return response
+    file = open(path, 'rb')
+    if part is None:
+        response = FileResponse(file)
+    else:
+        start, length = part
+        response = FileResponse(RangeFile(file, start, length), status=206)
+        response['Content-Length'] = length
+        response['Content-Range'] = (
+            f'bytes {start}-{start + length - 1}/{stat.st_size}'
+        )
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+def serve(request, name):
+    """Ответ с файлом MEDIA_ROOT/name без копирования байтов в Python.
+
+    Режим MEDIA_SERVE_MODE: sendfile — FileResponse, который сервер
+    WSGI отдаёт через wsgi.file_wrapper (os.sendfile), с поддержкой
+    Range; x-accel и x-sendfile — пустой ответ с заголовком, по которому
+    файл отдаёт nginx или Apache. Условные запросы обрабатываются во
+    всех режимах, имена по хэшу кэшируются навсегда.
+    """
+    try:
+        path = safe_join(settings.MEDIA_ROOT, name)
+        stat = os.stat(path)
+    except (SuspiciousFileOperation, OSError, ValueError):
+        raise Http404(name)
+    if not os.path.isfile(path):
+        raise Http404(name)
+    etag = _etag(stat)
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=int(stat.st_mtime),
+    )
+    if response is None:
+        mode = settings.MEDIA_SERVE_MODE
+        if mode in (X_ACCEL, X_SENDFILE):
+            response = _offload(mode, name, path)
+        else:
+            response = _stream(request, path, stat)
+        content_type, encoding = mimetypes.guess_type(path)
+        if response.status_code != 416:
+            response['Content-Type'] = (
+                content_type if content_type and encoding is None
+                else 'application/octet-stream'
+            )
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    if HASHED_NAME.search(name):
+        patch_cache_control(
+            response,
+            public=True,
+            max_age=IMMUTABLE_MAX_AGE,
+            immutable=True,
+        )
+    else:
+        patch_cache_control(
+            response,
+            public=True,
+            max_age=settings.MEDIA_MAX_AGE,
+        )
+    return response
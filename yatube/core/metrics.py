@@ -0,0 +1,161 @@
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
+
+METRICS = ('queries', 'db_ms', 'template_ms', 'total_ms')
+PERCENTILES = (50, 95, 99)
+WINDOW = 1000
+
+_local = threading.local()
+
+
+class QueryBudgetExceeded(Exception):
+    """Страница выполнила больше запросов к БД, чем позволяет бюджет."""
+
+
+class Histogram:
+    """Скользящее окно последних замеров одной метрики."""
+
+    def __init__(self, size=WINDOW):
+        self.samples = deque(maxlen=size)
+
+    def add(self, value):
+        self.samples.append(value)
+
+    def percentile(self, percent, ordered=None):
+        ordered = ordered or sorted(self.samples)
+        if not ordered:
+            return 0
+        index = max(0, round(percent / 100 * len(ordered)) - 1)
+        return ordered[min(index, len(ordered) - 1)]
+
+    def summary(self):
+        ordered = sorted(self.samples)
+        summary = {
+            f'p{percent}': self.percentile(percent, ordered)
+            for percent in PERCENTILES
+        }
+        summary['max'] = ordered[-1] if ordered else 0
+        return summary
+
+
+class Registry:
+    """Замеры запросов по имени URL, хранящиеся в памяти процесса."""
+
+    def __init__(self, size=WINDOW):
+        self.size = size
+        self.lock = threading.Lock()
+        self.views = defaultdict(self._new_view)
+
+    def _new_view(self):
+        return {name: Histogram(self.size) for name in METRICS}
+
+    def record(self, view_name, **values):
+        with self.lock:
+            histograms = self.views[view_name]
+            for name in METRICS:
+                histograms[name].add(values[name])
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                view_name: dict(
+                    {
+                        name: histogram.summary()
+                        for name, histogram in histograms.items()
+                    },
+                    count=len(histograms['total_ms'].samples),
+                )
+                for view_name, histograms in sorted(self.views.items())
+            }
+
+    def reset(self):
+        with self.lock:
+            self.views.clear()
+
+
+registry = Registry()
+
+
+class Measurement:
+    """Замер одного запроса: SQL-запросы, время БД и шаблонов."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.template_depth = 0
+        self.started = time.perf_counter()
+        self.lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self.lock:
+                self.db_time += elapsed
+                self.queries += 1
+
+    def values(self):
+        return {
+            'queries': self.queries,
+            'db_ms': round(self.db_time * 1000, 3),
+            'template_ms': round(self.template_time * 1000, 3),
+            'total_ms': round(
+                (time.perf_counter() - self.started) * 1000,
+                3,
+            ),
+        }
+
+
+def current():
+    """Замер, идущий в текущем потоке, или None."""
+    return getattr(_local, 'measurement', None)
+
+
+@contextmanager
+def attached(measurement):
+    """Добавляет SQL-запросы текущего потока к замеру measurement.
+
+    Нужен потокам, которые выполняют часть работы чужого запроса.
+    """
+    previous = current()
+    _local.measurement = measurement
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(measurement))
+            yield measurement
+    finally:
+        _local.measurement = previous
+
+
+def measure():
+    """Считает SQL-запросы и время всех БД в текущем потоке."""
+    return attached(Measurement())
+
+
+@contextmanager
+def template_timer():
+    """Добавляет время отрисовки шаблона к текущему замеру.
+
+    Вложенные отрисовки (например, карточки внутри страницы) не
+    учитываются повторно.
+    """
+    measurement = getattr(_local, 'measurement', None)
+    if measurement is None:
+        yield
+        return
+    measurement.template_depth += 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        measurement.template_depth -= 1
+        if not measurement.template_depth:
+            measurement.template_time += time.perf_counter() - started
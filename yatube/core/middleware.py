@@ -0,0 +1,117 @@
+import logging
+
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+
+from . import db_router, ratelimit
+from .metrics import QueryBudgetExceeded, measure, registry
+
+logger = logging.getLogger(__name__)
+
+PIN_COOKIE = 'use_primary'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class RequestMetricsMiddleware:
+    """Замеряет запросы к БД, время шаблонов и общее время ответа.
+
+    Замеры копятся в памяти по имени URL. Если число запросов к БД
+    превышает бюджет из settings.QUERY_BUDGETS, пишется предупреждение,
+    а при QUERY_BUDGET_STRICT выбрасывается исключение.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with measure() as measurement:
+            response = self.get_response(request)
+        match = request.resolver_match
+        if match is None:
+            return response
+        values = measurement.values()
+        registry.record(match.view_name, **values)
+        self.check_budget(request, match.view_name, values['queries'])
+        return response
+
+    def check_budget(self, request, view_name, queries):
+        budget = settings.QUERY_BUDGETS.get(view_name)
+        if budget is None or queries <= budget:
+            return
+        message = (
+            f'{view_name} ({request.path}): {queries} запросов к БД '
+            f'при бюджете {budget}'
+        )
+        if settings.QUERY_BUDGET_STRICT:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+
+class ReplicaPinMiddleware:
+    """Читает из основной базы для клиента, который только что писал.
+
+    Небезопасные запросы (POST и другие) целиком идут в основную базу.
+    Если запрос что-то записал, клиенту ставится cookie на
+    REPLICA_PIN_SECONDS; пока она есть, его чтения тоже идут в основную
+    базу, и он сразу видит свой пост или комментарий, даже если реплика
+    отстаёт.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        db_router.reset()
+        pinned = (
+            request.method not in SAFE_METHODS
+            or PIN_COOKIE in request.COOKIES
+        )
+        with db_router.use_primary() if pinned else nullcontext():
+            response = self.get_response(request)
+        if db_router.wrote() and db_router.replicas():
+            response.set_cookie(
+                PIN_COOKIE,
+                '1',
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+
+class RateLimitMiddleware:
+    """Отвечает 429, если клиент превысил лимит из settings.RATE_LIMITS.
+
+    Лимиты задаются по имени URL и считаются в кэше отдельно для каждого
+    пользователя (анонимных — по адресу). Считаются только запросы,
+    меняющие данные, а для страниц из RATE_LIMIT_ANY_METHOD, которые
+    пишут и по GET, — все. Проверка идёт до представления и его
+    декораторов, а страница ошибки собирается без контекста запроса,
+    поэтому отклонённый запрос не обращается к БД.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_name = request.resolver_match.view_name
+        if (
+            request.method in SAFE_METHODS
+            and view_name not in settings.RATE_LIMIT_ANY_METHOD
+        ):
+            return None
+        retry_after = ratelimit.check(request, view_name)
+        if not retry_after:
+            return None
+        response = HttpResponse(
+            render_to_string('core/429.html', {'retry_after': retry_after}),
+            status=429,
+        )
+        response['Retry-After'] = retry_after
+        return response
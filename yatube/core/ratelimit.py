@@ -0,0 +1,104 @@
+import math
+import re
+import time
+
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+
+RATE = re.compile(r'^(\d+)/(\d*)([smhd])$')
+UNITS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 60 * 60 * 24}
+KEY = 'ratelimit:{scope}:{window}:{ident}:{index}'
+
+
+def parse_rate(rate):
+    """(число запросов, окно в секундах) из строки '10/m' или '5/10m'."""
+    match = RATE.match(rate)
+    if match is None:
+        raise ImproperlyConfigured(f'Неверный лимит запросов: {rate!r}')
+    count, multiplier, unit = match.groups()
+    return int(count), int(multiplier or 1) * UNITS[unit]
+
+
+def client_ip(request):
+    """Адрес клиента: из заголовка доверенного прокси или REMOTE_ADDR.
+
+    За прокси REMOTE_ADDR у всех запросов один, поэтому адрес берётся из
+    RATE_LIMIT_IP_HEADER, который прокси перезаписывает (X-Real-IP) или
+    дополняет (X-Forwarded-For: последний адрес добавлен прокси).
+    """
+    header = settings.RATE_LIMIT_IP_HEADER
+    if header and request.META.get(header):
+        return request.META[header].rsplit(',', 1)[-1].strip()
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def client_key(request):
+    """Кого ограничивать: пользователя по сессии, иначе адрес клиента.
+
+    Сессия читается, только если у клиента есть её cookie; при
+    SESSION_ENGINE cached_db это чтение из кэша, без запроса к БД.
+    """
+    if request.COOKIES.get(settings.SESSION_COOKIE_NAME):
+        user_id = request.session.get(SESSION_KEY)
+        if user_id is not None:
+            return f'user:{user_id}'
+    return 'ip:' + client_ip(request)
+
+
+def _retry_after(previous, current, limit, offset, window):
+    free = limit - current - 1
+    if free >= 0:
+        wait = window * (1 - free / previous) - offset if previous else 0
+        if wait < window - offset:
+            return max(1, math.ceil(wait))
+    wait = window - offset
+    if current:
+        wait += max(0, window * (1 - (limit - 1) / current))
+    return max(1, math.ceil(wait))
+
+
+def hit(scope, ident, limit, window, now=None):
+    """Засчитывает запрос в скользящем окне.
+
+    Окно приближается двумя счётчиками в кэше: за текущий и прошлый
+    интервал длиной window, прошлый берётся с весом оставшейся доли.
+    Возвращает 0, если запрос укладывается в limit, иначе через сколько
+    секунд можно повторить; отклонённые запросы не засчитываются.
+    """
+    now = time.time() if now is None else now
+    index, offset = divmod(now, window)
+    names = {
+        period: KEY.format(
+            scope=scope,
+            window=window,
+            ident=ident,
+            index=int(index) - period,
+        )
+        for period in (0, 1)
+    }
+    cache.add(names[0], 0, timeout=window * 2)
+    try:
+        current = cache.incr(names[0])
+    except ValueError:
+        cache.set(names[0], 1, timeout=window * 2)
+        current = 1
+    previous = cache.get(names[1], 0)
+    if previous * (1 - offset / window) + current <= limit:
+        return 0
+    cache.decr(names[0])
+    return _retry_after(previous, current - 1, limit, offset, window)
+
+
+def check(request, view_name):
+    """Через сколько секунд клиент может повторить запрос к view_name.
+
+    0 — запрос разрешён или для страницы нет лимита в
+    settings.RATE_LIMITS.
+    """
+    rate = settings.RATE_LIMITS.get(view_name)
+    if rate is None:
+        return 0
+    limit, window = parse_rate(rate)
+    return hit(view_name, client_key(request), limit, window)
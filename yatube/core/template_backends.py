@@ -0,0 +1,27 @@
+from django.template.backends.django import DjangoTemplates, Template
+
+from .metrics import template_timer
+
+
+class MeasuredTemplate(Template):
+    """Шаблон, время отрисовки которого попадает в замер запроса."""
+
+    def render(self, context=None, request=None):
+        with template_timer():
+            return super().render(context, request)
+
+
+class MeasuredDjangoTemplates(DjangoTemplates):
+    """Стандартный движок шаблонов Django с замером времени отрисовки."""
+
+    def from_string(self, template_code):
+        return MeasuredTemplate(
+            super().from_string(template_code).template,
+            self,
+        )
+
+    def get_template(self, template_name):
+        return MeasuredTemplate(
+            super().get_template(template_name).template,
+            self,
+        )
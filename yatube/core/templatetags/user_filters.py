@@ -6,3 +6,19 @@ register = template.Library()
 @register.filter
 def addclass(field, css):
     return field.as_widget(attrs={'class': css})
+
+
+@register.simple_tag(takes_context=True)
+def url_replace(context, **params):
+    """Строка запроса текущей страницы с заменёнными параметрами.
+
+    Параметр со значением None убирается, остальные GET-параметры
+    (например, поисковый запрос) сохраняются.
+    """
+    query = context['request'].GET.copy()
+    for name, value in params.items():
+        if value is None:
+            query.pop(name, None)
+        else:
+            query[name] = value
+    return query.urlencode()
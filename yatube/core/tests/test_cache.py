@@ -0,0 +1,83 @@
+import os
+import shutil
+import tempfile
+import time
+
+from django.test import SimpleTestCase
+
+from ..cache import SQLiteCache
+
+
+class SQLiteCacheTest(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.location = os.path.join(self.directory, 'cache.sqlite3')
+        self.cache = self.make_cache()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def make_cache(self, **options):
+        return SQLiteCache(self.location, {'OPTIONS': options})
+
+    def test_values_round_trip(self):
+        """Значения сохраняются и читаются без изменений."""
+        values = {
+            'int': 7,
+            'bool': True,
+            'text': 'строка',
+            'set': {1, 2},
+            'none': None,
+        }
+        self.cache.set_many(values)
+        self.assertEqual(self.cache.get_many(values), values)
+        self.assertIs(self.cache.get('bool'), True)
+        self.assertIsNone(self.cache.get('missing'))
+
+    def test_change_visible_to_other_process(self):
+        """Запись и удаление видны другому экземпляру с тем же файлом."""
+        other = self.make_cache()
+        self.cache.set('key', 'value')
+        self.assertEqual(other.get('key'), 'value')
+        other.delete('key')
+        self.assertIsNone(self.cache.get('key'))
+
+    def test_keys_by_prefix(self):
+        """keys возвращает живые ключи с заданным префиксом."""
+        self.cache.set_many({'thumb||a': 1, 'thumb||b': 2, 'other': 3})
+        self.cache.set('thumb||old', 4, timeout=-1)
+        self.assertEqual(sorted(self.cache.keys('thumb||')), [
+            'thumb||a',
+            'thumb||b',
+        ])
+
+    def test_incr_add_and_expiry(self):
+        """incr, add и истечение срока работают как у встроенных кэшей."""
+        with self.assertRaises(ValueError):
+            self.cache.incr('counter')
+        self.assertTrue(self.cache.add('counter', 1))
+        self.assertFalse(self.cache.add('counter', 5))
+        self.assertEqual(self.cache.incr('counter', 2), 3)
+        self.assertEqual(self.make_cache().get('counter'), 3)
+        self.cache.set('short', 'value', 0.01)
+        time.sleep(0.02)
+        self.assertFalse(self.cache.has_key('short'))
+        self.assertTrue(self.cache.add('short', 'new'))
+
+    def test_eviction_stats(self):
+        """Вытесненные и просроченные записи учитываются в статистике."""
+        cache = self.make_cache(
+            MAX_ENTRIES=10,
+            CULL_FREQUENCY=2,
+            CULL_CHECK_EVERY=1,
+        )
+        cache.set('expired', 'value', 0.01)
+        time.sleep(0.02)
+        cache.set_many({f'key{i}': i for i in range(20)})
+        stats = cache.stats()
+        self.assertEqual(stats['expired'], 1)
+        self.assertEqual(stats['evicted'], 10)
+        self.assertEqual(stats['entries'], 10)
+        self.assertIsNone(cache.get('key0'))
+        self.assertEqual(cache.get('key19'), 19)
+        self.assertEqual(self.make_cache().stats()['evicted'], 10)
@@ -0,0 +1,83 @@
+import threading
+
+from django.db import transaction
+from django.test import Client, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Follow, Post, User
+
+from .. import db_router
+from ..concurrent import gather
+from ..metrics import measure
+
+USERNAME = 'NoName'
+READER_USERNAME = 'Reader'
+PROFILE_URL = reverse('posts:profile', args=[USERNAME])
+
+
+def thread_id():
+    return threading.get_ident()
+
+
+@override_settings(VIEW_LOOKUP_WORKERS=2)
+class GatherTest(TransactionTestCase):
+    """Одновременное выполнение независимых чтений."""
+
+    def setUp(self):
+        self.author = User.objects.create_user(username=USERNAME)
+        self.reader = User.objects.create_user(username=READER_USERNAME)
+
+    def test_results_in_order_from_pool(self):
+        """Результаты идут по порядку, вызовы — в разных потоках."""
+        first, second = gather(thread_id, thread_id)
+        self.assertEqual(first, threading.get_ident())
+        self.assertNotEqual(second, first)
+        self.assertEqual(gather(lambda: 1, lambda: 2, lambda: 3), [1, 2, 3])
+
+    def test_worker_queries_measured(self):
+        """Запросы потоков пула входят в замер запроса."""
+        with measure() as measurement:
+            gather(
+                lambda: User.objects.count(),
+                lambda: Post.objects.count(),
+            )
+        self.assertEqual(measurement.queries, 2)
+
+    def test_worker_write_pins_request(self):
+        """Запись в потоке пула отмечается в запросе и не остаётся в пуле."""
+        db_router.reset()
+        gather(
+            lambda: None,
+            lambda: Post.objects.create(author=self.author, text='Пост'),
+        )
+        self.assertTrue(db_router.wrote())
+        db_router.reset()
+        self.assertEqual(
+            gather(db_router.wrote, db_router.wrote, db_router.wrote),
+            [False] * 3,
+        )
+        db_router.reset(written=True)
+        self.assertEqual(
+            gather(db_router.wrote, db_router.wrote, db_router.wrote),
+            [True] * 3,
+        )
+        db_router.reset()
+
+    def test_sequential_in_transaction(self):
+        """Внутри транзакции вызовы выполняются в текущем потоке."""
+        with transaction.atomic():
+            self.assertEqual(
+                gather(thread_id, thread_id),
+                [threading.get_ident()] * 2,
+            )
+
+    def test_profile_page(self):
+        """Страница профиля собирается из одновременных чтений."""
+        post = Post.objects.create(author=self.author, text='Пост')
+        Follow.objects.create(user=self.reader, author=self.author)
+        client = Client()
+        client.force_login(self.reader)
+        response = client.get(PROFILE_URL)
+        self.assertEqual(response.context['author'], self.author)
+        self.assertEqual(list(response.context['page_obj']), [post])
+        self.assertTrue(response.context['following'])
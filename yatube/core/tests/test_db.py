@@ -0,0 +1,65 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import SimpleTestCase
+
+from ..db import use_profile
+
+PRODUCTION = settings.DB_PROFILES['production']
+
+
+class DatabaseProfileTest(SimpleTestCase):
+    """PRAGMA профиля применяются к каждому новому соединению SQLite."""
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, 'db.sqlite3')
+
+    def connect(self, pragmas):
+        wrapper = DatabaseWrapper(
+            dict(
+                connections['default'].settings_dict,
+                NAME=self.path,
+                PRAGMAS=pragmas,
+            ),
+            alias='profile_test',
+        )
+        self.addCleanup(wrapper.close)
+        wrapper.ensure_connection()
+        return wrapper
+
+    def pragma(self, wrapper, name):
+        return wrapper.connection.execute(f'PRAGMA {name}').fetchone()[0]
+
+    def test_production_pragmas(self):
+        """Соединение в профиле production работает в режиме WAL."""
+        wrapper = self.connect(PRODUCTION['PRAGMAS'])
+        self.assertEqual(self.pragma(wrapper, 'journal_mode'), 'wal')
+        self.assertEqual(self.pragma(wrapper, 'synchronous'), 1)
+        self.assertEqual(
+            self.pragma(wrapper, 'cache_size'),
+            PRODUCTION['PRAGMAS']['cache_size'],
+        )
+
+    def test_invalid_pragma_rejected(self):
+        """Значение PRAGMA не подставляется в SQL без проверки."""
+        with self.assertRaises(ValueError):
+            self.connect({'journal_mode': 'WAL; DROP TABLE x'})
+
+    def test_use_profile(self):
+        """Переключение профиля меняет настройки всех баз."""
+        self.addCleanup(use_profile, settings.DB_PROFILE)
+        use_profile('production')
+        for alias in connections:
+            with self.subTest(alias=alias):
+                database = connections[alias].settings_dict
+                self.assertEqual(
+                    database['CONN_MAX_AGE'],
+                    PRODUCTION['CONN_MAX_AGE'],
+                )
+                self.assertEqual(database['PRAGMAS'], PRODUCTION['PRAGMAS'])
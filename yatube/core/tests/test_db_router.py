@@ -0,0 +1,109 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+
+from django.db import transaction
+from django.test import (Client, TestCase, TransactionTestCase,
+                         override_settings)
+from django.urls import reverse
+
+from posts.models import Group, Post, User
+
+from .. import db_router
+from ..management.commands.sync_replica import copy_database
+from ..middleware import PIN_COOKIE
+
+GROUP_SLUG = 'test-slug'
+GROUP_URL = reverse('posts:group_list', args=[GROUP_SLUG])
+CREATE_URL = reverse('posts:post_create')
+
+
+@override_settings(REPLICA_DATABASES=['replica'])
+class ReplicaRouterTest(TransactionTestCase):
+    """Чтение идёт из реплики, запись и чтение после записи — в основную.
+
+    Тестовые базы default и replica — разные базы SQLite, реплика
+    ничего не получает сама, поэтому по ответу видно, откуда читали.
+    TransactionTestCase нужен, чтобы тест не шёл внутри транзакции:
+    из неё роутер всегда читает основную базу.
+    """
+
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='NoName')
+        self.group = Group.objects.create(
+            title='Тестовая группа',
+            slug=GROUP_SLUG,
+            description='Тестовое описание',
+        )
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_routing(self):
+        """Чтение уходит в реплику, кроме закрепления и транзакций."""
+        router = db_router.ReplicaRouter()
+        db_router.reset()
+        self.assertEqual(router.db_for_read(Post), 'replica')
+        self.assertEqual(router.db_for_write(Post), 'default')
+        with db_router.use_primary():
+            self.assertEqual(router.db_for_read(Post), 'default')
+        with transaction.atomic():
+            self.assertEqual(router.db_for_read(Post), 'default')
+        router.db_for_write(Post)
+        self.assertEqual(router.db_for_read(Post), 'default')
+        self.assertIs(router.allow_migrate('replica', 'posts'), False)
+        self.assertIsNone(router.allow_migrate('default', 'posts'))
+
+    def test_guest_reads_replica(self):
+        """Гость читает из реплики, куда группа ещё не скопирована."""
+        self.assertEqual(self.guest_client.get(GROUP_URL).status_code, 404)
+        Group.objects.using('replica').create(
+            title='Тестовая группа',
+            slug=GROUP_SLUG,
+            description='Тестовое описание',
+        )
+        self.assertEqual(self.guest_client.get(GROUP_URL).status_code, 200)
+
+    def test_writer_reads_own_writes(self):
+        """После записи клиент читает из основной базы и видит свой пост."""
+        response = self.authorized_client.post(
+            CREATE_URL,
+            data={'text': 'Новый пост', 'group': self.group.pk},
+        )
+        self.assertIn(PIN_COOKIE, response.cookies)
+        post = Post.objects.using('default').get(text='Новый пост')
+        url = reverse('posts:posts_detail', args=[post.pk])
+        self.assertContains(self.authorized_client.get(url), 'Новый пост')
+        self.assertEqual(self.guest_client.get(url).status_code, 404)
+
+    @override_settings(REPLICA_DATABASES=[])
+    def test_no_pin_without_replicas(self):
+        """Без реплик cookie закрепления не ставится."""
+        response = self.authorized_client.post(
+            CREATE_URL,
+            data={'text': 'Новый пост'},
+        )
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+
+class SyncReplicaTest(TestCase):
+    """Копирование основной базы SQLite в реплику."""
+
+    def test_copy_database(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        primary = os.path.join(directory, 'primary.sqlite3')
+        replica = os.path.join(directory, 'replica.sqlite3')
+        connection = sqlite3.connect(primary)
+        connection.execute('CREATE TABLE note (text TEXT)')
+        connection.execute("INSERT INTO note VALUES ('запись')")
+        connection.commit()
+        connection.close()
+        copy_database(primary, replica)
+        connection = sqlite3.connect(replica)
+        rows = connection.execute('SELECT text FROM note').fetchall()
+        connection.close()
+        self.assertEqual(rows, [('запись',)])
@@ -0,0 +1,117 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.test import Client, SimpleTestCase, override_settings
+from django.urls import reverse
+
+from ..media import parse_range
+
+CONTENT = b'0123456789'
+HASHED_NAME = 'posts/ab/' + 'ab' * 32 + '.jpg'
+PLAIN_NAME = 'posts/plain.jpg'
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def media_url(name):
+    return reverse('core:media', args=[name])
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class MediaServingTest(SimpleTestCase):
+    """Отдача медиафайлов: диапазоны, условные запросы и кэширование."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        for name in (HASHED_NAME, PLAIN_NAME):
+            path = os.path.join(TEMP_MEDIA_ROOT, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as file:
+                file.write(CONTENT)
+        cls.client = Client()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def test_file_response(self):
+        """Файл отдаётся целиком; хэш в имени — кэш навсегда."""
+        response = self.client.get(media_url(HASHED_NAME))
+        self.assertEqual(b''.join(response.streaming_content), CONTENT)
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('immutable', response['Cache-Control'])
+        response = self.client.get(media_url(PLAIN_NAME))
+        self.assertNotIn('immutable', response['Cache-Control'])
+        response.close()
+
+    def test_range(self):
+        """Range отдаёт часть файла с кодом 206."""
+        response = self.client.get(
+            media_url(HASHED_NAME),
+            HTTP_RANGE='bytes=2-4',
+        )
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), b'234')
+        self.assertEqual(response['Content-Range'], 'bytes 2-4/10')
+        self.assertEqual(response['Content-Length'], '3')
+        response = self.client.get(
+            media_url(HASHED_NAME),
+            HTTP_RANGE='bytes=20-',
+        )
+        self.assertEqual(response.status_code, 416)
+
+    def test_conditional(self):
+        """Совпавший ETag даёт 304, устаревший If-Range — весь файл."""
+        etag = self.client.get(media_url(HASHED_NAME))['ETag']
+        response = self.client.get(
+            media_url(HASHED_NAME),
+            HTTP_IF_NONE_MATCH=etag,
+        )
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(
+            media_url(HASHED_NAME),
+            HTTP_RANGE='bytes=0-1',
+            HTTP_IF_RANGE='"old"',
+        )
+        self.assertEqual(response.status_code, 200)
+        response.close()
+
+    def test_offload_modes(self):
+        """В режимах x-accel и x-sendfile файл отдаёт фронтенд-сервер."""
+        with override_settings(MEDIA_SERVE_MODE='x-accel'):
+            response = self.client.get(media_url(HASHED_NAME))
+        self.assertEqual(
+            response['X-Accel-Redirect'],
+            settings.MEDIA_ACCEL_PREFIX + HASHED_NAME,
+        )
+        self.assertEqual(response.content, b'')
+        with override_settings(MEDIA_SERVE_MODE='x-sendfile'):
+            response = self.client.get(media_url(HASHED_NAME))
+        self.assertEqual(
+            response['X-Sendfile'],
+            os.path.join(TEMP_MEDIA_ROOT, HASHED_NAME),
+        )
+
+    def test_missing_and_outside(self):
+        """Отсутствующие файлы и пути вне MEDIA_ROOT дают 404."""
+        for name in ('posts/missing.jpg', '../settings.py', 'posts'):
+            with self.subTest(name=name):
+                self.assertEqual(
+                    self.client.get(media_url(name)).status_code,
+                    404,
+                )
+
+    def test_parse_range(self):
+        """Разбор заголовка Range."""
+        self.assertEqual(parse_range('bytes=0-', 10), (0, 10))
+        self.assertEqual(parse_range('bytes=-3', 10), (7, 3))
+        self.assertEqual(parse_range('bytes=5-100', 10), (5, 5))
+        self.assertIsNone(parse_range('bytes=0-1,3-4', 10))
+        self.assertIsNone(parse_range(None, 10))
+        with self.assertRaises(ValueError):
+            parse_range('bytes=10-', 10)
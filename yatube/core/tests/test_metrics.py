@@ -0,0 +1,66 @@
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import User
+
+from ..metrics import Histogram, QueryBudgetExceeded, registry
+
+INDEX_URL = reverse('posts:index')
+METRICS_URL = reverse('core:metrics')
+
+
+class MetricsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.guest_client = Client()
+        cls.user = User.objects.create_user(username='NoName')
+        cls.authorized_client = Client()
+        cls.authorized_client.force_login(cls.user)
+        cls.admin = User.objects.create_user(username='admin', is_staff=True)
+        cls.admin_client = Client()
+        cls.admin_client.force_login(cls.admin)
+
+    def setUp(self):
+        registry.reset()
+
+    def test_histogram_percentiles(self):
+        """Перцентили считаются по последним замерам окна."""
+        histogram = Histogram(size=100)
+        for value in range(1, 201):
+            histogram.add(value)
+        self.assertEqual(
+            histogram.summary(),
+            {'p50': 150, 'p95': 195, 'p99': 199, 'max': 200},
+        )
+
+    def test_requests_recorded_by_view_name(self):
+        """Запросы страниц записываются под именем URL."""
+        self.guest_client.get(INDEX_URL)
+        self.guest_client.get(INDEX_URL)
+        summary = registry.snapshot()['posts:index']
+        self.assertEqual(summary['count'], 2)
+        self.assertGreaterEqual(summary['queries']['max'], 1)
+        self.assertGreater(summary['template_ms']['max'], 0)
+        self.assertGreaterEqual(
+            summary['total_ms']['max'],
+            summary['template_ms']['max'],
+        )
+
+    def test_metrics_only_for_staff(self):
+        """Замеры доступны только администраторам."""
+        self.guest_client.get(INDEX_URL)
+        response = self.authorized_client.get(METRICS_URL)
+        self.assertEqual(response.status_code, 302)
+        response = self.admin_client.get(METRICS_URL)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('posts:index', response.json()['views'])
+
+    @override_settings(
+        QUERY_BUDGETS={'posts:index': 0},
+        QUERY_BUDGET_STRICT=True,
+    )
+    def test_budget_exceeded_raises_in_strict_mode(self):
+        """Превышение бюджета запросов приводит к ошибке."""
+        with self.assertRaises(QueryBudgetExceeded):
+            self.guest_client.get(INDEX_URL)
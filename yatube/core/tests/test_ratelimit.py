@@ -0,0 +1,114 @@
+from django.core.cache import cache
+from django.core.checks import run_checks
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post, User
+
+from .. import ratelimit
+
+CREATE_URL = reverse('posts:post_create')
+SIGNUP_URL = reverse('users:signup')
+FOLLOW_URL = reverse('posts:profile_follow', args=['Other'])
+
+
+class SlidingWindowTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_parse_rate(self):
+        """Лимит задаётся числом запросов на окно."""
+        self.assertEqual(ratelimit.parse_rate('10/m'), (10, 60))
+        self.assertEqual(ratelimit.parse_rate('5/10m'), (5, 600))
+        self.assertEqual(ratelimit.parse_rate('1/d'), (1, 86400))
+
+    def test_previous_window_weighted(self):
+        """Прошлый интервал учитывается с весом оставшейся доли."""
+        for now in (0, 10):
+            self.assertEqual(ratelimit.hit('scope', 'a', 2, 60, now=now), 0)
+        self.assertEqual(ratelimit.hit('scope', 'a', 2, 60, now=20), 70)
+        self.assertEqual(ratelimit.hit('scope', 'b', 2, 60, now=20), 0)
+        # Через полторы минуты от прошлого интервала остаётся 2 * 0.5.
+        self.assertEqual(ratelimit.hit('scope', 'a', 2, 60, now=90), 0)
+        self.assertEqual(ratelimit.hit('scope', 'a', 2, 60, now=90), 30)
+
+
+@override_settings(RATE_LIMITS={
+    'posts:post_create': '2/h',
+    'posts:profile_follow': '1/h',
+    'users:signup': '1/h',
+})
+class RateLimitMiddlewareTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='NoName')
+        cls.other = User.objects.create_user(username='Other')
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_limit_per_user(self):
+        """Сверх лимита пользователь получает 429 без запросов к БД."""
+        for text in ('Первый', 'Второй'):
+            response = self.authorized_client.post(
+                CREATE_URL,
+                {'text': text},
+            )
+            self.assertEqual(response.status_code, 302)
+        with self.assertNumQueries(0):
+            response = self.authorized_client.post(
+                CREATE_URL,
+                {'text': 'Третий'},
+            )
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response['Retry-After']), 0)
+        self.assertEqual(Post.objects.count(), 2)
+        other_client = Client()
+        other_client.force_login(self.other)
+        response = other_client.post(CREATE_URL, {'text': 'Другой'})
+        self.assertEqual(response.status_code, 302)
+
+    def test_only_writes_counted(self):
+        """GET формы не считается, GET подписки — считается."""
+        for _ in range(3):
+            response = self.authorized_client.get(CREATE_URL)
+            self.assertEqual(response.status_code, 200)
+        response = self.authorized_client.get(FOLLOW_URL)
+        self.assertEqual(response.status_code, 302)
+        response = self.authorized_client.get(FOLLOW_URL)
+        self.assertEqual(response.status_code, 429)
+
+    def test_anonymous_limited_by_address(self):
+        """Анонимные клиенты ограничиваются по адресу."""
+        response = Client(REMOTE_ADDR='10.0.0.1').post(SIGNUP_URL)
+        self.assertEqual(response.status_code, 200)
+        response = Client(REMOTE_ADDR='10.0.0.1').post(SIGNUP_URL)
+        self.assertEqual(response.status_code, 429)
+        response = Client(REMOTE_ADDR='10.0.0.2').post(SIGNUP_URL)
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(RATE_LIMIT_IP_HEADER='HTTP_X_FORWARDED_FOR')
+    def test_address_from_proxy_header(self):
+        """За прокси адрес берётся из заголовка, который он добавил."""
+        proxy = Client(REMOTE_ADDR='127.0.0.1')
+        response = proxy.post(
+            SIGNUP_URL,
+            HTTP_X_FORWARDED_FOR='1.1.1.1, 10.0.0.1',
+        )
+        self.assertEqual(response.status_code, 200)
+        response = proxy.post(SIGNUP_URL, HTTP_X_FORWARDED_FOR='10.0.0.2')
+        self.assertEqual(response.status_code, 200)
+        response = proxy.post(SIGNUP_URL, HTTP_X_FORWARDED_FOR='10.0.0.1')
+        self.assertEqual(response.status_code, 429)
+
+    @override_settings(MEDIA_SERVE_MODE='x-accel')
+    def test_proxy_without_address_header_warns(self):
+        """Без заголовка адреса за прокси выдаётся предупреждение."""
+        ids = [message.id for message in run_checks()]
+        self.assertIn('core.W001', ids)
+        with self.settings(RATE_LIMIT_IP_HEADER='HTTP_X_REAL_IP'):
+            ids = [message.id for message in run_checks()]
+        self.assertNotIn('core.W001', ids)
@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.urls import path
+
+from . import views
+
+app_name = 'core'
+
+urlpatterns = [
+    path('metrics/', views.metrics, name='metrics'),
+    path(
+        settings.MEDIA_URL.lstrip('/') + '<path:name>',
+        views.media,
+        name='media',
+    ),
+]
@@ -1,4 +1,11 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.cache import cache
+from django.http import JsonResponse
 from django.shortcuts import render
+from django.views.decorators.http import require_safe
+
+from . import media as media_files
+from .metrics import registry
 
 
 def page_not_found(request, exception):
@@ -19,3 +26,18 @@ def permission_denied(request, exception):
 def csrf_failure(request, reason=''):
     """Страница ошибки 403 - ограничение в доступе при проверке CSRF."""
     return render(request, 'core/403csrf.html')
+
+
+@staff_member_required
+def metrics(request):
+    """Замеры страниц и статистика кэша для администраторов."""
+    data = {'views': registry.snapshot()}
+    if hasattr(cache, 'stats'):
+        data['cache'] = cache.stats()
+    return JsonResponse(data, json_dumps_params={'ensure_ascii': False})
+
+
+@require_safe
+def media(request, name):
+    """Файл из MEDIA_ROOT: изображения постов и миниатюры."""
+    return media_files.serve(request, name)
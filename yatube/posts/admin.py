@@ -1,5 +1,6 @@
 from django.contrib import admin
 
+from . import search
 from .models import Comment, Follow, Group, Post
 
 
@@ -11,6 +12,17 @@ class PostAdmin(admin.ModelAdmin):
     list_filter = ('pub_date',)
     empty_value_display = '-пусто-'
 
+    def get_search_results(self, request, queryset, search_term):
+        """Поиск по текстам через поисковый индекс вместо LIKE."""
+        if not search_term.strip():
+            return queryset, False
+        terms = search.query_terms(search_term)
+        if not terms:
+            return queryset.none(), False
+        return queryset.filter(
+            pk__in=search.matching(terms),
+        ), False
+
 
 class GroupAdmin(admin.ModelAdmin):
     """Поля модели Group доступные в admin"""
@@ -0,0 +1,428 @@
+import random
+import threading
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.db import close_old_connections, connections, transaction
+from django.db.backends.signals import connection_created
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from core.db import use_profile
+from core.metrics import Histogram, registry
+
+from . import (counters, feed, freshness, recommendations, search,
+               transfer)
+from .models import Comment, Follow, Group, Post, User
+
+USERNAME = 'bench{0}'
+GROUP_SLUG = 'bench-{0}'
+BATCH_SIZE = 2000
+# Показатель степенного закона: чем больше, тем сильнее популярность
+# сосредоточена у первых авторов.
+SKEW = 1.1
+PERIOD = timedelta(days=365)
+VIEWS = (
+    'posts:index',
+    'posts:group_list',
+    'posts:profile',
+    'posts:posts_detail',
+    'posts:follow_index',
+)
+# Метрики, которые сравниваются с эталоном. Число запросов не должно
+# расти вовсе, время ответа может отклоняться в пределах допуска.
+CHECKED = (('queries', 'p95'), ('total_ms', 'p50'), ('total_ms', 'p95'))
+
+
+def _weights(count):
+    return [1 / (rank + 1) ** SKEW for rank in range(count)]
+
+
+def _batches(objects, size=BATCH_SIZE):
+    for start in range(0, len(objects), size):
+        yield objects[start:start + size]
+
+
+def _bulk_create(model, objects):
+    for batch in _batches(objects):
+        model.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+def _set_dates(model, field, pks, rng):
+    """Разносит даты по году: bulk_create ставит всем текущее время."""
+    now = timezone.now()
+    transfer.set_dates(
+        model,
+        field,
+        ((pk, now - rng.random() * PERIOD) for pk in pks),
+        batch_size=BATCH_SIZE,
+    )
+
+
+def seed(users, posts, groups, follows, comments, seed=0, stdout=None):
+    """Наполняет базу набором данных для замеров.
+
+    Авторство постов и подписки распределены по степенному закону:
+    немногие авторы пишут и собирают подписчиков больше остальных.
+    Уже созданные данные переиспользуются, поэтому повторный вызов
+    с теми же параметрами ничего не добавляет.
+    """
+    rng = random.Random(seed)
+    mixer = Mixer(commit=False, locale='ru_RU')
+
+    def log(message):
+        if stdout is not None:
+            stdout.write(message)
+
+    with transaction.atomic():
+        existing = User.objects.filter(username__startswith='bench').count()
+        if existing < users:
+            log(f'Пользователи: {users - existing}')
+            _bulk_create(User, [
+                mixer.blend(
+                    User,
+                    username=USERNAME.format(i),
+                    password='!',
+                )
+                for i in range(existing, users)
+            ])
+        author_ids = list(
+            User.objects.filter(username__startswith='bench')
+            .order_by('pk').values_list('pk', flat=True)[:users]
+        )
+        existing = Group.objects.filter(slug__startswith='bench-').count()
+        if existing < groups:
+            log(f'Группы: {groups - existing}')
+            _bulk_create(Group, [
+                mixer.blend(
+                    Group,
+                    slug=GROUP_SLUG.format(i),
+                    title=f'Группа {i}',
+                )
+                for i in range(existing, groups)
+            ])
+        group_ids = list(
+            Group.objects.filter(slug__startswith='bench-')
+            .values_list('pk', flat=True)[:groups]
+        )
+        weights = _weights(len(author_ids))
+        existing = Post.objects.filter(author_id__in=author_ids).count()
+        if existing < posts:
+            log(f'Посты: {posts - existing}')
+            authors = rng.choices(author_ids, weights, k=posts - existing)
+            _bulk_create(Post, [
+                Post(
+                    author_id=author_id,
+                    group_id=(
+                        rng.choice(group_ids)
+                        if group_ids and rng.random() < 0.7 else None
+                    ),
+                    text=mixer.faker.text(),
+                )
+                for author_id in authors
+            ])
+            _set_dates(
+                Post,
+                'pub_date',
+                Post.objects.filter(author_id__in=author_ids)
+                .order_by('pk').values_list('pk', flat=True)[existing:],
+                rng,
+            )
+        post_ids = list(
+            Post.objects.filter(author_id__in=author_ids)
+            .values_list('pk', flat=True)
+        )
+        existing = Comment.objects.filter(post_id__in=post_ids).count()
+        if existing < comments:
+            log(f'Комментарии: {comments - existing}')
+            _bulk_create(Comment, [
+                Comment(
+                    post_id=post_id,
+                    author_id=rng.choice(author_ids),
+                    text=mixer.faker.sentence(),
+                )
+                for post_id in rng.choices(
+                    post_ids,
+                    _weights(len(post_ids)),
+                    k=comments - existing,
+                )
+            ])
+        existing = Follow.objects.filter(user_id__in=author_ids).count()
+        if existing < follows:
+            log(f'Подписки: {follows - existing}')
+            pairs = set()
+            while len(pairs) < follows - existing:
+                user_id = rng.choice(author_ids)
+                author_id = rng.choices(author_ids, weights)[0]
+                if user_id != author_id:
+                    pairs.add((user_id, author_id))
+            _bulk_create(Follow, [
+                Follow(user_id=user_id, author_id=author_id)
+                for user_id, author_id in pairs
+            ])
+        # Данные созданы в обход сигналов: ленты, счётчики, поисковый
+        # индекс и рекомендации собираются заново, отметки свежести
+        # страниц сбрасываются.
+        feed.rebuild()
+        counters.reconcile()
+        search.rebuild()
+        recommendations.refresh(full=True)
+        freshness.touch_all()
+
+
+def _targets(rng, count):
+    """Адреса страниц для каждого представления."""
+    authors = list(
+        User.objects.filter(username__startswith='bench')
+        .values_list('username', flat=True)
+    )
+    weights = _weights(len(authors))
+    slugs = list(
+        Group.objects.filter(slug__startswith='bench-')
+        .values_list('slug', flat=True)
+    )
+    post_ids = list(
+        Post.objects.filter(author__username__startswith='bench')
+        .values_list('pk', flat=True)
+    )
+    return {
+        'posts:index': [reverse('posts:index')] * count,
+        'posts:group_list': [
+            reverse('posts:group_list', args=[rng.choice(slugs)])
+            for _ in range(count)
+        ],
+        'posts:profile': [
+            reverse('posts:profile', args=[username])
+            for username in rng.choices(authors, weights, k=count)
+        ],
+        'posts:posts_detail': [
+            reverse('posts:posts_detail', args=[rng.choice(post_ids)])
+            for _ in range(count)
+        ],
+        'posts:follow_index': [reverse('posts:follow_index')] * count,
+    }
+
+
+def run(requests, warmup=10, readers=20, seed=0):
+    """Запрашивает страницы и возвращает перцентили по представлениям."""
+    rng = random.Random(seed)
+    guest = Client()
+    followers = list(
+        Follow.objects.filter(user__username__startswith='bench')
+        .values_list('user_id', flat=True).distinct()[:readers]
+    )
+    clients = []
+    for user in User.objects.filter(pk__in=followers):
+        client = Client()
+        client.force_login(user)
+        clients.append(client)
+    targets = _targets(rng, warmup + requests)
+    results = {}
+    for view_name in VIEWS:
+        pool = clients if view_name == 'posts:follow_index' else [guest]
+        urls = targets[view_name]
+        for url in urls[:warmup]:
+            rng.choice(pool).get(url)
+        registry.reset()
+        started = time.perf_counter()
+        for url in urls[warmup:]:
+            response = rng.choice(pool).get(url)
+            if response.status_code != 200:
+                raise RuntimeError(f'{url}: код ответа {response.status_code}')
+        elapsed = time.perf_counter() - started
+        results[view_name] = registry.snapshot()[view_name]
+        results[view_name]['rps'] = round(requests / elapsed, 1)
+    return results
+
+
+def _worker(make_request, deadline, latencies, errors):
+    try:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                response = make_request()
+            except Exception:
+                errors.append(1)
+            else:
+                if response.status_code >= 400:
+                    errors.append(1)
+                else:
+                    latencies.append(
+                        (time.perf_counter() - started) * 1000
+                    )
+            # Как WSGI-сервер по окончании запроса: соединение с базой
+            # закрывается, если CONN_MAX_AGE не разрешает его держать.
+            close_old_connections()
+    finally:
+        connections.close_all()
+
+
+def _role_summary(latencies, errors, duration):
+    histogram = Histogram(size=len(latencies) or 1)
+    for value in latencies:
+        histogram.add(round(value, 2))
+    summary = histogram.summary()
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'rps': round(len(latencies) / duration, 1),
+        'p50_ms': summary['p50'],
+        'p95_ms': summary['p95'],
+    }
+
+
+def run_concurrent(profile, readers=8, writers=2, duration=10, seed=0):
+    """Пропускная способность чтения и записи при параллельных запросах.
+
+    Читатели в отдельных потоках открывают страницы постов, писатели
+    оставляют комментарии; перед замером базы переключаются на профиль
+    подключения profile из settings.DB_PROFILES.
+    """
+    rng = random.Random(seed)
+    use_profile(profile)
+    targets = _targets(rng, 100)
+    urls = [url for view_name in VIEWS[:4] for url in targets[view_name]]
+    post_ids = list(
+        Post.objects.filter(author__username__startswith='bench')
+        .values_list('pk', flat=True)[:1000]
+    )
+    authors = list(
+        User.objects.filter(username__startswith='bench')[:writers]
+    )
+    if not urls or not post_ids or len(authors) < writers:
+        raise RuntimeError('Нет данных для замера: запустите benchmark --seed')
+    workers = []
+    for number in range(readers):
+        client = Client()
+        pick = random.Random(seed + number).choice
+        workers.append((
+            'read',
+            lambda client=client, pick=pick: client.get(pick(urls)),
+        ))
+    for number, author in enumerate(authors):
+        client = Client()
+        client.force_login(author)
+        pick = random.Random(seed + readers + number).choice
+        workers.append((
+            'write',
+            lambda client=client, pick=pick: client.post(
+                reverse('posts:add_comment', args=[pick(post_ids)]),
+                {'text': 'Комментарий из замера'},
+            ),
+        ))
+    connections.close_all()
+    results = {'read': ([], []), 'write': ([], [])}
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(
+            target=_worker,
+            args=(make_request, deadline, *results[role]),
+        )
+        for role, make_request in workers
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {
+        role: _role_summary(latencies, errors, duration)
+        for role, (latencies, errors) in results.items()
+    }
+
+
+@contextmanager
+def simulated_latency(seconds):
+    """Добавляет задержку seconds к каждому SQL-запросу во всех потоках.
+
+    Обёртка ставится на подключения при их открытии, поэтому действует
+    и в потоках пула core.concurrent, и выключается при выходе из блока.
+    """
+    active = threading.Event()
+    active.set()
+
+    def delay(execute, sql, params, many, context):
+        if active.is_set():
+            time.sleep(seconds)
+        return execute(sql, params, many, context)
+
+    def install(sender, connection, **kwargs):
+        # В начало списка: connection.execute_wrapper() при выходе снимает
+        # последнюю обёртку, и задержка не должна оказаться на её месте.
+        if delay not in connection.execute_wrappers:
+            connection.execute_wrappers.insert(0, delay)
+
+    connections.close_all()
+    connection_created.connect(install)
+    try:
+        yield
+    finally:
+        active.clear()
+        connection_created.disconnect(install)
+        connections.close_all()
+
+
+def _timed(client, urls):
+    histogram = Histogram(size=len(urls) or 1)
+    for url in urls:
+        started = time.perf_counter()
+        response = client.get(url)
+        if response.status_code != 200:
+            raise RuntimeError(f'{url}: код ответа {response.status_code}')
+        histogram.add(round((time.perf_counter() - started) * 1000, 2))
+    return histogram.summary()
+
+
+def run_lookups(requests=30, latency_ms=5, workers=4, seed=0):
+    """Время ответа страниц при медленной базе: по очереди и в пуле.
+
+    Независимые чтения страниц выполняются либо последовательно, либо в
+    пуле core.concurrent из workers потоков; каждый SQL-запрос
+    задерживается на latency_ms. Перед замером все
+    адреса открываются один раз, чтобы оба режима работали с одинаково
+    прогретыми кэшами. Возвращает {представление: {режим: сводка}}.
+    """
+    rng = random.Random(seed)
+    reader = (
+        Follow.objects.filter(user__username__startswith='bench')
+        .values_list('user', flat=True).first()
+    )
+    if reader is None:
+        raise RuntimeError('Нет данных для замера: запустите benchmark --seed')
+    client = Client()
+    client.force_login(User.objects.get(pk=reader))
+    targets = _targets(rng, requests)
+    for urls in targets.values():
+        _timed(client, urls)
+    results = {view_name: {} for view_name in VIEWS}
+    with simulated_latency(latency_ms / 1000):
+        for mode, count in (('sequential', 0), ('concurrent', workers)):
+            with override_settings(VIEW_LOOKUP_WORKERS=count):
+                for view_name in VIEWS:
+                    results[view_name][mode] = _timed(
+                        client,
+                        targets[view_name],
+                    )
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Ухудшения относительно эталона: список строк с описанием."""
+    regressions = []
+    for view_name, summary in results.items():
+        expected = baseline.get(view_name)
+        if expected is None:
+            continue
+        for metric, percentile in CHECKED:
+            value = summary[metric][percentile]
+            limit = expected[metric][percentile]
+            if metric != 'queries':
+                limit *= 1 + tolerance
+            if value > limit:
+                regressions.append(
+                    f'{view_name} {metric} {percentile}: {value} '
+                    f'(эталон {expected[metric][percentile]})'
+                )
+    return regressions
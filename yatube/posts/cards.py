@@ -0,0 +1,79 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from .versions import cache_key
+
+CARD_TEMPLATE = 'posts/includes/post_card.html'
+CARD_KEY = 'post_card:{objects}:{stamp}:{author}'
+VERSION_KEY = 'card_version:{kind}:{pk}'
+AUTHOR = 'author'
+
+
+def version_key(kind, pk):
+    return VERSION_KEY.format(kind=kind, pk=pk)
+
+
+def _initial_version():
+    # Версия, потерянная кэшем, не должна совпасть ни с одной прежней.
+    return time.time_ns()
+
+
+def bump(kind, pk):
+    """Сбрасывает закэшированные карточки, зависящие от объекта."""
+    key = version_key(kind, pk)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _initial_version(), None)
+
+
+def versions(keys):
+    """Текущие версии объектов одним обращением к кэшу."""
+    found = cache.get_many(keys)
+    missing = {
+        key: _initial_version() for key in keys if key not in found
+    }
+    if missing:
+        cache.set_many(missing, None)
+        found.update(missing)
+    return found
+
+
+def render_cards(posts, **options):
+    """Список HTML-карточек постов, взятых из кэша одним запросом.
+
+    Карточка кэшируется по версиям поста и группы из их строк, дате
+    публикации, которую меняют и в обход save(), и версии автора в
+    кэше; сохранение любого из них сбрасывает карточку.
+    """
+    posts = list(posts)
+    variant = ','.join(
+        f'{name}={value}' for name, value in sorted(options.items())
+    )
+    current = versions(
+        {version_key(AUTHOR, post.author_id) for post in posts}
+    )
+    keys = [
+        CARD_KEY.format(
+            objects=cache_key(variant, post, post.group),
+            stamp=post.pub_date.timestamp(),
+            author=current[version_key(AUTHOR, post.author_id)],
+        )
+        for post in posts
+    ]
+    cards = cache.get_many(keys)
+    rendered = {}
+    for key, post in zip(keys, posts):
+        if key not in cards:
+            rendered[key] = render_to_string(
+                CARD_TEMPLATE,
+                dict(options, post=post),
+            )
+    if rendered:
+        cache.set_many(rendered, settings.POST_CARD_CACHE_TIMEOUT)
+        cards.update(rendered)
+    return [mark_safe(cards[key]) for key in keys]
@@ -0,0 +1,63 @@
+from django.db.models import Count, F
+
+from .models import AuthorStats, Comment, Post
+
+
+def change_posts_count(author_id, delta):
+    """Изменяет счётчик постов автора на delta."""
+    stats = AuthorStats.objects.filter(author_id=author_id)
+    if delta < 0:
+        stats = stats.filter(posts_count__gte=-delta)
+    if stats.update(posts_count=F('posts_count') + delta) or delta < 0:
+        return
+    AuthorStats.objects.get_or_create(
+        author_id=author_id,
+        defaults={
+            'posts_count': Post.objects.filter(author_id=author_id).count(),
+        },
+    )
+
+
+def change_comments_count(post_id, delta):
+    """Изменяет счётчик комментариев поста на delta."""
+    posts = Post.objects.filter(pk=post_id)
+    if delta < 0:
+        posts = posts.filter(comments_count__gte=-delta)
+    posts.update(comments_count=F('comments_count') + delta)
+
+
+def reconcile(batch_size=1000):
+    """Сверяет счётчики с таблицами и исправляет расхождения.
+
+    Возвращает количество исправленных счётчиков авторов и постов.
+    """
+    actual = dict(
+        Post.objects.order_by().values('author')
+        .annotate(total=Count('id')).values_list('author', 'total')
+    )
+    stored = dict(AuthorStats.objects.values_list('author', 'posts_count'))
+    stale = [
+        AuthorStats(author_id=author_id, posts_count=actual.get(author_id, 0))
+        for author_id, count in stored.items()
+        if actual.get(author_id, 0) != count
+    ]
+    AuthorStats.objects.bulk_update(stale, ['posts_count'], batch_size)
+    missing = [
+        AuthorStats(author_id=author_id, posts_count=count)
+        for author_id, count in actual.items()
+        if author_id not in stored
+    ]
+    # Размер пакета вставки выбирает сама СУБД: у SQLite он ограничен.
+    AuthorStats.objects.bulk_create(missing, ignore_conflicts=True)
+    comments = dict(
+        Comment.objects.order_by().values('post')
+        .annotate(total=Count('id')).values_list('post', 'total')
+    )
+    posts = Post.objects.order_by().values_list('pk', 'comments_count')
+    stale_posts = [
+        Post(pk=post_id, comments_count=comments.get(post_id, 0))
+        for post_id, count in posts.iterator()
+        if comments.get(post_id, 0) != count
+    ]
+    Post.objects.bulk_update(stale_posts, ['comments_count'], batch_size)
+    return len(stale) + len(missing), len(stale_posts)
@@ -0,0 +1,210 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count, Max, Q
+
+from . import graph
+from .models import FeedEntry, Follow, Post
+
+FEED_KEYS = ('-pub_date', '-post_id')
+LARGE_AUTHORS_KEY = 'feed:large_authors'
+
+
+def large_authors():
+    """Авторы, посты которых не раскладываются по лентам при записи."""
+    authors = cache.get(LARGE_AUTHORS_KEY)
+    if authors is None:
+        authors = set(
+            Follow.objects.values('author')
+            .annotate(followers=Count('id'))
+            .filter(followers__gt=settings.FEED_FANOUT_LIMIT)
+            .values_list('author', flat=True)
+        )
+        cache.set(LARGE_AUTHORS_KEY, authors, None)
+    return authors
+
+
+def _mark_large(author_id, is_large):
+    authors = large_authors()
+    if (author_id in authors) != is_large:
+        authors = set(authors)
+        if is_large:
+            authors.add(author_id)
+        else:
+            authors.discard(author_id)
+        cache.set(LARGE_AUTHORS_KEY, authors, None)
+
+
+def fan_out(post):
+    """Раскладывает новый пост по лентам подписчиков автора.
+
+    Для автора, у которого подписчиков больше FEED_FANOUT_LIMIT, запись
+    пропускается: его посты подтягиваются в ленту при чтении (pull).
+    """
+    limit = settings.FEED_FANOUT_LIMIT
+    followers = list(
+        Follow.objects.filter(author_id=post.author_id)
+        .values_list('user_id', flat=True)[:limit + 1]
+    )
+    is_large = len(followers) > limit
+    _mark_large(post.author_id, is_large)
+    if is_large:
+        return
+    FeedEntry.objects.bulk_create(
+        (
+            FeedEntry(
+                user_id=user_id,
+                post_id=post.pk,
+                author_id=post.author_id,
+                pub_date=post.pub_date,
+            )
+            for user_id in followers
+        ),
+        ignore_conflicts=True,
+    )
+
+
+def _insert(user_id, posts):
+    entries = [
+        FeedEntry(
+            user_id=user_id,
+            post_id=post_id,
+            author_id=author_id,
+            pub_date=pub_date,
+        )
+        for post_id, author_id, pub_date in posts
+    ]
+    if entries:
+        FeedEntry.objects.bulk_create(entries, ignore_conflicts=True)
+
+
+def backfill(user_id, author_id):
+    """Добавляет в ленту последние посты автора после подписки."""
+    _insert(
+        user_id,
+        Post.objects.filter(author_id=author_id)
+        .order_by('-pub_date', '-id')
+        .values_list('id', 'author_id', 'pub_date')
+        [:settings.FEED_BACKFILL_SIZE],
+    )
+
+
+def _exclude_large(large):
+    if not large:
+        return ''
+    return 'AND follow.author_id NOT IN ({})'.format(
+        ', '.join(str(int(author_id)) for author_id in large)
+    )
+
+
+def rebuild():
+    """Пересобирает все ленты по подпискам одним запросом.
+
+    Нужна после массовой загрузки подписок или постов в обход сигналов.
+    """
+    cache.delete(LARGE_AUTHORS_KEY)
+    exclude = _exclude_large(large_authors())
+    with transaction.atomic(), connection.cursor() as cursor:
+        FeedEntry.objects.all().delete()
+        cursor.execute(
+            f'''
+            INSERT INTO {FeedEntry._meta.db_table}
+                (user_id, post_id, author_id, pub_date)
+            SELECT follow.user_id, post.id, post.author_id, post.pub_date
+            FROM {Follow._meta.db_table} AS follow
+            JOIN (
+                SELECT id, author_id, pub_date, ROW_NUMBER() OVER (
+                    PARTITION BY author_id ORDER BY pub_date DESC, id DESC
+                ) AS position
+                FROM {Post._meta.db_table}
+            ) AS post ON post.author_id = follow.author_id
+            WHERE post.position <= %s {exclude}
+            ''',
+            [settings.FEED_BACKFILL_SIZE],
+        )
+
+
+def fan_out_since(post_id):
+    """Раскладывает по лентам посты с id больше post_id.
+
+    Массовый аналог fan_out для постов, созданных через bulk_create.
+    Как и при подписке, в ленту попадают не больше FEED_BACKFILL_SIZE
+    последних постов каждого автора. Посты, которые тем временем
+    опубликованы на сайте, уже разложены сигналом и пропускаются.
+    """
+    exclude = _exclude_large(large_authors())
+    insert = connection.ops.insert_statement(ignore_conflicts=True)
+    on_conflict = connection.ops.ignore_conflicts_suffix_sql(
+        ignore_conflicts=True,
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'''
+            {insert} {FeedEntry._meta.db_table}
+                (user_id, post_id, author_id, pub_date)
+            SELECT follow.user_id, post.id, post.author_id, post.pub_date
+            FROM (
+                SELECT id, author_id, pub_date, ROW_NUMBER() OVER (
+                    PARTITION BY author_id ORDER BY pub_date DESC, id DESC
+                ) AS position
+                FROM {Post._meta.db_table}
+                WHERE author_id IN (
+                    SELECT author_id FROM {Post._meta.db_table}
+                    WHERE id > %s
+                )
+            ) AS post
+            JOIN {Follow._meta.db_table} AS follow
+                ON follow.author_id = post.author_id
+            WHERE post.id > %s AND post.position <= %s {exclude}
+            {on_conflict}
+            ''',
+            [post_id, post_id, settings.FEED_BACKFILL_SIZE],
+        )
+
+
+def trim(user_id, author_id):
+    """Удаляет из ленты посты автора после отписки."""
+    FeedEntry.objects.filter(user_id=user_id, author_id=author_id).delete()
+
+
+def pull(user_id):
+    """Подтягивает в ленту новые посты крупных авторов (fan-out-on-read).
+
+    Граница новых постов берётся по каждому автору отдельно: общий
+    максимум пропустил бы пост одного автора, опубликованный раньше уже
+    подтянутого поста другого.
+    """
+    authors = large_authors()
+    if not authors:
+        return
+    followed = graph.following(user_id) & authors
+    if not followed:
+        return
+    latest = dict(
+        FeedEntry.objects.filter(user_id=user_id, author_id__in=followed)
+        .values('author_id')
+        .annotate(latest=Max('pub_date'))
+        .values_list('author_id', 'latest')
+    )
+    condition = Q()
+    for author_id in followed:
+        if author_id in latest:
+            condition |= Q(author_id=author_id, pub_date__gt=latest[author_id])
+        else:
+            condition |= Q(author_id=author_id)
+    _insert(
+        user_id,
+        Post.objects.filter(condition)
+        .order_by('-pub_date', '-id')
+        .values_list('id', 'author_id', 'pub_date')
+        [:settings.FEED_BACKFILL_SIZE],
+    )
+
+
+def timeline(user_id):
+    """Лента подписок пользователя: одно чтение по индексу (user, pub_date)."""
+    pull(user_id)
+    return FeedEntry.objects.filter(user_id=user_id).select_related(
+        'post__author',
+        'post__group',
+    )
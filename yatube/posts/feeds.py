@@ -0,0 +1,236 @@
+import io
+import json
+from collections import namedtuple
+
+from django.conf import settings
+from django.http import Http404, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.feedgenerator import (get_tag_uri, rfc2822_date,
+                                        rfc3339_date)
+from django.utils.text import Truncator
+from django.utils.timezone import now
+from django.utils.xmlutils import SimplerXMLGenerator
+from django.views.decorators.cache import cache_control
+
+from . import freshness
+from .utils import CURSOR_PARAM, CursorPaginator
+
+ATOM = 'atom'
+RSS = 'rss'
+JSON = 'json'
+ATOM_NS = 'http://www.w3.org/2005/Atom'
+JSON_FEED_VERSION = 'https://jsonfeed.org/version/1.1'
+TITLE_LENGTH = 60
+
+Feed = namedtuple('Feed', 'title link self_url next_url updated items')
+Item = namedtuple(
+    'Item',
+    'id url title text published updated author author_url group image',
+)
+
+
+class _Chunks(io.TextIOBase):
+    """Текстовый буфер: SimplerXMLGenerator пишет, генератор забирает."""
+
+    def __init__(self):
+        super().__init__()
+        self.parts = []
+
+    def write(self, text):
+        self.parts.append(text)
+        return len(text)
+
+    def take(self):
+        data = ''.join(self.parts)
+        self.parts = []
+        return data
+
+
+def _element(handler, name, text=None, attrs=None):
+    handler.addQuickElement(name, text, attrs or {})
+
+
+def atom(feed):
+    """Лента Atom по частям: заголовок, записи по одной, окончание."""
+    chunks = _Chunks()
+    handler = SimplerXMLGenerator(chunks, 'utf-8')
+    handler.startDocument()
+    handler.startElement('feed', {'xmlns': ATOM_NS, 'xml:lang': 'ru'})
+    _element(handler, 'title', feed.title)
+    _element(handler, 'id', feed.link)
+    _element(handler, 'link', attrs={'rel': 'alternate', 'href': feed.link})
+    _element(handler, 'link', attrs={'rel': 'self', 'href': feed.self_url})
+    if feed.next_url:
+        _element(
+            handler, 'link', attrs={'rel': 'next', 'href': feed.next_url},
+        )
+    _element(handler, 'updated', rfc3339_date(feed.updated))
+    yield chunks.take()
+    for item in feed.items:
+        handler.startElement('entry', {})
+        _element(handler, 'title', item.title)
+        _element(handler, 'id', item.id)
+        _element(handler, 'link', attrs={'href': item.url})
+        _element(handler, 'published', rfc3339_date(item.published))
+        _element(handler, 'updated', rfc3339_date(item.updated))
+        handler.startElement('author', {})
+        _element(handler, 'name', item.author)
+        _element(handler, 'uri', item.author_url)
+        handler.endElement('author')
+        if item.group:
+            _element(handler, 'category', attrs={'term': item.group})
+        if item.image:
+            _element(
+                handler,
+                'link',
+                attrs={'rel': 'enclosure', 'href': item.image},
+            )
+        _element(handler, 'content', item.text, {'type': 'text'})
+        handler.endElement('entry')
+        yield chunks.take()
+    handler.endElement('feed')
+    yield chunks.take()
+
+
+def rss(feed):
+    """Лента RSS 2.0 по частям."""
+    chunks = _Chunks()
+    handler = SimplerXMLGenerator(chunks, 'utf-8')
+    handler.startDocument()
+    handler.startElement('rss', {'version': '2.0', 'xmlns:atom': ATOM_NS})
+    handler.startElement('channel', {})
+    _element(handler, 'title', feed.title)
+    _element(handler, 'link', feed.link)
+    _element(handler, 'description', feed.title)
+    _element(handler, 'language', 'ru')
+    _element(handler, 'lastBuildDate', rfc2822_date(feed.updated))
+    _element(
+        handler, 'atom:link', attrs={'rel': 'self', 'href': feed.self_url},
+    )
+    if feed.next_url:
+        _element(
+            handler,
+            'atom:link',
+            attrs={'rel': 'next', 'href': feed.next_url},
+        )
+    yield chunks.take()
+    for item in feed.items:
+        handler.startElement('item', {})
+        _element(handler, 'title', item.title)
+        _element(handler, 'link', item.url)
+        _element(handler, 'guid', item.id, {'isPermaLink': 'false'})
+        _element(handler, 'pubDate', rfc2822_date(item.published))
+        if item.group:
+            _element(handler, 'category', item.group)
+        _element(handler, 'description', item.text)
+        handler.endElement('item')
+        yield chunks.take()
+    handler.endElement('channel')
+    handler.endElement('rss')
+    yield chunks.take()
+
+
+def json_feed(feed):
+    """Лента JSON Feed 1.1 по частям."""
+    head = {
+        'version': JSON_FEED_VERSION,
+        'title': feed.title,
+        'home_page_url': feed.link,
+        'feed_url': feed.self_url,
+        'language': 'ru',
+    }
+    if feed.next_url:
+        head['next_url'] = feed.next_url
+    yield json.dumps(head, ensure_ascii=False)[:-1] + ', "items": ['
+    for number, item in enumerate(feed.items):
+        entry = {
+            'id': item.id,
+            'url': item.url,
+            'title': item.title,
+            'content_text': item.text,
+            'date_published': item.published.isoformat(),
+            'date_modified': item.updated.isoformat(),
+            'authors': [{'name': item.author, 'url': item.author_url}],
+        }
+        if item.group:
+            entry['tags'] = [item.group]
+        if item.image:
+            entry['image'] = item.image
+        yield (', ' if number else '') + json.dumps(entry, ensure_ascii=False)
+    yield ']}'
+
+
+FORMATS = {
+    ATOM: ('application/atom+xml; charset=utf-8', atom),
+    RSS: ('application/rss+xml; charset=utf-8', rss),
+    JSON: ('application/feed+json; charset=utf-8', json_feed),
+}
+
+
+def _item(request, post):
+    url = request.build_absolute_uri(
+        reverse('posts:posts_detail', args=[post.pk])
+    )
+    return Item(
+        id=get_tag_uri(url, post.pub_date),
+        url=url,
+        title=Truncator(post.text).chars(TITLE_LENGTH),
+        text=post.text,
+        published=post.pub_date,
+        updated=post.updated_at,
+        author=post.author.get_full_name() or post.author.username,
+        author_url=request.build_absolute_uri(
+            reverse('posts:profile', args=[post.author.username])
+        ),
+        group=post.group.title if post.group else '',
+        image=(
+            request.build_absolute_uri(post.image.url) if post.image else ''
+        ),
+    )
+
+
+def stream(request, fmt, title, link, posts):
+    """Потоковый ответ с одной страницей ленты в формате fmt.
+
+    Страница выбирается по курсору одним запросом до начала ответа,
+    разметка строится генератором по записи. Изображения отдаются
+    ссылками на оригиналы, без создания миниатюр.
+    """
+    if fmt not in FORMATS:
+        raise Http404(f'Нет формата ленты {fmt}')
+    content_type, writer = FORMATS[fmt]
+    paginator = CursorPaginator(
+        posts.select_related('author', 'group'),
+        settings.FEED_PAGE_SIZE,
+    )
+    page = paginator.page_from_cursor(request.GET.get(CURSOR_PARAM))
+    next_url = None
+    if paginator.next_cursor:
+        next_url = request.build_absolute_uri(
+            f'{request.path}?{CURSOR_PARAM}={paginator.next_cursor}'
+        )
+    items = [_item(request, post) for post in page]
+    feed = Feed(
+        title=title,
+        link=request.build_absolute_uri(link),
+        self_url=request.build_absolute_uri(),
+        next_url=next_url,
+        updated=max((item.updated for item in items), default=now()),
+        items=items,
+    )
+    return StreamingHttpResponse(writer(feed), content_type=content_type)
+
+
+def feed_view(resources):
+    """Декоратор ленты: условный GET и кэширование общими кэшами.
+
+    Лента одинакова для всех, поэтому её могут хранить прокси и CDN,
+    но не дольше FEED_MAX_AGE секунд.
+    """
+
+    def decorator(view):
+        return cache_control(public=True, max_age=settings.FEED_MAX_AGE)(
+            freshness.validated(resources, per_user=False)(view)
+        )
+
+    return decorator
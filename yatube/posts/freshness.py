@@ -0,0 +1,116 @@
+import hashlib
+import time
+from datetime import datetime, timezone
+
+from django.core.cache import cache
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+
+STAMP_KEY = 'freshness:{kind}:{name}'
+SITE = 'site'
+GROUP = 'group'
+AUTHOR = 'author'
+POST = 'post'
+# Названия групп и имена авторов выводятся на всех страницах постов,
+# поэтому их изменения сбрасывают все страницы разом.
+GROUPS = 'groups'
+USERS = 'users'
+
+
+def stamp_key(kind, name=''):
+    return STAMP_KEY.format(kind=kind, name=name)
+
+
+def touch(*keys):
+    """Отмечает ресурсы изменёнными сейчас."""
+    now = time.time()
+    cache.set_many({key: now for key in keys}, None)
+
+
+def touch_all():
+    """Отмечает изменёнными все страницы, например после bulk_create."""
+    touch(stamp_key(GROUPS), stamp_key(USERS))
+
+
+def touch_post(post, previous_group=None):
+    """Отмечает изменёнными пост и все списки, где он выводится.
+
+    previous_group — slug группы, из которой пост перенесли при правке.
+    """
+    keys = [
+        stamp_key(SITE),
+        stamp_key(POST, post.pk),
+        stamp_key(AUTHOR, post.author.username),
+    ]
+    for slug in (post.group and post.group.slug, previous_group):
+        if slug:
+            keys.append(stamp_key(GROUP, slug))
+    touch(*keys)
+
+
+def stamps(keys):
+    """Время последнего изменения ресурсов одним обращением к кэшу.
+
+    Штамп, потерянный кэшем, считается только что изменённым: лишний
+    полный ответ безопаснее устаревшего 304.
+    """
+    found = cache.get_many(keys)
+    missing = [key for key in keys if key not in found]
+    if missing:
+        now = time.time()
+        cache.set_many({key: now for key in missing}, None)
+        found.update(dict.fromkeys(missing, now))
+    return [found[key] for key in keys]
+
+
+def validated(resources, per_user=True):
+    """Декоратор условного GET по штампам свежести.
+
+    resources(*args, **kwargs) получает аргументы представления и
+    возвращает ключи штампов, от которых зависит ответ, или None, если
+    ответа нет. ETag учитывает адрес с параметрами и, при per_user,
+    пользователя, поэтому ответ 304 не отдаёт чужую страницу; при
+    совпадении ETag представление не вызывается вовсе.
+    """
+
+    def page_stamps(request, *args, **kwargs):
+        if not hasattr(request, '_freshness_stamps'):
+            keys = resources(*args, **kwargs)
+            request._freshness_stamps = None if keys is None else stamps(
+                [stamp_key(GROUPS), stamp_key(USERS)] + list(keys)
+            )
+        return request._freshness_stamps
+
+    def etag(request, *args, **kwargs):
+        values = page_stamps(request, *args, **kwargs)
+        if values is None:
+            return None
+        parts = [request.get_full_path()]
+        if per_user:
+            parts.append(str(request.user.pk))
+        return hashlib.md5(
+            '|'.join(parts + [repr(value) for value in values]).encode()
+        ).hexdigest()
+
+    def last_modified(request, *args, **kwargs):
+        values = page_stamps(request, *args, **kwargs)
+        if values is None:
+            return None
+        return datetime.fromtimestamp(max(values), timezone.utc)
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
+
+
+def conditional(resources):
+    """Декоратор условного GET для страницы постов.
+
+    Страница зависит от пользователя, поэтому хранить её может только
+    браузер, и каждый раз с проверкой ETag.
+    """
+
+    def decorator(view):
+        return cache_control(private=True, no_cache=True)(
+            validated(resources)(view)
+        )
+
+    return decorator
@@ -0,0 +1,135 @@
+from django.core.cache import cache
+from django.db import transaction
+
+from . import feed, freshness, recommendations
+from .models import Follow, User
+
+FOLLOWING_KEY = 'follow_graph:following:{0}'
+FOLLOWERS_KEY = 'follow_graph:followers:{0}'
+FOLLOWING_COUNT_KEY = 'follow_graph:following_count:{0}'
+FOLLOWERS_COUNT_KEY = 'follow_graph:followers_count:{0}'
+
+
+def _ids(key, queryset):
+    ids = cache.get(key)
+    if ids is None:
+        ids = frozenset(queryset)
+        cache.set(key, ids, None)
+    return ids
+
+
+def following(user_id):
+    """Id авторов, на которых подписан пользователь."""
+    return _ids(
+        FOLLOWING_KEY.format(user_id),
+        Follow.objects.filter(user_id=user_id)
+        .values_list('author_id', flat=True),
+    )
+
+
+def followers(author_id):
+    """Id подписчиков автора."""
+    return _ids(
+        FOLLOWERS_KEY.format(author_id),
+        Follow.objects.filter(author_id=author_id)
+        .values_list('user_id', flat=True),
+    )
+
+
+def _count(key, queryset):
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, None)
+    return count
+
+
+def following_count(user_id):
+    """Число авторов, на которых подписан пользователь."""
+    return _count(
+        FOLLOWING_COUNT_KEY.format(user_id),
+        Follow.objects.filter(user_id=user_id),
+    )
+
+
+def followers_count(author_id):
+    """Число подписчиков автора; множество подписчиков не загружается."""
+    return _count(
+        FOLLOWERS_COUNT_KEY.format(author_id),
+        Follow.objects.filter(author_id=author_id),
+    )
+
+
+def is_following(user_id, author_id):
+    """Подписан ли пользователь на автора; без запроса к БД при кэше."""
+    return author_id in following(user_id)
+
+
+def invalidate(user_ids=(), author_ids=()):
+    """Сбрасывает закэшированные подписки, подписчиков и их число.
+
+    Сброс повторяется после фиксации транзакции: иначе параллельный
+    запрос мог бы успеть положить в кэш ещё не изменённые множества.
+    """
+    keys = [
+        key.format(user_id)
+        for user_id in user_ids
+        for key in (FOLLOWING_KEY, FOLLOWING_COUNT_KEY)
+    ]
+    keys += [
+        key.format(author_id)
+        for author_id in author_ids
+        for key in (FOLLOWERS_KEY, FOLLOWERS_COUNT_KEY)
+    ]
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def follow(user_id, author_ids):
+    """Подписывает пользователя на авторов одним INSERT.
+
+    Уже существующие подписки и подписка на себя пропускаются.
+    bulk_create не отправляет сигналы, поэтому ленты, рекомендации,
+    отметки свежести профилей и кэш графа обновляются здесь же.
+    Возвращает id авторов, на которых пользователь подписался.
+    """
+    new = set(author_ids) - following(user_id) - {user_id}
+    if not new:
+        return []
+    with transaction.atomic():
+        Follow.objects.bulk_create(
+            [
+                Follow(user_id=user_id, author_id=author_id)
+                for author_id in new
+            ],
+            ignore_conflicts=True,
+        )
+        for author_id in new:
+            feed.backfill(user_id, author_id)
+        recommendations.discard(user_id, new)
+        recommendations.mark_stale(user_id)
+        invalidate([user_id], new)
+    usernames = User.objects.filter(pk__in=new | {user_id}).values_list(
+        'username',
+        flat=True,
+    )
+    freshness.touch(*[
+        freshness.stamp_key(freshness.AUTHOR, username)
+        for username in usernames
+    ])
+    return sorted(new)
+
+
+def unfollow(user_id, author_ids):
+    """Отписывает пользователя от авторов. Возвращает число отписок.
+
+    Подписки удаляются через QuerySet.delete(), который отправляет
+    post_delete для каждой: ленты и отметки свежести обновляют сигналы.
+    """
+    with transaction.atomic():
+        deleted, _ = Follow.objects.filter(
+            user_id=user_id,
+            author_id__in=author_ids,
+        ).delete()
+        invalidate([user_id], author_ids)
+    return deleted
@@ -0,0 +1,83 @@
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from PIL import Image, ImageOps
+
+JPEG = ('JPEG', '.jpg')
+PNG = ('PNG', '.png')
+# Размер блока, которым обработанное изображение пишется во временный
+# файл до сохранения в хранилище.
+SPOOL_SIZE = 1024 * 1024
+
+
+def _path_or_file(upload):
+    if hasattr(upload, 'temporary_file_path'):
+        return upload.temporary_file_path()
+    upload.seek(0)
+    return upload
+
+
+def _has_alpha(image):
+    return image.mode in ('RGBA', 'LA', 'PA') or (
+        image.mode == 'P' and 'transparency' in image.info
+    )
+
+
+def _validate(image, upload):
+    if upload.size > settings.IMAGE_MAX_UPLOAD_SIZE:
+        raise ValidationError(
+            'Файл больше %(size)d МБ',
+            code='file_too_large',
+            params={'size': settings.IMAGE_MAX_UPLOAD_SIZE // 1024 ** 2},
+        )
+    width, height = image.size
+    if width * height > settings.IMAGE_MAX_PIXELS:
+        raise ValidationError(
+            'Изображение больше %(pixels)d мегапикселей',
+            code='image_too_large',
+            params={'pixels': settings.IMAGE_MAX_PIXELS // 10 ** 6},
+        )
+
+
+def _rename(upload, extension):
+    stem = os.path.splitext(os.path.basename(upload.name))[0]
+    return stem + extension
+
+
+def ingest(upload):
+    """Готовит загруженное изображение к хранению.
+
+    Поворачивает снимок по EXIF и не переносит метаданные, уменьшает
+    большую сторону до IMAGE_MAX_SIDE и пересжимает в JPEG (PNG для
+    изображений с прозрачностью). Большие JPEG декодируются сразу в
+    уменьшенном масштабе (draft), результат пишется во временный файл,
+    поэтому память не зависит от размера исходного файла. Анимации
+    сохраняются как есть. Возвращает File для ImageField.
+    """
+    image = Image.open(_path_or_file(upload))
+    _validate(image, upload)
+    if getattr(image, 'is_animated', False):
+        upload.seek(0)
+        return upload
+    side = settings.IMAGE_MAX_SIDE
+    image.draft('RGB', (side, side))
+    image = ImageOps.exif_transpose(image)
+    image.thumbnail((side, side), Image.LANCZOS)
+    if _has_alpha(image):
+        (fmt, extension), options = PNG, {'optimize': True}
+        image = image.convert('RGBA')
+    else:
+        (fmt, extension), options = JPEG, {
+            'quality': settings.IMAGE_JPEG_QUALITY,
+            'optimize': True,
+            'progressive': True,
+        }
+        image = image.convert('RGB')
+    image.info.clear()
+    output = tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE)
+    image.save(output, fmt, **options)
+    output.seek(0)
+    return File(output, name=_rename(upload, extension))
@@ -0,0 +1,100 @@
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.benchmark import CHECKED, compare, run, seed
+
+BASELINE = os.path.join(settings.BASE_DIR, 'benchmarks', 'baseline.json')
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет время ответа и число запросов к БД страниц постов '
+        'и сравнивает их с эталоном'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed',
+            action='store_true',
+            help='Наполнить базу тестовым набором данных перед замером',
+        )
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument('--posts', type=int, default=100000)
+        parser.add_argument('--groups', type=int, default=50)
+        parser.add_argument('--follows', type=int, default=100000)
+        parser.add_argument('--comments', type=int, default=50000)
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=200,
+            help='Число замеряемых запросов к каждому представлению',
+        )
+        parser.add_argument('--warmup', type=int, default=10)
+        parser.add_argument(
+            '--baseline',
+            default=BASELINE,
+            help='Файл с эталонными результатами',
+        )
+        parser.add_argument(
+            '--save-baseline',
+            action='store_true',
+            help='Сохранить результаты как новый эталон',
+        )
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=0.25,
+            help='Допустимый относительный рост времени ответа',
+        )
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Завершиться с ошибкой при ухудшении относительно эталона',
+        )
+
+    def handle(self, *args, **options):
+        if options['seed']:
+            seed(
+                users=options['users'],
+                posts=options['posts'],
+                groups=options['groups'],
+                follows=options['follows'],
+                comments=options['comments'],
+                stdout=self.stdout,
+            )
+        results = run(options['requests'], warmup=options['warmup'])
+        for view_name, summary in results.items():
+            self.stdout.write(
+                '{}: {} rps, {}'.format(
+                    view_name,
+                    summary['rps'],
+                    ', '.join(
+                        f'{metric} {percentile}={summary[metric][percentile]}'
+                        for metric, percentile in CHECKED
+                    ),
+                )
+            )
+        if options['save_baseline']:
+            os.makedirs(os.path.dirname(options['baseline']), exist_ok=True)
+            with open(options['baseline'], 'w', encoding='utf-8') as file:
+                json.dump(results, file, ensure_ascii=False, indent=2)
+            self.stdout.write(f'Эталон сохранён в {options["baseline"]}')
+            return
+        if not os.path.exists(options['baseline']):
+            self.stdout.write('Эталон не найден, сравнение пропущено')
+            return
+        with open(options['baseline'], encoding='utf-8') as file:
+            regressions = compare(
+                results,
+                json.load(file),
+                options['tolerance'],
+            )
+        for regression in regressions:
+            self.stdout.write(self.style.WARNING(regression))
+        if regressions and options['check']:
+            raise CommandError('Производительность ухудшилась')
+        if not regressions:
+            self.stdout.write(self.style.SUCCESS('Ухудшений нет'))
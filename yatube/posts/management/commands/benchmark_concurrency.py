@@ -0,0 +1,62 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.db import use_profile
+from posts.benchmark import run_concurrent
+
+ROW = '{profile:<12} {role:<6} {rps:>8} {p50_ms:>8} {p95_ms:>8} {errors:>7}'
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет пропускную способность чтения и записи при '
+        'параллельных запросах для профилей подключения к базе'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--profiles',
+            nargs='+',
+            default=list(settings.DB_PROFILES),
+            help='Профили из settings.DB_PROFILES',
+        )
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=10,
+            help='Длительность замера каждого профиля в секундах',
+        )
+        parser.add_argument('--random-seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        unknown = set(options['profiles']) - set(settings.DB_PROFILES)
+        if unknown:
+            raise CommandError(f'Нет профилей: {", ".join(sorted(unknown))}')
+        self.stdout.write(ROW.format(
+            profile='профиль',
+            role='роль',
+            rps='rps',
+            p50_ms='p50 мс',
+            p95_ms='p95 мс',
+            errors='ошибки',
+        ))
+        try:
+            for profile in options['profiles']:
+                try:
+                    results = run_concurrent(
+                        profile,
+                        readers=options['readers'],
+                        writers=options['writers'],
+                        duration=options['duration'],
+                        seed=options['random_seed'],
+                    )
+                except RuntimeError as error:
+                    raise CommandError(error)
+                for role, summary in results.items():
+                    self.stdout.write(
+                        ROW.format(profile=profile, role=role, **summary)
+                    )
+        finally:
+            use_profile(settings.DB_PROFILE)
@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.benchmark import run_lookups
+
+ROW = '{view:<20} {sequential:>10} {concurrent:>10} {speedup:>8}'
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает время ответа страниц при медленной базе с '
+        'последовательными и одновременными чтениями'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=30)
+        parser.add_argument(
+            '--latency-ms',
+            type=float,
+            default=5,
+            help='Задержка каждого SQL-запроса в миллисекундах',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Размер пула потоков для одновременных чтений',
+        )
+        parser.add_argument('--random-seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        try:
+            results = run_lookups(
+                requests=options['requests'],
+                latency_ms=options['latency_ms'],
+                workers=options['workers'],
+                seed=options['random_seed'],
+            )
+        except RuntimeError as error:
+            raise CommandError(error)
+        self.stdout.write(ROW.format(
+            view='p50, мс',
+            sequential='по очереди',
+            concurrent='в пуле',
+            speedup='ускор.',
+        ))
+        for view_name, modes in results.items():
+            sequential = modes['sequential']['p50']
+            concurrent = modes['concurrent']['p50']
+            self.stdout.write(ROW.format(
+                view=view_name,
+                sequential=sequential,
+                concurrent=concurrent,
+                speedup=f'{sequential / concurrent:.2f}x'
+                if concurrent else '-',
+            ))
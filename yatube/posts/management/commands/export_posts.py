@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.transfer import (BATCH_SIZE, FORMATS, detect_format, export_rows,
+                            write_rows)
+
+
+class Command(BaseCommand):
+    help = 'Выгружает посты в файл JSONL или CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            nargs='?',
+            help='Файл для выгрузки; без него посты пишутся в stdout',
+        )
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            help='Формат файла; по умолчанию по расширению, иначе jsonl',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Сколько постов читать из базы за раз',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or detect_format(path)
+        rows = export_rows(batch_size=options['batch_size'])
+        started = time.perf_counter()
+        if path is None:
+            written = write_rows(rows, self.stdout, fmt)
+        else:
+            with open(path, 'w', encoding='utf-8', newline='') as stream:
+                written = write_rows(rows, stream, fmt)
+        elapsed = time.perf_counter() - started
+        self.stderr.write(
+            f'Выгружено постов: {written}, '
+            f'{written / max(elapsed, 1e-9):.0f} строк/с'
+        )
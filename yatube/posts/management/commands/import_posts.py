@@ -0,0 +1,63 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.transfer import (BATCH_SIZE, FORMATS, Importer, detect_format,
+                            read_rows)
+
+
+class Command(BaseCommand):
+    help = 'Загружает посты из файла JSONL или CSV пакетами'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            help='Файл с постами; «-» — читать из stdin',
+        )
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            help='Формат файла; по умолчанию по расширению, иначе jsonl',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Сколько постов вставлять одним запросом',
+        )
+        parser.add_argument(
+            '--media-dir',
+            help='Каталог, из которого копируются изображения постов',
+        )
+
+    def report_error(self, number, error):
+        self.stderr.write(f'Строка {number} пропущена: {error}')
+
+    def import_stream(self, importer, stream, fmt):
+        started = time.perf_counter()
+        imported = importer.run(read_rows(stream, fmt))
+        return imported, time.perf_counter() - started
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or detect_format(path)
+        importer = Importer(
+            batch_size=options['batch_size'],
+            media_dir=options['media_dir'],
+            on_error=self.report_error,
+        )
+        if path == '-':
+            imported, elapsed = self.import_stream(importer, sys.stdin, fmt)
+        else:
+            try:
+                stream = open(path, encoding='utf-8', newline='')
+            except OSError as error:
+                raise CommandError(f'Не удалось открыть {path}: {error}')
+            with stream:
+                imported, elapsed = self.import_stream(importer, stream, fmt)
+        self.stdout.write(self.style.SUCCESS(
+            f'Импортировано постов: {imported}, '
+            f'пропущено строк: {importer.skipped}, '
+            f'{imported / max(elapsed, 1e-9):.0f} строк/с'
+        ))
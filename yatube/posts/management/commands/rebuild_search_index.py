@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from posts.search import BATCH_SIZE, rebuild
+
+
+class Command(BaseCommand):
+    help = 'Строит поисковый индекс постов заново'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Размер пакета вставки',
+        )
+
+    def handle(self, *args, **options):
+        posts = rebuild(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Проиндексировано постов: {posts}'
+        ))
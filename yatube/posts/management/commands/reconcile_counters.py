@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from posts.counters import reconcile
+
+
+class Command(BaseCommand):
+    help = 'Сверяет счётчики постов и комментариев с базой данных'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Размер пакета обновления',
+        )
+
+    def handle(self, *args, **options):
+        authors, posts = reconcile(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Исправлено счётчиков авторов: {authors}, постов: {posts}'
+        ))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from posts.recommendations import BATCH_SIZE, refresh
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рекомендации авторов для пользователей'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Пересчитать всех пользователей, а не только из очереди',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Размер пакета записи',
+        )
+
+    def handle(self, *args, **options):
+        users = refresh(options['full'], options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитаны рекомендации пользователей: {users}'
+        ))
@@ -0,0 +1,61 @@
+import logging
+from collections import Counter
+
+from django.core.exceptions import SuspiciousFileOperation
+from django.db import transaction
+from django.db.models import F
+from sorl.thumbnail import delete
+from sorl.thumbnail.images import ImageFile
+
+from .models import MediaFile, Post
+
+logger = logging.getLogger(__name__)
+
+
+def _counted(names):
+    return Counter(name for name in names if name).items()
+
+
+def acquire(*names):
+    """Учитывает новые ссылки постов на файлы."""
+    for name, count in _counted(names):
+        MediaFile.objects.bulk_create(
+            [MediaFile(name=name)],
+            ignore_conflicts=True,
+        )
+        MediaFile.objects.filter(name=name).update(
+            references=F('references') + count,
+        )
+
+
+def release(*names):
+    """Снимает ссылки на файлы; файл без ссылок удаляется с миниатюрами.
+
+    Удаление откладывается до фиксации транзакции и повторно проверяет
+    счётчик: файл мог снова понадобиться новому посту.
+    """
+    for name, count in _counted(names):
+        MediaFile.objects.filter(name=name, references__gte=count).update(
+            references=F('references') - count,
+        )
+        transaction.on_commit(lambda name=name: collect(name))
+
+
+def collect(name):
+    """Удаляет файл и его миниатюры, если на него не осталось ссылок.
+
+    Запись удаляется условно (references = 0) в одной транзакции с
+    файлом: acquire того же имени ждёт её фиксации и создаёт запись
+    заново, а загрузка записывает файл уже после acquire.
+    """
+    with transaction.atomic():
+        deleted, _ = MediaFile.objects.filter(
+            name=name,
+            references=0,
+        ).delete()
+        if not deleted:
+            return
+        try:
+            delete(ImageFile(name, Post.image.field.storage))
+        except (OSError, SuspiciousFileOperation):
+            logger.warning('Не удалось удалить файл %s', name, exc_info=True)
@@ -1,14 +1,57 @@
 from django.contrib.auth import get_user_model
 from django.db import models
 
+from .storage import ContentAddressedStorage
+
 User = get_user_model()
 
 FOLLOW_STR = '{user} подписан на {author}'
 COMMENT_STR = 'Автор {author} написал комментарий: {text:.15}'
 POST_STR = 'Автор {author} написал в группе {group} пост: {text:.15}'
+STATS_STR = 'У автора {author} постов: {posts}'
+FEED_STR = 'Пост {post} в ленте пользователя {user}'
+TERM_STR = 'Основа {term} в посте {post}'
+RECOMMENDATION_STR = 'Пользователю {user} рекомендован автор {author}'
+MEDIA_STR = 'Файл {name}, ссылок: {references}'
+
+
+class VersionedModel(models.Model):
+    """Модель со временем и номером последнего сохранения."""
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения',
+    )
+    version = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Версия',
+    )
+
+    class Meta:
+        abstract = True
 
+    def save(self, *args, **kwargs):
+        """Сохраняет объект со следующей версией.
 
-class Group(models.Model):
+        Версия существующего объекта увеличивается в самом UPDATE, а не
+        в памяти: два одновременных сохранения получают разные версии.
+        """
+        adding = self._state.adding
+        if adding:
+            self.version += 1
+        else:
+            self.version = models.F('version') + 1
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {
+                *update_fields, 'updated_at', 'version',
+            }
+        super().save(*args, **kwargs)
+        if not adding:
+            self.refresh_from_db(fields=['version'])
+
+
+class Group(VersionedModel):
     """Модель создание групп для постов."""
     title = models.CharField(
         unique=True,
@@ -33,7 +76,7 @@ class Group(models.Model):
         return self.title
 
 
-class Post(models.Model):
+class Post(VersionedModel):
     """Модель создание постов."""
     group = models.ForeignKey(
         Group,
@@ -60,15 +103,35 @@ class Post(models.Model):
     )
     image = models.ImageField(
         upload_to='posts/',
+        storage=ContentAddressedStorage(),
         blank=True,
         null=True,
         verbose_name='Изображение',
     )
+    comments_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев',
+    )
 
     class Meta:
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
         ordering = ('-pub_date',)
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-id'],
+                name='post_pub_date_idx',
+            ),
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='post_author_pub_date_idx',
+            ),
+            models.Index(
+                fields=['group', '-pub_date', '-id'],
+                name='post_group_pub_date_idx',
+            ),
+        ]
 
     def __str__(self):
         return POST_STR.format(
@@ -78,7 +141,32 @@ class Post(models.Model):
         )
 
 
-class Comment(models.Model):
+class AuthorStats(models.Model):
+    """Счётчики автора, поддерживаемые при записи."""
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Автор',
+    )
+    posts_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество постов',
+    )
+
+    class Meta:
+        verbose_name = 'Статистика автора'
+        verbose_name_plural = 'Статистика авторов'
+
+    def __str__(self):
+        return STATS_STR.format(
+            author=self.author_id,
+            posts=self.posts_count,
+        )
+
+
+class Comment(VersionedModel):
     """Модель для написания комментариев к постам."""
     post = models.ForeignKey(
         Post,
@@ -105,6 +193,12 @@ class Comment(models.Model):
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ('-created',)
+        indexes = [
+            models.Index(
+                fields=['post', '-created', '-id'],
+                name='comment_post_created_idx',
+            ),
+        ]
 
     def __str__(self):
         return COMMENT_STR.format(
@@ -137,9 +231,187 @@ class Follow(models.Model):
                 name='unique_follow',
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['user', 'author'],
+                name='follow_user_author_idx',
+            ),
+        ]
 
     def __str__(self):
         return FOLLOW_STR.format(
             user=self.user.username,
             author=self.author.username,
         )
+
+
+class FeedEntry(models.Model):
+    """Запись материализованной ленты подписок пользователя."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='feed_entries',
+        db_index=False,
+        verbose_name='Читатель',
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='feed_entries',
+        verbose_name='Пост',
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        db_index=False,
+        verbose_name='Автор поста',
+    )
+    pub_date = models.DateTimeField(
+        verbose_name='Дата публикации поста',
+    )
+
+    class Meta:
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Записи ленты'
+        ordering = ('-pub_date', '-post_id')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'post'],
+                name='unique_feed_entry',
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', '-pub_date', '-post'],
+                name='feed_user_pub_date_idx',
+            ),
+            models.Index(
+                fields=['user', 'author'],
+                name='feed_user_author_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return FEED_STR.format(
+            user=self.user_id,
+            post=self.post_id,
+        )
+
+
+class PostTerm(models.Model):
+    """Запись поискового индекса: основа слова и пост, где она встречается."""
+    term = models.CharField(
+        max_length=64,
+        verbose_name='Основа слова',
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='terms',
+        verbose_name='Пост',
+    )
+    frequency = models.PositiveIntegerField(
+        default=1,
+        verbose_name='Число вхождений',
+    )
+
+    class Meta:
+        verbose_name = 'Запись поискового индекса'
+        verbose_name_plural = 'Поисковый индекс'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['term', 'post'],
+                name='unique_post_term',
+            )
+        ]
+
+    def __str__(self):
+        return TERM_STR.format(
+            term=self.term,
+            post=self.post_id,
+        )
+
+
+class Recommendation(models.Model):
+    """Автор, которого стоит почитать пользователю, с весом рекомендации."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='recommendations',
+        db_index=False,
+        verbose_name='Читатель',
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Рекомендуемый автор',
+    )
+    score = models.FloatField(
+        verbose_name='Вес',
+    )
+
+    class Meta:
+        verbose_name = 'Рекомендация'
+        verbose_name_plural = 'Рекомендации'
+        ordering = ('-score',)
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'author'],
+                name='unique_recommendation',
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', '-score'],
+                name='recommendation_user_score_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return RECOMMENDATION_STR.format(
+            user=self.user_id,
+            author=self.author_id,
+        )
+
+
+class StaleRecommendations(models.Model):
+    """Пользователь, рекомендации которого нужно пересчитать."""
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='+',
+        verbose_name='Пользователь',
+    )
+
+    class Meta:
+        verbose_name = 'Устаревшие рекомендации'
+        verbose_name_plural = 'Устаревшие рекомендации'
+
+    def __str__(self):
+        return str(self.user_id)
+
+
+class MediaFile(models.Model):
+    """Файл хранилища и число постов, которые на него ссылаются."""
+    name = models.CharField(
+        max_length=100,
+        primary_key=True,
+        verbose_name='Имя файла',
+    )
+    references = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Число ссылок',
+    )
+
+    class Meta:
+        verbose_name = 'Медиафайл'
+        verbose_name_plural = 'Медиафайлы'
+
+    def __str__(self):
+        return MEDIA_STR.format(
+            name=self.name,
+            references=self.references,
+        )
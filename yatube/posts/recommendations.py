@@ -0,0 +1,237 @@
+import heapq
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+
+from . import freshness
+from .models import (Comment, Follow, Post, Recommendation,
+                     StaleRecommendations, User)
+
+COMMENT_WEIGHT = 0.5
+BATCH_SIZE = 500
+
+
+def mark_stale(*user_ids):
+    """Ставит пользователей в очередь на пересчёт рекомендаций."""
+    StaleRecommendations.objects.bulk_create(
+        [StaleRecommendations(user_id=user_id) for user_id in user_ids],
+        ignore_conflicts=True,
+    )
+
+
+def discard(user_id, author_ids):
+    """Убирает из рекомендаций авторов, на которых уже подписались."""
+    Recommendation.objects.filter(
+        user_id=user_id,
+        author_id__in=author_ids,
+    ).delete()
+
+
+def for_user(user_id):
+    """Рекомендации пользователя: одно чтение по индексу (user, score)."""
+    return list(
+        Recommendation.objects.filter(user_id=user_id)
+        .select_related('author')
+        .order_by('-score')[:settings.RECOMMENDATIONS_SIZE]
+    )
+
+
+def _chunks(ids, size=BATCH_SIZE):
+    ids = sorted(ids)
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+def _commented():
+    return (
+        Comment.objects.exclude(post__author_id=F('author_id'))
+        .values_list('author_id', 'post__author_id')
+        .distinct()
+    )
+
+
+def interests(user_ids=None):
+    """Интересы пользователей и обратный индекс по авторам.
+
+    Возвращает {user: {author: вес}} и {author: {user, ...}}. Подписка
+    весит 1, комментарии к постам автора без подписки — COMMENT_WEIGHT.
+    Читаются только пары id из Follow и Comment; user_ids ограничивает
+    их заданными пользователями.
+    """
+    if user_ids is None:
+        parts = [(_commented(), Follow.objects.all())]
+    else:
+        parts = [
+            (
+                _commented().filter(author_id__in=chunk),
+                Follow.objects.filter(user_id__in=chunk),
+            )
+            for chunk in _chunks(user_ids)
+        ]
+    weights = defaultdict(dict)
+    for commented, follows in parts:
+        for user_id, author_id in commented.iterator():
+            weights[user_id][author_id] = COMMENT_WEIGHT
+        follows = follows.values_list('user_id', 'author_id')
+        for user_id, author_id in follows.iterator():
+            weights[user_id][author_id] = 1.0
+    readers = defaultdict(set)
+    for user_id, authors in weights.items():
+        for author_id in authors:
+            readers[author_id].add(user_id)
+    return weights, readers
+
+
+def neighbours(user_ids):
+    """Пользователи user_ids и все, у кого с ними есть общие авторы."""
+    weights, _ = interests(user_ids)
+    authors = set().union(*weights.values())
+    users = set(user_ids)
+    for chunk in _chunks(authors):
+        users.update(
+            Follow.objects.filter(author_id__in=chunk)
+            .values_list('user_id', flat=True)
+        )
+        users.update(
+            _commented().filter(post__author_id__in=chunk)
+            .values_list('author_id', flat=True)
+        )
+    return users
+
+
+def _totals(weights):
+    return {user_id: sum(row.values()) for user_id, row in weights.items()}
+
+
+def popular(size):
+    """Авторы с наибольшим числом читателей: [(читателей, автор), ...].
+
+    Читатели — подписчики и комментаторы без подписки, как в
+    interests(); считаются одним запросом в БД.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'''
+            SELECT COUNT(*), author_id FROM (
+                SELECT user_id, author_id FROM {Follow._meta.db_table}
+                UNION
+                SELECT comment.author_id, post.author_id
+                FROM {Comment._meta.db_table} AS comment
+                JOIN {Post._meta.db_table} AS post
+                    ON post.id = comment.post_id
+                WHERE comment.author_id != post.author_id
+            ) AS interest
+            GROUP BY author_id
+            ORDER BY COUNT(*) DESC, author_id DESC
+            LIMIT %s
+            ''',
+            [size],
+        )
+        return cursor.fetchall()
+
+
+def score(user_id, weights, readers, totals, size):
+    """Лучшие size авторов для пользователя: [(вес, автор), ...].
+
+    Строка матрицы «пользователь × автор» умножается на транспонированную
+    через обратный индекс: перебираются только пользователи с общими
+    авторами. Сходство — взвешенный коэффициент Жаккара, вес автора —
+    сумма сходств читающих его соседей. Авторы, которых пользователь
+    только комментировал, получают и собственный вес интереса.
+    """
+    own = weights.get(user_id, {})
+    overlap = Counter()
+    for author_id, weight in own.items():
+        for other_id in readers[author_id]:
+            if other_id != user_id:
+                overlap[other_id] += min(weight, weights[other_id][author_id])
+    scores = Counter()
+    for other_id, common in overlap.items():
+        similarity = common / (
+            totals[user_id] + totals[other_id] - common
+        )
+        for author_id, weight in weights[other_id].items():
+            scores[author_id] += similarity * weight
+    for author_id, weight in own.items():
+        if weight < 1:
+            scores[author_id] += weight
+    return heapq.nlargest(
+        size,
+        (
+            (value, author_id) for author_id, value in scores.items()
+            if author_id != user_id and own.get(author_id) != 1.0
+        ),
+    )
+
+
+def _with_fallback(user_id, top, own, fallback, size):
+    """Дополняет короткий список популярными авторами с нулевым весом."""
+    chosen = {author_id for _, author_id in top}
+    for _, author_id in fallback:
+        if len(top) >= size:
+            break
+        if (
+            author_id != user_id
+            and author_id not in chosen
+            and own.get(author_id) != 1.0
+        ):
+            top.append((0.0, author_id))
+    return top
+
+
+def refresh(full=False, batch_size=BATCH_SIZE):
+    """Пересчитывает рекомендации. Возвращает число пользователей.
+
+    Без full пересчитываются только пользователи из очереди
+    StaleRecommendations и их соседи — все, у кого с ними есть общие
+    авторы; интересы читаются только для них и их соседей. Полный
+    пересчёт нужен после массовой загрузки в обход сигналов и время от
+    времени: отписка не попадает в очередь соседей, которых после неё
+    не осталось.
+    """
+    stale = set(StaleRecommendations.objects.values_list('user', flat=True))
+    if full:
+        users = set(User.objects.values_list('pk', flat=True))
+        weights, readers = interests()
+    else:
+        users = neighbours(stale)
+        weights, readers = interests(neighbours(users))
+    totals = _totals(weights)
+    size = settings.RECOMMENDATIONS_SIZE
+    fallback = popular(size * 2)
+    users = sorted(users)
+    for start in range(0, len(users), batch_size):
+        batch = users[start:start + batch_size]
+        rows = []
+        for user_id in batch:
+            top = _with_fallback(
+                user_id,
+                score(user_id, weights, readers, totals, size),
+                weights.get(user_id, {}),
+                fallback,
+                size,
+            )
+            rows += [
+                Recommendation(
+                    user_id=user_id,
+                    author_id=author_id,
+                    score=value,
+                )
+                for value, author_id in top
+            ]
+        with transaction.atomic():
+            Recommendation.objects.filter(user_id__in=batch).delete()
+            Recommendation.objects.bulk_create(rows, batch_size=batch_size)
+        freshness.touch(*[
+            freshness.stamp_key(freshness.AUTHOR, username)
+            for username in User.objects.filter(pk__in=batch)
+            .values_list('username', flat=True)
+        ])
+    stale = sorted(stale)
+    for start in range(0, len(stale), batch_size):
+        StaleRecommendations.objects.filter(
+            user_id__in=stale[start:start + batch_size],
+        ).delete()
+    return len(users)
@@ -0,0 +1,307 @@
+import hashlib
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import (Case, Count, F, FloatField, OuterRef,
+                              Subquery, Sum, Value, When)
+
+from .models import Post, PostTerm
+
+SEARCH_KEYS = ('-score', '-pub_date', '-id')
+MAX_TERM_LENGTH = 64
+MAX_QUERY_TERMS = 8
+BATCH_SIZE = 500
+STATISTICS_KEY = 'search:statistics:{0}'
+
+WORD = re.compile(r'[а-яёa-z0-9]+')
+VOWELS = 'аеиоуыэюя'
+STOP_WORDS = frozenset((
+    'а', 'без', 'бы', 'был', 'была', 'были', 'было', 'быть', 'в', 'вам',
+    'вас', 'во', 'вот', 'все', 'всё', 'вы', 'где', 'да', 'для', 'до',
+    'его', 'ее', 'её', 'ей', 'ему', 'если', 'есть', 'еще', 'ещё', 'же',
+    'за', 'и', 'из', 'или', 'им', 'их', 'к', 'как', 'когда', 'кто', 'ли',
+    'мне', 'мы', 'на', 'над', 'не', 'нет', 'ни', 'но', 'ну', 'о', 'об',
+    'он', 'она', 'они', 'оно', 'от', 'по', 'под', 'при', 'про', 'с', 'со',
+    'так', 'там', 'то', 'тот', 'ты', 'у', 'уже', 'чем', 'что', 'чтобы',
+    'это', 'этот', 'я',
+))
+
+# Окончания стеммера Snowball для русского языка. Окончания первых групп
+# отбрасываются, только если перед ними стоит «а» или «я».
+PERFECTIVE_GERUND = (
+    ('вшись', 'вши', 'в'),
+    ('ившись', 'ывшись', 'ивши', 'ывши', 'ив', 'ыв'),
+)
+ADJECTIVE = (
+    'ими', 'ыми', 'его', 'ого', 'ему', 'ому', 'ее', 'ие', 'ые', 'ое',
+    'ей', 'ий', 'ый', 'ой', 'ем', 'им', 'ым', 'ом', 'их', 'ых', 'ую',
+    'юю', 'ая', 'яя', 'ою', 'ею',
+)
+PARTICIPLE = (
+    ('ем', 'нн', 'вш', 'ющ', 'щ'),
+    ('ивш', 'ывш', 'ующ'),
+)
+REFLEXIVE = ('ся', 'сь')
+VERB = (
+    (
+        'ете', 'йте', 'ешь', 'нно', 'ла', 'на', 'ли', 'ем', 'ло', 'но',
+        'ет', 'ют', 'ны', 'ть', 'й', 'л', 'н',
+    ),
+    (
+        'ейте', 'уйте', 'ила', 'ыла', 'ена', 'ите', 'или', 'ыли', 'ило',
+        'ыло', 'ено', 'ует', 'уют', 'ены', 'ить', 'ыть', 'ишь', 'ей', 'уй',
+        'ил', 'ыл', 'им', 'ым', 'ен', 'ят', 'ит', 'ыт', 'ую', 'ю',
+    ),
+)
+NOUN = (
+    'иями', 'ями', 'ами', 'ией', 'иям', 'ием', 'иях', 'ев', 'ов', 'ие',
+    'ье', 'еи', 'ии', 'ей', 'ой', 'ий', 'ям', 'ем', 'ам', 'ом', 'ах',
+    'ях', 'ию', 'ью', 'ия', 'ья', 'а', 'е', 'и', 'й', 'о', 'у', 'ы', 'ь',
+    'ю', 'я',
+)
+SUPERLATIVE = ('ейше', 'ейш')
+DERIVATIONAL = ('ость', 'ост')
+
+
+def _longest_first(endings):
+    return tuple(sorted(endings, key=len, reverse=True))
+
+
+def _strip(word, endings, after_a=False):
+    """Слово без первого подходящего окончания или None."""
+    for ending in _longest_first(endings):
+        if not word.endswith(ending):
+            continue
+        stem = word[:-len(ending)]
+        if after_a and not stem.endswith(('а', 'я')):
+            continue
+        return stem
+    return None
+
+
+def _strip_grouped(word, groups):
+    first, second = groups
+    candidates = [
+        stem for stem in (
+            _strip(word, first, after_a=True),
+            _strip(word, second),
+        )
+        if stem is not None
+    ]
+    if not candidates:
+        return None
+    return min(candidates, key=len)
+
+
+def _region(word, start=0):
+    """Начало области R1 (R2 при повторном вызове) по Snowball."""
+    for index in range(start + 1, len(word)):
+        if word[index] not in VOWELS and word[index - 1] in VOWELS:
+            return index + 1
+    return len(word)
+
+
+def _strip_inflection(rv):
+    """Шаг 1 Snowball: деепричастие, затем прилагательное, глагол, сущ."""
+    stripped = _strip_grouped(rv, PERFECTIVE_GERUND)
+    if stripped is not None:
+        return stripped
+    reflexive = _strip(rv, REFLEXIVE)
+    if reflexive is not None:
+        rv = reflexive
+    stripped = _strip(rv, ADJECTIVE)
+    if stripped is not None:
+        return _strip_grouped(stripped, PARTICIPLE) or stripped
+    for stripped in (_strip_grouped(rv, VERB), _strip(rv, NOUN)):
+        if stripped is not None:
+            return stripped
+    return rv
+
+
+def _strip_suffix(rv):
+    """Шаг 4 Snowball: превосходная степень, двойное «н» и «ь»."""
+    superlative = _strip(rv, SUPERLATIVE)
+    if superlative is not None:
+        rv = superlative
+    if rv.endswith('нн'):
+        return rv[:-1]
+    if superlative is None and rv.endswith('ь'):
+        return rv[:-1]
+    return rv
+
+
+@lru_cache(maxsize=100000)
+def stem(word):
+    """Основа русского слова по алгоритму Snowball (Портера)."""
+    vowel = next(
+        (index for index, char in enumerate(word) if char in VOWELS),
+        None,
+    )
+    if vowel is None:
+        return word
+    prefix, rv = word[:vowel + 1], word[vowel + 1:]
+    r2 = max(_region(word, _region(word)) - len(prefix), 0)
+    rv = _strip_inflection(rv)
+    if rv.endswith('и'):
+        rv = rv[:-1]
+    derivational = _strip(rv[r2:], DERIVATIONAL)
+    if derivational is not None:
+        rv = rv[:r2] + derivational
+    return prefix + _strip_suffix(rv)
+
+
+def tokenize(text):
+    """Основы значимых слов текста в порядке появления."""
+    for word in WORD.findall(text.lower().replace('ё', 'е')):
+        if word in STOP_WORDS:
+            continue
+        yield stem(word)[:MAX_TERM_LENGTH]
+
+
+def build_terms(text):
+    """Частоты основ слов текста: {основа: число вхождений}."""
+    return Counter(tokenize(text))
+
+
+def index_post(post):
+    """Обновляет записи поста в поисковом индексе.
+
+    Меняются только основы, которые появились, пропали или изменили
+    частоту, поэтому правка опечатки не переписывает весь пост.
+    """
+    terms = build_terms(post.text)
+    stored = dict(
+        PostTerm.objects.filter(post=post).values_list('term', 'frequency')
+    )
+    removed = [term for term in stored if term not in terms]
+    if removed:
+        PostTerm.objects.filter(post=post, term__in=removed).delete()
+    changed = [
+        PostTerm(post=post, term=term, frequency=frequency)
+        for term, frequency in terms.items()
+        if stored.get(term) != frequency
+    ]
+    for term in changed:
+        if term.term in stored:
+            PostTerm.objects.filter(post=post, term=term.term).update(
+                frequency=term.frequency,
+            )
+    PostTerm.objects.bulk_create(
+        [term for term in changed if term.term not in stored]
+    )
+
+
+def index_posts(posts, batch_size=BATCH_SIZE):
+    """Добавляет в индекс посты queryset posts. Возвращает их число.
+
+    Нужна для постов, созданных в обход сигналов (bulk_create);
+    уже проиндексированные основы пропускаются.
+    """
+    indexed = 0
+    batch = []
+    rows = posts.order_by('pk').values_list('pk', 'text')
+    for post_id, text in rows.iterator(chunk_size=batch_size):
+        batch.extend(
+            PostTerm(post_id=post_id, term=term, frequency=frequency)
+            for term, frequency in build_terms(text).items()
+        )
+        indexed += 1
+        if len(batch) >= batch_size:
+            PostTerm.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    PostTerm.objects.bulk_create(batch, ignore_conflicts=True)
+    return indexed
+
+
+def rebuild(batch_size=BATCH_SIZE):
+    """Строит индекс заново для всех постов. Возвращает число постов."""
+    PostTerm.objects.all().delete()
+    return index_posts(Post.objects.all(), batch_size)
+
+
+def query_terms(query):
+    """Различные основы поискового запроса."""
+    return list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TERMS]
+
+
+def matching(terms):
+    """Id постов, содержащих все основы terms, для фильтра pk__in."""
+    return (
+        PostTerm.objects.filter(term__in=terms).order_by()
+        .values('post').annotate(matched=Count('id'))
+        .filter(matched=len(terms)).values('post')
+    )
+
+
+def nothing():
+    """Пустой результат поиска с полем score для CursorPaginator."""
+    return Post.objects.none().annotate(
+        score=Value(0.0, output_field=FloatField()),
+    )
+
+
+def statistics(terms):
+    """Число постов и документные частоты основ terms для TF-IDF.
+
+    Хранятся в кэше SEARCH_STATISTICS_TIMEOUT секунд: так релевантность,
+    записанная в курсор, не меняется между страницами от новых постов, и
+    поиск не считает все посты на каждый запрос. Возвращает None, если
+    какой-то основы нет ни в одном посте; такой ответ не кэшируется,
+    чтобы новый пост с этим словом сразу находился.
+    """
+    key = STATISTICS_KEY.format(
+        hashlib.md5(' '.join(sorted(terms)).encode()).hexdigest()
+    )
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+    frequencies = dict(
+        PostTerm.objects.filter(term__in=terms).order_by()
+        .values('term').annotate(posts=Count('id'))
+        .values_list('term', 'posts')
+    )
+    if len(frequencies) < len(terms):
+        return None
+    cached = Post.objects.count(), frequencies
+    cache.set(key, cached, settings.SEARCH_STATISTICS_TIMEOUT)
+    return cached
+
+
+def search(query):
+    """Посты со всеми словами запроса, упорядоченные по релевантности.
+
+    Релевантность — сумма TF-IDF основ запроса; для постраничного
+    вывода по ключу SEARCH_KEYS подходит CursorPaginator. Совпадения
+    ищутся по индексу (term, post), а не перебором постов.
+    """
+    terms = query_terms(query)
+    found = statistics(terms) if terms else None
+    if found is None:
+        return nothing()
+    total, frequencies = found
+    scores = (
+        PostTerm.objects.filter(post=OuterRef('pk'), term__in=terms)
+        .order_by().values('post')
+        .annotate(score=Sum(
+            Case(
+                *[
+                    When(
+                        term=term,
+                        then=F('frequency') * math.log(
+                            1 + total / frequencies[term]
+                        ),
+                    )
+                    for term in terms
+                ],
+                output_field=FloatField(),
+            )
+        ))
+        .values('score')
+    )
+    return Post.objects.filter(pk__in=matching(terms)).annotate(
+        score=Subquery(scores, output_field=FloatField()),
+    )
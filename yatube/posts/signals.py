@@ -0,0 +1,202 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import (cards, counters, feed, freshness, graph, media,
+               recommendations, search, thumbnails)
+from .models import Comment, Follow, Group, Post, User
+from .storage import content_name
+
+
+@receiver(post_save, sender=Post)
+def post_created(sender, instance, created, **kwargs):
+    """Раскладка нового поста по лентам и учёт в счётчике автора."""
+    if created:
+        feed.fan_out(instance)
+        counters.change_posts_count(instance.author_id, 1)
+
+
+@receiver(post_save, sender=Post)
+def post_indexed(sender, instance, **kwargs):
+    """Обновление поискового индекса по тексту поста."""
+    search.index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    """Учёт удалённого поста в счётчике автора."""
+    counters.change_posts_count(instance.author_id, -1)
+
+
+@receiver(post_save, sender=Comment)
+def comment_created(sender, instance, created, **kwargs):
+    """Учёт нового комментария в счётчике поста."""
+    if created:
+        counters.change_comments_count(instance.post_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    """Учёт удалённого комментария в счётчике поста."""
+    counters.change_comments_count(instance.post_id, -1)
+
+
+@receiver(post_save, sender=Follow)
+def follow_backfill(sender, instance, created, **kwargs):
+    """Заполнение ленты постами автора после подписки."""
+    if created:
+        feed.backfill(instance.user_id, instance.author_id)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_trim(sender, instance, **kwargs):
+    """Очистка ленты от постов автора после отписки."""
+    feed.trim(instance.user_id, instance.author_id)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def author_changed(sender, instance, update_fields=None, **kwargs):
+    """Сброс карточек постов автора; вход в систему их не меняет."""
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    cards.bump(cards.AUTHOR, instance.pk)
+
+
+@receiver(post_save, sender=Post)
+def post_image_saved(sender, instance, **kwargs):
+    """Фоновое создание миниатюр нового изображения поста.
+
+    Правка текста или версии с прежним изображением миниатюры не трогает.
+    """
+    name = instance.image.name
+    if name and name != getattr(instance, '_previous_image', None):
+        transaction.on_commit(lambda: thumbnails.schedule(name))
+
+
+@receiver(pre_save, sender=Post)
+def post_previous_remembered(sender, instance, **kwargs):
+    """Запоминает группу и изображение поста до правки.
+
+    Страницу прежней группы нужно сбросить, а ссылку на прежнее
+    изображение — снять.
+    """
+    instance._previous_group = instance._previous_image = None
+    if instance.pk is not None:
+        instance._previous_group, instance._previous_image = (
+            Post.objects.filter(pk=instance.pk)
+            .values_list('group__slug', 'image').first()
+            or (None, None)
+        )
+
+
+@receiver(pre_save, sender=Post)
+def post_image_reserved(sender, instance, **kwargs):
+    """Учёт ссылки на загружаемый файл до его записи в хранилище.
+
+    Файл с тем же содержимым мог остаться без ссылок и ждать удаления:
+    ссылка, учтённая заранее, не даст collect удалить его после записи.
+    """
+    instance._reserved_image = None
+    image = instance.image
+    if image and not image._committed:
+        instance._reserved_image = content_name(
+            image.field.generate_filename(instance, image.name),
+            image.file,
+        )
+        media.acquire(instance._reserved_image)
+
+
+@receiver(post_save, sender=Post)
+def post_image_referenced(sender, instance, **kwargs):
+    """Учёт ссылок на файл изображения при создании и правке поста."""
+    reserved = getattr(instance, '_reserved_image', None)
+    previous = getattr(instance, '_previous_image', None) or ''
+    name = instance.image.name or ''
+    if name == previous:
+        media.release(reserved)
+        return
+    if name != reserved:
+        media.acquire(name)
+        media.release(reserved)
+    media.release(previous)
+
+
+@receiver(post_delete, sender=Post)
+def post_image_released(sender, instance, **kwargs):
+    """Снятие ссылки на изображение удалённого поста."""
+    media.release(instance.image.name)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def post_freshness(sender, instance, **kwargs):
+    """Отметка об изменении страниц, где выводится пост."""
+    freshness.touch_post(
+        instance,
+        getattr(instance, '_previous_group', None),
+    )
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_freshness(sender, instance, **kwargs):
+    """Отметка об изменении страницы поста."""
+    freshness.touch(freshness.stamp_key(freshness.POST, instance.post_id))
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def follow_freshness(sender, instance, **kwargs):
+    """Отметка об изменении профилей автора и подписчика."""
+    freshness.touch(
+        freshness.stamp_key(freshness.AUTHOR, instance.author.username),
+        freshness.stamp_key(freshness.AUTHOR, instance.user.username),
+    )
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def follow_graph_changed(sender, instance, **kwargs):
+    """Сброс закэшированных подписок и подписчиков."""
+    graph.invalidate([instance.user_id], [instance.author_id])
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def group_freshness(sender, instance, **kwargs):
+    """Отметка об изменении всех страниц: название группы есть везде."""
+    freshness.touch(freshness.stamp_key(freshness.GROUPS))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def author_freshness(
+    sender, instance, created=False, update_fields=None, **kwargs
+):
+    """Отметка об изменении всех страниц с постами автора.
+
+    Новый пользователь постов ещё не писал, вход в систему их не меняет.
+    """
+    if created or update_fields and set(update_fields) <= {'last_login'}:
+        return
+    freshness.touch(freshness.stamp_key(freshness.USERS))
+
+
+@receiver(post_save, sender=Follow)
+def follow_recommendations(sender, instance, created, **kwargs):
+    """Автор, на которого подписались, больше не рекомендуется."""
+    if created:
+        recommendations.discard(instance.user_id, [instance.author_id])
+        recommendations.mark_stale(instance.user_id)
+
+
+@receiver(post_delete, sender=Follow)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def interests_changed(sender, instance, created=True, **kwargs):
+    """Пересчёт рекомендаций после отписки или комментария."""
+    if created:
+        recommendations.mark_stale(
+            instance.user_id if sender is Follow else instance.author_id
+        )
@@ -0,0 +1,68 @@
+import hashlib
+import os
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+HASH_PREFIX_LENGTH = 2
+
+
+def hashed_name(name, digest):
+    """Имя файла по содержимому: posts/ab/abcdef….jpg для posts/x.jpg."""
+    directory, basename = os.path.split(name)
+    extension = os.path.splitext(basename)[1].lower()
+    return os.path.join(
+        directory,
+        digest[:HASH_PREFIX_LENGTH],
+        digest + extension,
+    ).replace('\\', '/')
+
+
+def content_name(name, content):
+    """Имя, под которым storage сохранит content; файл не пишется."""
+    digest = hashlib.sha256()
+    content.seek(0)
+    for chunk in content.chunks():
+        digest.update(chunk)
+    content.seek(0)
+    return hashed_name(name, digest.hexdigest())
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """Хранилище, где имя файла — SHA-256 его содержимого.
+
+    Файл пишется во временный файл рядом с целевым, хэш считается по
+    ходу записи, затем файл переименовывается. Одинаковое содержимое
+    хранится один раз и получает одно имя, а значит, и одни миниатюры
+    sorl. Удалять файлы следует через posts.media.release, который
+    учитывает, сколько постов ссылается на файл.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        return name
+
+    def _save(self, name, content):
+        directory = self.path(os.path.dirname(name))
+        os.makedirs(directory, exist_ok=True)
+        digest = hashlib.sha256()
+        descriptor, temporary = tempfile.mkstemp(dir=directory)
+        try:
+            with os.fdopen(descriptor, 'wb') as file:
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    file.write(chunk)
+            name = hashed_name(name, digest.hexdigest())
+            if self.exists(name):
+                os.remove(temporary)
+                return name
+            full_path = self.path(name)
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            os.replace(temporary, full_path)
+        except BaseException:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
+        os.chmod(full_path, self.file_permissions_mode or 0o644)
+        return name
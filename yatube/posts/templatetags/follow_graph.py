@@ -0,0 +1,17 @@
+from django import template
+
+from .. import graph
+
+register = template.Library()
+
+
+@register.simple_tag
+def followers_count(author):
+    """Число подписчиков автора из графа подписок."""
+    return graph.followers_count(author.pk)
+
+
+@register.simple_tag
+def following_count(author):
+    """Число авторов, на которых подписан пользователь."""
+    return graph.following_count(author.pk)
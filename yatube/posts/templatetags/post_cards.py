@@ -0,0 +1,15 @@
+from django import template
+
+from ..cards import render_cards
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_cards(posts, show_author=True, show_group=True):
+    """Карточки постов страницы из кэша: {% post_cards page_obj as cards %}."""
+    return render_cards(
+        posts,
+        show_author=show_author,
+        show_group=show_group,
+    )
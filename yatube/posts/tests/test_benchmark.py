@@ -0,0 +1,83 @@
+import io
+import json
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+
+from ..benchmark import VIEWS, compare, run, seed
+from ..management.commands.benchmark import BASELINE
+from ..models import AuthorStats, FeedEntry, Follow, Post, User
+
+
+class BenchmarkTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cache.clear()
+        seed(users=30, posts=200, groups=3, follows=60, comments=40)
+
+    def test_seed_creates_dataset(self):
+        """Набор данных создаётся вместе с лентами и счётчиками."""
+        self.assertEqual(User.objects.count(), 30)
+        self.assertEqual(Post.objects.count(), 200)
+        self.assertEqual(Follow.objects.count(), 60)
+        self.assertTrue(FeedEntry.objects.exists())
+        self.assertEqual(
+            sum(AuthorStats.objects.values_list('posts_count', flat=True)),
+            200,
+        )
+        dates = Post.objects.values_list('pub_date', flat=True)
+        self.assertEqual(len(set(dates)), 200)
+
+    def test_seed_is_repeatable(self):
+        """Повторное наполнение не дублирует данные."""
+        seed(users=30, posts=200, groups=3, follows=60, comments=40)
+        self.assertEqual(Post.objects.count(), 200)
+        self.assertEqual(Follow.objects.count(), 60)
+
+    def test_run_and_compare(self):
+        """Замер возвращает перцентили и находит ухудшения."""
+        results = run(requests=3, warmup=1, readers=2)
+        self.assertEqual(tuple(results), VIEWS)
+        for summary in results.values():
+            self.assertEqual(summary['count'], 3)
+        self.assertEqual(compare(results, results, 0), [])
+        baseline = {
+            view_name: dict(
+                summary,
+                queries=dict(summary['queries'], p95=0),
+            )
+            for view_name, summary in results.items()
+        }
+        self.assertEqual(len(compare(results, baseline, 0)), len(VIEWS))
+
+    def test_save_baseline(self):
+        """--save-baseline записывает эталон по всем представлениям."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'baseline.json')
+            call_command(
+                'benchmark',
+                '--save-baseline',
+                '--baseline', path,
+                '--requests', '2',
+                '--warmup', '0',
+                stdout=io.StringIO(),
+            )
+            with open(path, encoding='utf-8') as file:
+                self.assertEqual(tuple(json.load(file)), VIEWS)
+
+    def test_stored_baseline_is_current(self):
+        """Эталон в репозитории снят со всех представлений в бюджете."""
+        with open(BASELINE, encoding='utf-8') as file:
+            baseline = json.load(file)
+        self.assertEqual(tuple(baseline), VIEWS)
+        for view_name, summary in baseline.items():
+            with self.subTest(view_name=view_name):
+                self.assertLessEqual(
+                    summary['queries']['max'],
+                    settings.QUERY_BUDGETS[view_name],
+                )
@@ -0,0 +1,99 @@
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post, User
+
+USERNAME = 'NoName'
+FOLLOWER_USERNAME = 'NoName2'
+GROUP_SLUG = 'test-slug'
+INDEX_URL = reverse('posts:index')
+GROUP_URL = reverse('posts:group_list', args=[GROUP_SLUG])
+PROFILE_URL = reverse('posts:profile', args=[USERNAME])
+FOLLOW_INDEX_URL = reverse('posts:follow_index')
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(QUERY_BUDGET_STRICT=True, MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class QueryBudgetTest(TestCase):
+    """Страницы укладываются в бюджет запросов к БД из настроек.
+
+    У части постов есть изображения: миниатюры не должны добавлять
+    запросов ни при создании, ни при показе.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.guest_client = Client()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.follower = User.objects.create_user(username=FOLLOWER_USERNAME)
+        cls.follower_client = Client()
+        cls.follower_client.force_login(cls.follower)
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug=GROUP_SLUG,
+            description='Тестовое описание',
+        )
+        Follow.objects.create(user=cls.follower, author=cls.user)
+        cls.posts = [
+            Post.objects.create(
+                author=cls.user,
+                group=cls.group,
+                text=f'Пост {i}',
+                image=SimpleUploadedFile(
+                    name=f'small{i}.gif',
+                    content=SMALL_GIF + bytes([i]),
+                    content_type='image/gif',
+                ) if i % 2 else None,
+            )
+            for i in range(15)
+        ]
+        for i in range(3):
+            Comment.objects.create(
+                post=cls.posts[-1],
+                author=cls.follower,
+                text=f'Комментарий {i}',
+            )
+        cls.POST_URL = reverse('posts:posts_detail', args=[cls.posts[-1].pk])
+        cls.COMMENTS_URL = reverse(
+            'posts:post_comments',
+            args=[cls.posts[-1].pk],
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def test_pages_within_budget(self):
+        """Страницы без кэша не превышают бюджет запросов."""
+        urls = (
+            INDEX_URL,
+            GROUP_URL,
+            PROFILE_URL,
+            self.POST_URL,
+            self.COMMENTS_URL,
+        )
+        for client in (self.guest_client, self.follower_client):
+            for url in urls:
+                with self.subTest(url=url):
+                    cache.clear()
+                    self.assertEqual(client.get(url).status_code, 200)
+        cache.clear()
+        response = self.follower_client.get(FOLLOW_INDEX_URL)
+        self.assertEqual(response.status_code, 200)
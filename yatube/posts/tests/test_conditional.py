@@ -0,0 +1,128 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Comment, Group, Post, User
+
+USERNAME = 'NoName'
+GROUP_SLUG = 'test-slug'
+OTHER_SLUG = 'other-slug'
+INDEX_URL = reverse('posts:index')
+GROUP_URL = reverse('posts:group_list', args=[GROUP_SLUG])
+OTHER_GROUP_URL = reverse('posts:group_list', args=[OTHER_SLUG])
+PROFILE_URL = reverse('posts:profile', args=[USERNAME])
+CARD_TEMPLATE = 'posts/includes/post_card.html'
+
+
+class ConditionalGetTest(TestCase):
+    """Неизменившиеся страницы отдаются ответом 304."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug=GROUP_SLUG,
+            description='Тестовое описание',
+        )
+        cls.other_group = Group.objects.create(
+            title='Другая группа',
+            slug=OTHER_SLUG,
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            group=cls.group,
+            text='Тестовый пост',
+        )
+        cls.POST_URL = reverse('posts:posts_detail', args=[cls.post.pk])
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_unchanged_pages_not_modified(self):
+        """Повторный запрос без изменений получает 304 без шаблона."""
+        for url in (INDEX_URL, GROUP_URL, PROFILE_URL, self.POST_URL):
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertTrue(response.has_header('Last-Modified'))
+                self.assertIn('private', response['Cache-Control'])
+                with self.assertTemplateNotUsed(CARD_TEMPLATE):
+                    repeated = self.guest_client.get(
+                        url,
+                        HTTP_IF_NONE_MATCH=response['ETag'],
+                    )
+                self.assertEqual(repeated.status_code, 304)
+                repeated = self.guest_client.get(
+                    url,
+                    HTTP_IF_MODIFIED_SINCE=response['Last-Modified'],
+                )
+                self.assertEqual(repeated.status_code, 304)
+
+    def test_new_post_changes_lists(self):
+        """Новый пост меняет главную, группу и профиль автора."""
+        etags = {
+            url: self.guest_client.get(url)['ETag']
+            for url in (INDEX_URL, GROUP_URL, PROFILE_URL, OTHER_GROUP_URL)
+        }
+        Post.objects.create(author=self.user, group=self.group, text='Новый')
+        for url in (INDEX_URL, GROUP_URL, PROFILE_URL):
+            with self.subTest(url=url):
+                response = self.guest_client.get(
+                    url,
+                    HTTP_IF_NONE_MATCH=etags[url],
+                )
+                self.assertEqual(response.status_code, 200)
+        response = self.guest_client.get(
+            OTHER_GROUP_URL,
+            HTTP_IF_NONE_MATCH=etags[OTHER_GROUP_URL],
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_moved_post_changes_previous_group(self):
+        """Перенос поста в другую группу меняет страницы обеих групп."""
+        etags = {
+            url: self.guest_client.get(url)['ETag']
+            for url in (GROUP_URL, OTHER_GROUP_URL)
+        }
+        self.post.group = self.other_group
+        self.post.save()
+        for url, etag in etags.items():
+            with self.subTest(url=url):
+                response = self.guest_client.get(
+                    url,
+                    HTTP_IF_NONE_MATCH=etag,
+                )
+                self.assertEqual(response.status_code, 200)
+
+    def test_comment_changes_post_page(self):
+        """Комментарий меняет страницу поста, но не списки."""
+        etags = {
+            url: self.guest_client.get(url)['ETag']
+            for url in (INDEX_URL, self.POST_URL)
+        }
+        Comment.objects.create(post=self.post, author=self.user, text='Ок')
+        response = self.guest_client.get(
+            self.POST_URL,
+            HTTP_IF_NONE_MATCH=etags[self.POST_URL],
+        )
+        self.assertEqual(response.status_code, 200)
+        response = self.guest_client.get(
+            INDEX_URL,
+            HTTP_IF_NONE_MATCH=etags[INDEX_URL],
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_etag_depends_on_user(self):
+        """ETag гостя не подходит к странице вошедшего пользователя."""
+        etag = self.guest_client.get(INDEX_URL)['ETag']
+        client = Client()
+        client.force_login(self.user)
+        response = client.get(INDEX_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_missing_post_not_found(self):
+        """Страница несуществующего поста по-прежнему отдаёт 404."""
+        url = reverse('posts:posts_detail', args=[self.post.pk + 100])
+        self.assertEqual(self.guest_client.get(url).status_code, 404)
@@ -0,0 +1,64 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import AuthorStats, Comment, Post, User
+
+USERNAME = 'NoName'
+PROFILE_URL = reverse('posts:profile', args=[USERNAME])
+
+
+class CountersTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.guest_client = Client()
+        cls.user = User.objects.create_user(username=USERNAME)
+
+    def test_posts_count_follows_create_and_delete(self):
+        """Счётчик постов автора меняется при создании и удалении."""
+        posts = [
+            Post.objects.create(author=self.user, text=f'Пост {i}')
+            for i in range(3)
+        ]
+        self.assertEqual(self.user.stats.posts_count, 3)
+        posts[0].delete()
+        self.user.stats.refresh_from_db()
+        self.assertEqual(self.user.stats.posts_count, 2)
+
+    def test_comments_count_follows_create_and_delete(self):
+        """Счётчик комментариев поста меняется при создании и удалении."""
+        post = Post.objects.create(author=self.user, text='Пост')
+        comment = Comment.objects.create(
+            post=post,
+            author=self.user,
+            text='Комментарий',
+        )
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        comment.delete()
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 0)
+
+    def test_profile_does_not_count_posts(self):
+        """Страница профиля не выполняет COUNT по постам."""
+        Post.objects.create(author=self.user, text='Пост')
+        with self.assertNumQueries(2):
+            response = self.guest_client.get(PROFILE_URL)
+        self.assertContains(response, 'Всего постов: 1')
+
+    def test_reconcile_counters_fixes_drift(self):
+        """Команда reconcile_counters исправляет расхождения."""
+        post = Post.objects.create(author=self.user, text='Пост')
+        Comment.objects.create(post=post, author=self.user, text='Текст')
+        AuthorStats.objects.filter(author=self.user).update(posts_count=7)
+        Post.objects.filter(pk=post.pk).update(comments_count=5)
+        out = StringIO()
+        call_command('reconcile_counters', stdout=out)
+        self.user.stats.refresh_from_db()
+        post.refresh_from_db()
+        self.assertEqual(self.user.stats.posts_count, 1)
+        self.assertEqual(post.comments_count, 1)
+        self.assertIn('авторов: 1, постов: 1', out.getvalue())
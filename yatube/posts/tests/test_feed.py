@@ -0,0 +1,116 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import feed
+from ..models import FeedEntry, Follow, Post, User
+
+AUTHOR_USERNAME = 'Author'
+READER_USERNAME = 'Reader'
+FOLLOW_INDEX_URL = reverse('posts:follow_index')
+PROFILE_FOLLOW_URL = reverse('posts:profile_follow', args=[AUTHOR_USERNAME])
+PROFILE_UNFOLLOW_URL = reverse(
+    'posts:profile_unfollow',
+    args=[AUTHOR_USERNAME],
+)
+
+
+class FeedTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username=AUTHOR_USERNAME)
+        cls.reader = User.objects.create_user(username=READER_USERNAME)
+        cls.reader_client = Client()
+        cls.reader_client.force_login(cls.reader)
+
+    def setUp(self):
+        cache.clear()
+
+    def feed_posts(self):
+        return list(
+            self.reader_client.get(FOLLOW_INDEX_URL).context['page_obj']
+        )
+
+    def test_new_post_fans_out_to_followers(self):
+        """Новый пост попадает в ленты подписчиков при публикации."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(author=self.author, text='Пост')
+        self.assertTrue(FeedEntry.objects.filter(
+            user=self.reader,
+            post=post,
+        ).exists())
+        self.assertEqual(self.feed_posts(), [post])
+
+    def test_follow_backfills_and_unfollow_trims(self):
+        """Подписка заполняет ленту, отписка очищает её."""
+        posts = [
+            Post.objects.create(author=self.author, text=f'Пост {i}')
+            for i in range(3)
+        ]
+        self.reader_client.get(PROFILE_FOLLOW_URL)
+        self.assertEqual(
+            set(self.feed_posts()),
+            set(posts),
+        )
+        self.reader_client.get(PROFILE_UNFOLLOW_URL)
+        self.assertFalse(FeedEntry.objects.filter(user=self.reader).exists())
+        self.assertEqual(self.feed_posts(), [])
+
+    @override_settings(FEED_FANOUT_LIMIT=0)
+    def test_large_author_is_pulled_on_read(self):
+        """Посты крупного автора подтягиваются в ленту при чтении."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(author=self.author, text='Пост')
+        self.assertFalse(FeedEntry.objects.filter(post=post).exists())
+        self.assertEqual(self.feed_posts(), [post])
+        self.assertTrue(FeedEntry.objects.filter(
+            user=self.reader,
+            post=post,
+        ).exists())
+
+    @override_settings(FEED_FANOUT_LIMIT=0)
+    def test_large_authors_pulled_independently(self):
+        """Пост одного крупного автора не теряется за постом другого."""
+        other = User.objects.create_user(username='Other')
+        Follow.objects.create(user=self.reader, author=self.author)
+        Follow.objects.create(user=self.reader, author=other)
+        start = timezone.now() - timedelta(hours=1)
+
+        def publish(author, minutes):
+            post = Post.objects.create(author=author, text='Пост')
+            Post.objects.filter(pk=post.pk).update(
+                pub_date=start + timedelta(minutes=minutes),
+            )
+            return post
+
+        first = publish(self.author, 1)
+        feed.pull(self.reader.pk)
+        other_post = publish(other, 3)
+        feed.pull(self.reader.pk)
+        late = publish(self.author, 2)
+        feed.pull(self.reader.pk)
+        self.assertEqual(
+            [entry.post for entry in feed.timeline(self.reader.pk)],
+            [other_post, late, first],
+        )
+
+    def test_rebuild_restores_feeds(self):
+        """Пересборка лент даёт то же, что и запись по сигналам."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        for i in range(3):
+            Post.objects.create(author=self.author, text=f'Пост {i}')
+        entries = list(FeedEntry.objects.values_list(
+            'user', 'post', 'author', 'pub_date',
+        ))
+        FeedEntry.objects.all().delete()
+        feed.rebuild()
+        self.assertEqual(
+            list(FeedEntry.objects.values_list(
+                'user', 'post', 'author', 'pub_date',
+            )),
+            entries,
+        )
@@ -0,0 +1,129 @@
+import json
+from xml.etree import ElementTree
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..feeds import ATOM_NS
+from ..models import Group, Post, User
+
+USERNAME = 'NoName'
+GROUP_SLUG = 'test-slug'
+ATOM = f'{{{ATOM_NS}}}'
+
+
+@override_settings(FEED_PAGE_SIZE=2)
+class FeedTest(TestCase):
+    """Ленты Atom, RSS и JSON для главной, групп и авторов."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug=GROUP_SLUG,
+            description='Тестовое описание',
+        )
+        cls.posts = [
+            Post.objects.create(
+                author=cls.user,
+                group=cls.group,
+                text=f'Тестовый пост {i}',
+            )
+            for i in range(3)
+        ]
+        cls.FEEDS = {
+            fmt: (
+                reverse('posts:feed', args=[fmt]),
+                reverse('posts:group_feed', args=[GROUP_SLUG, fmt]),
+                reverse('posts:profile_feed', args=[USERNAME, fmt]),
+            )
+            for fmt in ('atom', 'rss', 'json')
+        }
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def get(self, url, **extra):
+        response = self.guest_client.get(url, **extra)
+        content = b''.join(response.streaming_content).decode()
+        return response, content
+
+    def test_atom(self):
+        """Atom: последние посты и ссылка на следующую страницу."""
+        for url in self.FEEDS['atom']:
+            with self.subTest(url=url):
+                response, content = self.get(url)
+                self.assertTrue(response.streaming)
+                self.assertEqual(
+                    response['Content-Type'],
+                    'application/atom+xml; charset=utf-8',
+                )
+                root = ElementTree.fromstring(content)
+                self.assertEqual(
+                    [
+                        entry.find(f'{ATOM}content').text
+                        for entry in root.iter(f'{ATOM}entry')
+                    ],
+                    ['Тестовый пост 2', 'Тестовый пост 1'],
+                )
+                self.assertIsNotNone(
+                    root.find(f"{ATOM}link[@rel='next']")
+                )
+
+    def test_rss_next_page(self):
+        """RSS: по ссылке next отдаются оставшиеся посты."""
+        url = self.FEEDS['rss'][0]
+        _, content = self.get(url)
+        channel = ElementTree.fromstring(content).find('channel')
+        next_url = channel.find(f"{ATOM}link[@rel='next']").get('href')
+        _, content = self.get(next_url)
+        channel = ElementTree.fromstring(content).find('channel')
+        self.assertEqual(
+            [item.find('description').text for item in channel.iter('item')],
+            ['Тестовый пост 0'],
+        )
+        self.assertIsNone(channel.find(f"{ATOM}link[@rel='next']"))
+
+    def test_json(self):
+        """JSON Feed: корректный JSON с автором и группой поста."""
+        for url in self.FEEDS['json']:
+            with self.subTest(url=url):
+                _, content = self.get(url)
+                feed = json.loads(content)
+                self.assertEqual(len(feed['items']), 2)
+                item = feed['items'][0]
+                self.assertEqual(item['content_text'], 'Тестовый пост 2')
+                self.assertEqual(item['tags'], [self.group.title])
+                self.assertEqual(item['authors'][0]['name'], USERNAME)
+                self.assertIn('next_url', feed)
+
+    def test_conditional_get(self):
+        """Неизменившаяся лента отдаётся ответом 304 и кэшируется."""
+        url = self.FEEDS['atom'][1]
+        response, _ = self.get(url)
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('max-age', response['Cache-Control'])
+        repeated = self.guest_client.get(
+            url,
+            HTTP_IF_NONE_MATCH=response['ETag'],
+        )
+        self.assertEqual(repeated.status_code, 304)
+        Post.objects.create(author=self.user, group=self.group, text='Ещё')
+        repeated = self.guest_client.get(
+            url,
+            HTTP_IF_NONE_MATCH=response['ETag'],
+        )
+        self.assertEqual(repeated.status_code, 200)
+
+    def test_not_found(self):
+        """Неизвестный формат и несуществующая группа дают 404."""
+        urls = (
+            reverse('posts:feed', args=['html']),
+            reverse('posts:group_feed', args=['missing', 'atom']),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.guest_client.get(url).status_code, 404)
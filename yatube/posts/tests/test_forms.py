@@ -7,7 +7,9 @@ from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 
+from ..images import ingest
 from ..models import Comment, Group, Post, User
+from ..storage import content_name
 
 USERNAME = 'NoName'
 ANOTHER_USERNAME = 'NoName2'
@@ -35,6 +37,12 @@ uploaded = SimpleUploadedFile(
 TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
 
 
+def stored_name(uploaded):
+    """Имя файла в хранилище: хэш пересжатого изображения."""
+    image = ingest(uploaded)
+    return content_name(IMAGE_FOLDER + image.name, image)
+
+
 @override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
 class PostViewsTest(TestCase):
     @classmethod
@@ -101,7 +109,7 @@ class PostViewsTest(TestCase):
         self.assertRedirects(response, PROFILE_URL)
         self.assertEqual(
             post.image,
-            IMAGE_FOLDER + str(form_data['image']),
+            stored_name(form_data['image']),
         )
 
     def test_guest_client_not_create_post(self):
@@ -153,7 +161,7 @@ class PostViewsTest(TestCase):
         self.assertEqual(post.text, form_data['text'])
         self.assertEqual(
             post.image,
-            IMAGE_FOLDER + str(form_data['image']),
+            stored_name(form_data['image']),
         )
 
     def test_guest_or_another_not_edit_post(self):
@@ -0,0 +1,100 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from .. import graph
+from ..models import FeedEntry, Follow, Post, User
+
+READER_USERNAME = 'Reader'
+AUTHOR_USERNAMES = ['Author0', 'Author1', 'Author2']
+PROFILE_URL = reverse('posts:profile', args=[AUTHOR_USERNAMES[0]])
+
+
+class FollowGraphTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username=READER_USERNAME)
+        cls.authors = [
+            User.objects.create_user(username=username)
+            for username in AUTHOR_USERNAMES
+        ]
+        cls.author_ids = [author.pk for author in cls.authors]
+
+    def setUp(self):
+        cache.clear()
+
+    def test_bulk_follow(self):
+        """Пакетная подписка пропускает себя и уже существующие подписки."""
+        Follow.objects.create(user=self.reader, author=self.authors[0])
+        post = Post.objects.create(author=self.authors[1], text='Пост')
+        created = graph.follow(
+            self.reader.pk,
+            self.author_ids + [self.reader.pk],
+        )
+        self.assertEqual(created, self.author_ids[1:])
+        self.assertEqual(
+            Follow.objects.filter(user=self.reader).count(),
+            len(self.authors),
+        )
+        self.assertEqual(graph.following(self.reader.pk), set(self.author_ids))
+        self.assertTrue(
+            FeedEntry.objects.filter(user=self.reader, post=post).exists()
+        )
+        self.assertEqual(graph.follow(self.reader.pk, self.author_ids), [])
+
+    def test_bulk_unfollow(self):
+        """Пакетная отписка возвращает число удалённых подписок."""
+        graph.follow(self.reader.pk, self.author_ids)
+        self.assertEqual(
+            graph.unfollow(self.reader.pk, self.author_ids[:2]),
+            2,
+        )
+        self.assertEqual(
+            graph.following(self.reader.pk),
+            {self.author_ids[2]},
+        )
+        self.assertEqual(graph.followers(self.author_ids[0]), set())
+        self.assertEqual(
+            graph.unfollow(self.reader.pk, self.author_ids[:1]),
+            0,
+        )
+
+    def test_lookups_from_cache(self):
+        """Повторные проверки подписки не обращаются к базе данных."""
+        Follow.objects.create(user=self.reader, author=self.authors[0])
+        self.assertTrue(graph.is_following(self.reader.pk, self.author_ids[0]))
+        with self.assertNumQueries(0):
+            self.assertTrue(
+                graph.is_following(self.reader.pk, self.author_ids[0])
+            )
+            self.assertFalse(
+                graph.is_following(self.reader.pk, self.author_ids[1])
+            )
+        self.assertEqual(graph.followers(self.author_ids[0]), {self.reader.pk})
+
+    def test_signals_invalidate(self):
+        """Подписка и отписка через модель сбрасывают кэш графа."""
+        self.assertEqual(graph.followers(self.author_ids[0]), set())
+        follow = Follow.objects.create(
+            user=self.reader,
+            author=self.authors[0],
+        )
+        self.assertEqual(graph.followers(self.author_ids[0]), {self.reader.pk})
+        follow.delete()
+        self.assertEqual(graph.following(self.reader.pk), set())
+
+    def test_profile_counts(self):
+        """Профиль показывает подписчиков и подписки из графа."""
+        graph.follow(self.reader.pk, self.author_ids)
+        graph.follow(self.author_ids[0], [self.author_ids[1]])
+        content = Client().get(PROFILE_URL).content.decode()
+        self.assertIn('Подписчиков: 1', content)
+        self.assertIn('подписок: 1', content)
+        self.assertIsNone(
+            cache.get(graph.FOLLOWERS_KEY.format(self.author_ids[0]))
+        )
+        with self.assertNumQueries(0):
+            self.assertEqual(graph.followers_count(self.author_ids[0]), 1)
+        graph.unfollow(self.reader.pk, [self.author_ids[0]])
+        self.assertEqual(graph.followers_count(self.author_ids[0]), 0)
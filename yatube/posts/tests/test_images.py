@@ -0,0 +1,58 @@
+import io
+
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, override_settings
+from PIL import Image
+
+from ..images import ingest
+
+ORIENTATION = 0x0112
+ROTATED_270 = 6
+
+
+def upload(name, image, fmt, **options):
+    buffer = io.BytesIO()
+    image.save(buffer, fmt, **options)
+    return SimpleUploadedFile(name, buffer.getvalue())
+
+
+@override_settings(IMAGE_MAX_SIDE=100, IMAGE_MAX_PIXELS=10 ** 6)
+class IngestTest(SimpleTestCase):
+    """Приём изображений: размер, формат и метаданные."""
+
+    def test_photo_resized_and_stripped(self):
+        """Снимок уменьшается, поворачивается по EXIF и теряет EXIF."""
+        exif = Image.Exif()
+        exif[ORIENTATION] = ROTATED_270
+        photo = upload(
+            'camera.JPG',
+            Image.new('RGB', (400, 200), 'red'),
+            'JPEG',
+            exif=exif.tobytes(),
+        )
+        result = ingest(photo)
+        self.assertEqual(result.name, 'camera.jpg')
+        image = Image.open(result)
+        self.assertEqual(image.format, 'JPEG')
+        self.assertEqual(image.size, (50, 100))
+        self.assertNotIn('exif', image.info)
+
+    def test_transparent_image_kept_as_png(self):
+        """Изображение с прозрачностью сохраняется в PNG."""
+        result = ingest(upload(
+            'logo.gif',
+            Image.new('RGBA', (20, 10), (0, 0, 0, 0)),
+            'PNG',
+        ))
+        self.assertEqual(result.name, 'logo.png')
+        self.assertEqual(Image.open(result).mode, 'RGBA')
+
+    def test_limits(self):
+        """Слишком большие файлы и изображения не принимаются."""
+        image = upload('big.png', Image.new('L', (2000, 1000)), 'PNG')
+        with self.assertRaises(ValidationError):
+            ingest(image)
+        with override_settings(IMAGE_MAX_UPLOAD_SIZE=10):
+            with self.assertRaises(ValidationError):
+                ingest(upload('small.png', Image.new('L', (5, 5)), 'PNG'))
@@ -0,0 +1,84 @@
+import re
+
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post, User
+
+USERNAME = 'NoName'
+FOLLOWER_USERNAME = 'NoName2'
+GROUP_SLUG = 'test-slug'
+INDEX_URL = reverse('posts:index')
+GROUP_URL = reverse('posts:group_list', args=[GROUP_SLUG])
+PROFILE_URL = reverse('posts:profile', args=[USERNAME])
+FOLLOW_INDEX_URL = reverse('posts:follow_index')
+FULL_SCAN = re.compile(r'\bSCAN (TABLE )?posts_\w+$')
+TEMP_SORT = 'USE TEMP B-TREE'
+
+
+class QueryPlanTest(TestCase):
+    """Горячие запросы страниц используют индексы без сортировки."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.follower = User.objects.create_user(username=FOLLOWER_USERNAME)
+        cls.follower_client = Client()
+        cls.follower_client.force_login(cls.follower)
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug=GROUP_SLUG,
+            description='Тестовое описание',
+        )
+        Follow.objects.create(user=cls.follower, author=cls.user)
+        cls.posts = [
+            Post.objects.create(
+                author=cls.user,
+                group=cls.group,
+                text=f'Пост {i}',
+            )
+            for i in range(15)
+        ]
+        Comment.objects.create(
+            post=cls.posts[0],
+            author=cls.follower,
+            text='Комментарий',
+        )
+        cls.POST_URL = reverse('posts:posts_detail', args=[cls.posts[0].pk])
+
+    def query_plans(self, url):
+        """Планы выполнения всех запросов к таблицам posts на странице."""
+        with CaptureQueriesContext(connection) as context:
+            response = self.follower_client.get(url)
+        self.assertEqual(response.status_code, 200)
+        page_obj = response.context.get('page_obj')
+        next_cursor = page_obj and page_obj.paginator.next_cursor
+        if next_cursor:
+            with CaptureQueriesContext(connection) as next_context:
+                self.follower_client.get(url, {'cursor': next_cursor})
+            context.captured_queries.extend(next_context.captured_queries)
+        with connection.cursor() as cursor:
+            for query in context.captured_queries:
+                sql = query['sql']
+                if not sql.startswith('SELECT') or 'posts_' not in sql:
+                    continue
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                yield sql, [row[-1] for row in cursor.fetchall()]
+
+    def test_views_use_indexes(self):
+        """Запросы страниц не сканируют таблицы и не сортируют в памяти."""
+        for url in (
+            INDEX_URL,
+            GROUP_URL,
+            PROFILE_URL,
+            FOLLOW_INDEX_URL,
+            self.POST_URL,
+        ):
+            for sql, plan in self.query_plans(url):
+                with self.subTest(url=url, sql=sql):
+                    for step in plan:
+                        self.assertNotIn(TEMP_SORT, step)
+                        self.assertIsNone(FULL_SCAN.search(step), step)
@@ -0,0 +1,120 @@
+import io
+import shutil
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.test import TestCase, TransactionTestCase, override_settings
+from PIL import Image
+
+from .. import media
+from ..models import MediaFile, Post, User
+from ..storage import ContentAddressedStorage, content_name
+
+
+def image_bytes(color):
+    buffer = io.BytesIO()
+    Image.new('RGB', (4, 4), color).save(buffer, 'JPEG')
+    return buffer.getvalue()
+
+
+CONTENT = image_bytes('red')
+OTHER_CONTENT = image_bytes('blue')
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ContentAddressedStorageTest(TestCase):
+    """Файлы хранятся под хэшем содержимого."""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def test_same_content_stored_once(self):
+        """Одинаковые файлы получают одно имя, разные — разные."""
+        storage = Post.image.field.storage
+        first = storage.save('posts/a.JPG', ContentFile(CONTENT))
+        second = storage.save('posts/b.jpg', ContentFile(CONTENT))
+        other = storage.save('posts/c.jpg', ContentFile(OTHER_CONTENT))
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+        self.assertEqual(
+            first,
+            content_name('posts/x.jpg', ContentFile(CONTENT)),
+        )
+        self.assertTrue(first.startswith('posts/') and first.endswith('.jpg'))
+        with storage.open(first) as file:
+            self.assertEqual(file.read(), CONTENT)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class MediaReferencesTest(TransactionTestCase):
+    """Файл удаляется, когда на него не осталось ссылок постов."""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='NoName')
+
+    def create_post(self, content=CONTENT):
+        return Post.objects.create(
+            author=self.user,
+            text='Пост',
+            image=ContentFile(content, name='meme.jpg'),
+        )
+
+    def test_shared_file_kept_while_used(self):
+        """Удаление одного из постов не удаляет общий файл."""
+        first, second = self.create_post(), self.create_post()
+        name = first.image.name
+        self.assertEqual(second.image.name, name)
+        self.assertEqual(MediaFile.objects.get(name=name).references, 2)
+        first.delete()
+        self.assertTrue(Post.image.field.storage.exists(name))
+        second.delete()
+        self.assertFalse(Post.image.field.storage.exists(name))
+        self.assertFalse(MediaFile.objects.filter(name=name).exists())
+
+    def test_replaced_image_released(self):
+        """Замена изображения при правке снимает ссылку на старое."""
+        post = self.create_post()
+        name = post.image.name
+        post.image = ContentFile(OTHER_CONTENT, name='new.jpg')
+        post.save()
+        self.assertFalse(Post.image.field.storage.exists(name))
+        self.assertEqual(
+            MediaFile.objects.get(name=post.image.name).references,
+            1,
+        )
+
+    def test_reference_counted_before_write(self):
+        """Ссылка на загружаемый файл учтена до его записи."""
+        name = content_name('posts/meme.jpg', ContentFile(CONTENT))
+        save = ContentAddressedStorage._save
+
+        def checked_save(storage, *args):
+            self.assertEqual(MediaFile.objects.get(name=name).references, 1)
+            return save(storage, *args)
+
+        with mock.patch.object(ContentAddressedStorage, '_save', checked_save):
+            post = self.create_post()
+        self.assertEqual(post.image.name, name)
+        self.assertEqual(MediaFile.objects.get(name=name).references, 1)
+        post.text = 'Правка'
+        post.save()
+        self.assertEqual(MediaFile.objects.get(name=name).references, 1)
+
+    def test_collect_keeps_referenced_file(self):
+        """collect не трогает файл, на который снова сослались."""
+        post = self.create_post()
+        name = post.image.name
+        media.collect(name)
+        self.assertTrue(Post.image.field.storage.exists(name))
+        self.assertTrue(MediaFile.objects.filter(name=name).exists())
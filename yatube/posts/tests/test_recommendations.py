@@ -0,0 +1,105 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from .. import graph, recommendations
+from ..models import (Comment, Follow, Post, Recommendation,
+                      StaleRecommendations, User)
+
+READER_USERNAME = 'Reader'
+NEIGHBOUR_USERNAME = 'Neighbour'
+AUTHOR_USERNAMES = ['Author0', 'Author1', 'Author2', 'Author3']
+FOLLOW_INDEX_URL = reverse('posts:follow_index')
+PROFILE_URL = reverse('posts:profile', args=[READER_USERNAME])
+
+
+@override_settings(RECOMMENDATIONS_SIZE=2)
+class RecommendationsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.reader = User.objects.create_user(username=READER_USERNAME)
+        cls.neighbour = User.objects.create_user(username=NEIGHBOUR_USERNAME)
+        cls.authors = [
+            User.objects.create_user(username=username)
+            for username in AUTHOR_USERNAMES
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def recommended(self, user):
+        return [
+            recommendation.author
+            for recommendation in recommendations.for_user(user.pk)
+        ]
+
+    def test_neighbours_follows(self):
+        """Рекомендуются авторы, которых читают похожие пользователи."""
+        graph.follow(
+            self.neighbour.pk,
+            [self.authors[0].pk, self.authors[1].pk],
+        )
+        graph.follow(self.reader.pk, [self.authors[0].pk])
+        post = Post.objects.create(author=self.authors[3], text='Пост')
+        Comment.objects.create(post=post, author=self.reader, text='Текст')
+        recommendations.refresh()
+        self.assertEqual(
+            self.recommended(self.reader),
+            [self.authors[3], self.authors[1]],
+        )
+        self.assertFalse(StaleRecommendations.objects.exists())
+
+    def test_incremental_refresh(self):
+        """Пересчитываются только изменившиеся пользователи и их соседи."""
+        graph.follow(self.neighbour.pk, [self.authors[0].pk])
+        graph.follow(self.reader.pk, [self.authors[0].pk])
+        recommendations.refresh()
+        graph.follow(self.neighbour.pk, [self.authors[1].pk])
+        self.assertEqual(self.recommended(self.reader), [])
+        self.assertEqual(recommendations.refresh(), 2)
+        self.assertEqual(self.recommended(self.reader), [self.authors[1]])
+        self.assertEqual(recommendations.refresh(), 0)
+
+    def test_incremental_refresh_reads_neighbourhood(self):
+        """Пересчёт очереди не читает интересы посторонних пользователей."""
+        graph.follow(self.neighbour.pk, [self.authors[0].pk])
+        graph.follow(self.authors[2].pk, [self.authors[3].pk])
+        StaleRecommendations.objects.all().delete()
+        graph.follow(self.reader.pk, [self.authors[0].pk])
+        with mock.patch.object(
+            recommendations,
+            'interests',
+            wraps=recommendations.interests,
+        ) as spy:
+            self.assertEqual(recommendations.refresh(), 2)
+        for call in spy.call_args_list:
+            self.assertLessEqual(
+                set(call.args[0]),
+                {self.reader.pk, self.neighbour.pk},
+            )
+
+    def test_follow_discards_recommendation(self):
+        """После подписки автор сразу пропадает из рекомендаций."""
+        graph.follow(self.neighbour.pk, [self.authors[0].pk])
+        call_command('refresh_recommendations', '--full', stdout=None)
+        self.assertEqual(self.recommended(self.reader), [self.authors[0]])
+        Follow.objects.create(user=self.reader, author=self.authors[0])
+        self.assertFalse(
+            Recommendation.objects.filter(user=self.reader).exists()
+        )
+
+    def test_pages_show_recommendations(self):
+        """Подписки и свой профиль показывают блок рекомендаций."""
+        graph.follow(self.neighbour.pk, [self.authors[0].pk])
+        recommendations.refresh(full=True)
+        for url in (FOLLOW_INDEX_URL, PROFILE_URL):
+            with self.subTest(url=url):
+                self.assertContains(
+                    self.reader_client.get(url),
+                    AUTHOR_USERNAMES[0],
+                )
@@ -11,9 +11,18 @@ ROUTES = [
     ('/', 'index', []),
     ('/create/', 'post_create', []),
     ('/follow/', 'follow_index', []),
+    ('/search/', 'search', []),
+    ('/feed/atom/', 'feed', ['atom']),
+    (f'/group/{GROUP_SLUG}/feed/rss/', 'group_feed', [GROUP_SLUG, 'rss']),
+    (
+        f'/profile/{USERNAME}/feed/json/',
+        'profile_feed',
+        [USERNAME, 'json'],
+    ),
     (f'/group/{GROUP_SLUG}/', 'group_list', [GROUP_SLUG]),
     (f'/profile/{USERNAME}/', 'profile', [USERNAME]),
     (f'/posts/{POST_ID}/', 'posts_detail', [POST_ID]),
+    (f'/posts/{POST_ID}/comments/', 'post_comments', [POST_ID]),
     (f'/posts/{POST_ID}/edit/', 'posts_edit', [POST_ID]),
     (f'/posts/{POST_ID}/comment/', 'add_comment', [POST_ID]),
     (f'/profile/{USERNAME}/follow/', 'profile_follow', [USERNAME]),
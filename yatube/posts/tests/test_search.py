@@ -0,0 +1,118 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Post, PostTerm
+from ..search import search, stem, tokenize
+
+User = get_user_model()
+
+USERNAME = 'NoName'
+SEARCH_URL = reverse('posts:search')
+ADMIN_URL = reverse('admin:posts_post_changelist')
+
+
+class StemmerTest(TestCase):
+    def test_word_forms_share_stem(self):
+        """Формы одного слова приводятся к одной основе."""
+        for forms in (
+            ('книга', 'книги', 'книгой', 'книгам'),
+            ('красивая', 'красивые', 'красивый'),
+            ('программирование', 'программированием'),
+            ('кот', 'коты', 'котов'),
+        ):
+            with self.subTest(forms=forms):
+                self.assertEqual(len({stem(form) for form in forms}), 1)
+
+    def test_tokenize_skips_stop_words(self):
+        """Служебные слова не попадают в индекс, ё заменяется на е."""
+        self.assertEqual(
+            list(tokenize('И вот ЁЛКИ на опушке')),
+            [stem('елки'), stem('опушке')],
+        )
+
+
+class SearchTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.guest_client = Client()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.admin = User.objects.create_superuser(
+            username='admin',
+            email='admin@example.com',
+            password='password',
+        )
+        cls.admin_client = Client()
+        cls.admin_client.force_login(cls.admin)
+
+    def setUp(self):
+        cache.clear()
+
+    def create_post(self, text):
+        return Post.objects.create(author=self.user, text=text)
+
+    def test_index_follows_edit_and_delete(self):
+        """Индекс обновляется при изменении и удалении поста."""
+        post = self.create_post('Кошки спят')
+        self.assertEqual(list(search('кошка')), [post])
+        post.text = 'Собаки спят'
+        post.save()
+        self.assertEqual(list(search('кошка')), [])
+        self.assertEqual(list(search('собака')), [post])
+        post.delete()
+        self.assertFalse(PostTerm.objects.exists())
+
+    def test_results_ranked_and_match_all_words(self):
+        """Найдены посты со всеми словами, более частые выше."""
+        once = self.create_post('Рецепт пирога с вишней')
+        twice = self.create_post('Пирог, пироги и ещё раз пирог с вишней')
+        self.create_post('Пирог с яблоками')
+        self.assertEqual(list(search('пироги вишня')), [twice, once])
+
+    def test_search_page_paginated_by_cursor(self):
+        """Страница поиска выводит результаты по курсору."""
+        posts = [self.create_post(f'Заметка про море {i}') for i in range(13)]
+        self.create_post('Заметка про горы')
+        response = self.guest_client.get(SEARCH_URL, {'q': 'море'})
+        page_obj = response.context['page_obj']
+        self.assertEqual(len(page_obj), 10)
+        self.assertContains(response, 'q=%D0%BC%D0%BE%D1%80%D0%B5&amp;cursor=')
+        response = self.guest_client.get(
+            SEARCH_URL,
+            {'q': 'море', 'cursor': page_obj.paginator.next_cursor},
+        )
+        found = list(page_obj) + list(response.context['page_obj'])
+        self.assertEqual(set(found), set(posts))
+
+    def test_new_posts_do_not_shift_pages(self):
+        """Новые посты не сдвигают релевантность между страницами."""
+        posts = [self.create_post(f'Заметка про море {i}') for i in range(13)]
+        response = self.guest_client.get(SEARCH_URL, {'q': 'море'})
+        page_obj = response.context['page_obj']
+        for i in range(20):
+            self.create_post(f'Заметка про горы {i}')
+        response = self.guest_client.get(
+            SEARCH_URL,
+            {'q': 'море', 'cursor': page_obj.paginator.next_cursor},
+        )
+        found = list(page_obj) + list(response.context['page_obj'])
+        self.assertEqual(sorted(post.pk for post in found),
+                         [post.pk for post in posts])
+
+    def test_search_page_without_results(self):
+        """Пустой запрос, служебные слова и слово без совпадений."""
+        self.create_post('Заметка про море')
+        for query in ('', 'и', '!!!', 'собака'):
+            with self.subTest(query=query):
+                response = self.guest_client.get(SEARCH_URL, {'q': query})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.context['page_obj']), 0)
+
+    def test_admin_search_uses_index(self):
+        """Поиск в админке находит посты по формам слова."""
+        post = self.create_post('Путешествие по горам')
+        self.create_post('Путешествие по морю')
+        response = self.admin_client.get(ADMIN_URL, {'q': 'гора'})
+        self.assertEqual(list(response.context['cl'].result_list), [post])
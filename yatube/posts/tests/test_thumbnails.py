@@ -0,0 +1,80 @@
+import shutil
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import transaction
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from .. import thumbnails
+from ..models import Post, User
+
+INDEX_URL = reverse('posts:index')
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, THUMBNAIL_WORKERS=1)
+class DeferredThumbnailTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.guest_client = Client()
+        cls.user = User.objects.create_user(username='NoName')
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Тестовый пост',
+            image=SimpleUploadedFile(
+                name='deferred.gif',
+                content=SMALL_GIF,
+                content_type='image/gif',
+            ),
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_original_served_until_thumbnail_ready(self):
+        """Пока миниатюры нет, отдаётся оригинал, а миниатюра в очереди."""
+        with mock.patch.object(thumbnails, 'schedule') as schedule:
+            response = self.guest_client.get(INDEX_URL)
+        schedule.assert_called_once_with(self.post.image.name)
+        self.assertContains(response, self.post.image.url)
+        thumbnails.generate(self.post.image.name)
+        with mock.patch.object(thumbnails, 'schedule') as schedule:
+            response = self.guest_client.get(INDEX_URL)
+        schedule.assert_not_called()
+        self.assertNotContains(response, self.post.image.url)
+        self.assertContains(response, f'{settings.MEDIA_URL}cache/')
+
+    def test_scheduled_only_for_new_image(self):
+        """Миниатюры ставятся в очередь, только если изображение сменилось."""
+        post = Post.objects.get(pk=self.post.pk)
+        on_commit = mock.patch.object(transaction, 'on_commit', lambda f: f())
+        with on_commit, mock.patch.object(thumbnails, 'schedule') as schedule:
+            post.text = 'Новый текст'
+            post.save()
+            schedule.assert_not_called()
+            post.image = SimpleUploadedFile(
+                name='other.gif',
+                content=SMALL_GIF + b'\x00',
+                content_type='image/gif',
+            )
+            post.save()
+        schedule.assert_called_once_with(post.image.name)
@@ -0,0 +1,172 @@
+import json
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .. import freshness
+from ..models import FeedEntry, Follow, Group, Post, PostTerm, User
+from ..search import search
+from ..storage import content_name
+from ..transfer import Importer
+
+USERNAME = 'NoName'
+READER_USERNAME = 'Reader'
+GROUP_SLUG = 'test-slug'
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class TransferTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.reader = User.objects.create_user(username=READER_USERNAME)
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug=GROUP_SLUG,
+            description='Тестовое описание',
+        )
+        Follow.objects.create(user=cls.reader, author=cls.user)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def create_posts(self):
+        posts = [
+            Post.objects.create(
+                author=self.user,
+                group=self.group if i % 2 else None,
+                text=f'Пост про море номер {i}',
+            )
+            for i in range(3)
+        ]
+        for i, post in enumerate(posts):
+            Post.objects.filter(pk=post.pk).update(
+                pub_date=timezone.now() - timedelta(days=10 * (i + 1)),
+            )
+        return list(Post.objects.order_by('pk').values_list(
+            'text', 'group_id', 'pub_date',
+        ))
+
+    def round_trip(self, fmt):
+        expected = self.create_posts()
+        out = StringIO()
+        call_command('export_posts', format=fmt, stdout=out, stderr=StringIO())
+        Post.objects.all().delete()
+        path = os.path.join(TEMP_MEDIA_ROOT, f'posts.{fmt}')
+        with open(path, 'w', encoding='utf-8', newline='') as file:
+            file.write(out.getvalue())
+        call_command('import_posts', path, batch_size=2, stdout=StringIO())
+        self.assertEqual(
+            list(Post.objects.order_by('pk').values_list(
+                'text', 'group_id', 'pub_date',
+            )),
+            expected,
+        )
+
+    def test_jsonl_round_trip_keeps_dates(self):
+        """Выгрузка и загрузка JSONL сохраняют посты и даты публикации."""
+        self.round_trip('jsonl')
+
+    def test_csv_round_trip_keeps_dates(self):
+        """Выгрузка и загрузка CSV сохраняют посты и даты публикации."""
+        self.round_trip('csv')
+
+    def test_import_updates_derived_data(self):
+        """Импорт обновляет счётчики, поисковый индекс и ленты."""
+        path = os.path.join(TEMP_MEDIA_ROOT, 'posts.jsonl')
+        with open(path, 'w', encoding='utf-8') as file:
+            for i in range(3):
+                file.write(json.dumps({
+                    'author': USERNAME,
+                    'text': f'Импортированный пост {i}',
+                }) + '\n')
+        call_command('import_posts', path, stdout=StringIO())
+        self.user.stats.refresh_from_db()
+        self.assertEqual(self.user.stats.posts_count, 3)
+        self.assertEqual(len(search('импортированный')), 3)
+        self.assertEqual(
+            FeedEntry.objects.filter(user=self.reader).count(),
+            3,
+        )
+
+    def test_posts_published_during_import(self):
+        """Посты, опубликованные на сайте во время импорта, не мешают."""
+        def rows():
+            for i in range(3):
+                yield i + 1, {
+                    'author': USERNAME,
+                    'text': f'Импортированный пост {i}',
+                }
+                Post.objects.create(author=self.user, text=f'Новый пост {i}')
+
+        importer = Importer(batch_size=1)
+        with mock.patch.object(freshness, 'touch_all') as touch_all:
+            self.assertEqual(importer.run(rows()), 3)
+        touch_all.assert_called_once_with()
+        self.assertEqual(
+            FeedEntry.objects.filter(user=self.reader).count(),
+            6,
+        )
+
+    def test_invalid_rows_skipped(self):
+        """Некорректные строки пропускаются с сообщением."""
+        path = os.path.join(TEMP_MEDIA_ROOT, 'posts.jsonl')
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(json.dumps({'author': USERNAME, 'text': 'Пост'}) + '\n')
+            file.write(json.dumps({'author': 'nobody', 'text': 'Пост'}) + '\n')
+            file.write('{не json\n')
+            file.write(json.dumps({
+                'author': USERNAME,
+                'group': 'nothing',
+                'text': 'Пост',
+            }) + '\n')
+        out = StringIO()
+        err = StringIO()
+        call_command('import_posts', path, stdout=out, stderr=err)
+        self.assertEqual(Post.objects.count(), 1)
+        self.assertIn('пропущено строк: 3', out.getvalue())
+        self.assertIn('Строка 2 пропущена', err.getvalue())
+
+    def test_images_copied_from_media_dir(self):
+        """Изображения копируются из каталога по пути из файла."""
+        source = tempfile.mkdtemp(dir=TEMP_MEDIA_ROOT)
+        os.makedirs(os.path.join(source, 'posts'))
+        with open(os.path.join(source, 'posts', 'small.gif'), 'wb') as file:
+            file.write(SMALL_GIF)
+        path = os.path.join(TEMP_MEDIA_ROOT, 'posts.jsonl')
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(json.dumps({
+                'author': USERNAME,
+                'text': 'Пост с картинкой',
+                'image': 'posts/small.gif',
+            }) + '\n')
+        call_command('import_posts', path, media_dir=source, stdout=StringIO())
+        post = Post.objects.get()
+        self.assertEqual(
+            post.image.name,
+            content_name('posts/small.gif', ContentFile(SMALL_GIF)),
+        )
+        self.assertTrue(post.image.storage.exists(post.image.name))
+        self.assertTrue(PostTerm.objects.filter(post=post).exists())
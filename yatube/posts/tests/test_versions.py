@@ -0,0 +1,94 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from .. import versions
+from ..models import Comment, Group, Post, User
+
+USERNAME = 'NoName'
+GROUP_SLUG = 'test-slug'
+INDEX_URL = reverse('posts:index')
+CARD_TEMPLATE = 'posts/includes/post_card.html'
+
+
+class VersionTest(TestCase):
+    """Версии и время изменения постов, комментариев и групп."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug=GROUP_SLUG,
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            group=cls.group,
+            text='Тестовый пост',
+        )
+
+    def test_save_bumps_version(self):
+        """Каждое сохранение увеличивает версию и время изменения."""
+        comment = Comment.objects.create(
+            post=self.post,
+            author=self.user,
+            text='Комментарий',
+        )
+        for obj in (self.post, self.group, comment):
+            with self.subTest(model=obj._meta.model_name):
+                obj.refresh_from_db()
+                version, updated_at = obj.version, obj.updated_at
+                obj.save()
+                obj.refresh_from_db()
+                self.assertEqual(obj.version, version + 1)
+                self.assertGreater(obj.updated_at, updated_at)
+
+    def test_update_fields_bump_version(self):
+        """Сохранение отдельных полей тоже записывает новую версию."""
+        self.post.refresh_from_db()
+        version = self.post.version
+        self.post.text = 'Новый текст'
+        self.post.save(update_fields=['text'])
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.version, version + 1)
+        self.assertEqual(self.post.text, 'Новый текст')
+
+    def test_concurrent_saves_get_distinct_versions(self):
+        """Сохранение устаревшего экземпляра не повторяет чужую версию."""
+        first = Post.objects.get(pk=self.post.pk)
+        second = Post.objects.get(pk=self.post.pk)
+        first.save()
+        second.save()
+        self.assertEqual(second.version, first.version + 1)
+        self.assertEqual(
+            Post.objects.get(pk=self.post.pk).version,
+            second.version,
+        )
+
+    def test_cache_key(self):
+        """Ключ меняется с версией объекта и различает пустую группу."""
+        key = versions.cache_key('card', self.post, self.group)
+        self.assertEqual(
+            versions.cache_key('card', self.post, self.group),
+            key,
+        )
+        self.assertNotEqual(versions.cache_key('card', self.post, None), key)
+        self.group.save()
+        self.assertNotEqual(
+            versions.cache_key('card', self.post, self.group),
+            key,
+        )
+
+    def test_edit_resets_card(self):
+        """Правка поста отрисовывает его карточку заново."""
+        cache.clear()
+        client = Client()
+        client.get(INDEX_URL)
+        with self.assertTemplateNotUsed(CARD_TEMPLATE):
+            client.get(INDEX_URL)
+        self.post.text = 'Исправленный текст'
+        self.post.save()
+        with self.assertTemplateUsed(CARD_TEMPLATE):
+            response = client.get(INDEX_URL)
+        self.assertContains(response, 'Исправленный текст')
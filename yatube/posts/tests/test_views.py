@@ -8,9 +8,10 @@ from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 
-from ..models import Follow, Group, Post, User
+from ..models import Comment, Follow, Group, Post, User
 
 POSTS_ON_PAGE_NUMB = 10
+COMMENTS_ON_PAGE_NUMB = 20
 
 USERNAME = 'NoName'
 ANOTHER_USERNAME = 'NoName2'
@@ -70,6 +71,7 @@ class PostViewsTest(TestCase):
         )
         cls.POST_URL = reverse('posts:posts_detail', args=[cls.post.id])
         cls.EDIT_POST_URL = reverse('posts:posts_edit', args=[cls.post.id])
+        cls.COMMENTS_URL = reverse('posts:post_comments', args=[cls.post.id])
 
     @classmethod
     def tearDownClass(cls):
@@ -169,22 +171,49 @@ class PostViewsTest(TestCase):
         self.context_post(response_context[0])
 
     def test_cache_index(self):
-        """Тест кэша главной страницы"""
-        cached_content = self.guest_client.get(INDEX_URL).content
-        Post.objects.all().delete()
-        response = self.guest_client.get(INDEX_URL)
-        self.assertEqual(cached_content, response.content)
+        """Тест кэша карточек постов на главной странице"""
         cache.clear()
+        self.guest_client.get(INDEX_URL)
+        Post.objects.filter(pk=self.post.pk).update(text='Новый текст')
+        response = self.guest_client.get(INDEX_URL)
+        self.assertContains(response, self.post.text)
+        self.assertNotContains(response, 'Новый текст')
+        Post.objects.get(pk=self.post.pk).save()
         response = self.guest_client.get(INDEX_URL)
-        self.assertNotEqual(cached_content, response.content)
+        self.assertContains(response, 'Новый текст')
+
+    def test_cache_cards_reset_by_group_and_author(self):
+        """Карточки сбрасываются при изменении группы и автора"""
+        cache.clear()
+        urls = [INDEX_URL, GROUP_URL, PROFILE_URL, FOLLOW_INDEX_URL]
+        Follow.objects.create(author=self.user, user=self.another_user)
+        for url in urls:
+            self.another_authorized_client.get(url)
+        group = Group.objects.get(pk=self.group.pk)
+        group.title = 'Новое название группы'
+        group.save()
+        author = User.objects.get(pk=self.user.pk)
+        author.first_name = 'Новое'
+        author.last_name = 'Имя'
+        author.save()
+        for url in (INDEX_URL, PROFILE_URL, FOLLOW_INDEX_URL):
+            with self.subTest(url=url):
+                response = self.another_authorized_client.get(url)
+                self.assertContains(response, 'Новое название группы')
+        for url in (INDEX_URL, GROUP_URL, FOLLOW_INDEX_URL):
+            with self.subTest(url=url):
+                response = self.another_authorized_client.get(url)
+                self.assertContains(response, 'Новое Имя')
+
+    def test_new_post_shown_without_delay(self):
+        """Новый пост сразу появляется на главной странице"""
+        self.guest_client.get(INDEX_URL)
+        Post.objects.create(author=self.user, text='Свежий пост')
+        self.assertContains(self.guest_client.get(INDEX_URL), 'Свежий пост')
 
     def test_paginator_on_pages(self):
         """Пагинация на страницах."""
         Post.objects.all().delete()
-        Follow.objects.create(
-            author=self.user,
-            user=self.another_user,
-        )
         Post.objects.bulk_create(
             Post(
                 author=self.user,
@@ -193,6 +222,10 @@ class PostViewsTest(TestCase):
             )
             for i in range(POSTS_ON_PAGE_NUMB + 1)
         )
+        Follow.objects.create(
+            author=self.user,
+            user=self.another_user,
+        )
         url_pages = {
             INDEX_URL: POSTS_ON_PAGE_NUMB,
             f'{INDEX_URL}?page=2': 1,
@@ -210,3 +243,97 @@ class PostViewsTest(TestCase):
                         url_page).context.get('page_obj')),
                     args,
                 )
+
+    def test_page_links_keep_get_parameters(self):
+        """Ссылки на страницы сохраняют остальные GET-параметры."""
+        Post.objects.bulk_create(
+            Post(author=self.user, text=f'Пост #{i}')
+            for i in range(POSTS_ON_PAGE_NUMB * 2)
+        )
+        response = self.guest_client.get(
+            INDEX_URL, {'sort': 'new', 'page': 2},
+        )
+        for page in (1, 3):
+            with self.subTest(page=page):
+                self.assertContains(
+                    response, f'href="?sort=new&amp;page={page}"',
+                )
+        cursor = self.guest_client.get(INDEX_URL, {'sort': 'new'})
+        self.assertContains(
+            cursor,
+            'href="?sort=new&amp;cursor='
+            f'{cursor.context["page_obj"].paginator.next_cursor}"',
+        )
+
+    def test_cursor_pagination_on_pages(self):
+        """Пагинация по курсору без пропусков и повторов."""
+        Post.objects.all().delete()
+        Post.objects.bulk_create(
+            Post(
+                author=self.user,
+                group=self.group,
+                text=f'Пост #{i}',
+            )
+            for i in range(POSTS_ON_PAGE_NUMB * 2 + 1)
+        )
+        Post.objects.update(pub_date=self.date)
+        expected = list(Post.objects.order_by('-pub_date', '-id'))
+        for url in (INDEX_URL, GROUP_URL, PROFILE_URL):
+            with self.subTest(url=url):
+                first_page = self.guest_client.get(url).context['page_obj']
+                self.assertFalse(first_page.has_previous())
+                pages = [first_page]
+                while pages[-1].has_next():
+                    pages.append(self.guest_client.get(
+                        url, {'cursor': pages[-1].paginator.next_cursor},
+                    ).context['page_obj'])
+                self.assertEqual(
+                    [post for page in pages for post in page],
+                    expected,
+                )
+                self.assertEqual(len(pages[-1]), 1)
+                previous = self.guest_client.get(
+                    url, {'cursor': pages[-1].paginator.previous_cursor},
+                ).context['page_obj']
+                self.assertEqual(list(previous), list(pages[-2]))
+                self.assertTrue(previous.has_next())
+
+    def test_invalid_cursor_returns_first_page(self):
+        """Испорченный курсор ведёт на первую страницу."""
+        response = self.guest_client.get(INDEX_URL, {'cursor': 'broken!'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(self.post, response.context['page_obj'])
+
+    def test_comments_paginated(self):
+        """Комментарии поста выдаются страницами по курсору."""
+        Comment.objects.bulk_create(
+            Comment(
+                post=self.post,
+                author=self.another_user,
+                text=f'Комментарий #{i}',
+            )
+            for i in range(COMMENTS_ON_PAGE_NUMB * 2 + 1)
+        )
+        expected = list(
+            self.post.comments.order_by('-created', '-id')
+            .values_list('id', flat=True)
+        )
+        response = self.guest_client.get(self.POST_URL)
+        comments = response.context['comments']
+        self.assertEqual(len(comments), COMMENTS_ON_PAGE_NUMB)
+        self.assertContains(response, 'Показать ещё комментарии')
+        received = [comment.pk for comment in comments]
+        url = (
+            f'{self.COMMENTS_URL}?cursor={comments.paginator.next_cursor}'
+        )
+        while url:
+            data = self.guest_client.get(url).json()
+            received += [comment['id'] for comment in data['comments']]
+            url = data['next']
+        self.assertEqual(received, expected)
+        self.assertEqual(data['comments'][-1]['author'], ANOTHER_USERNAME)
+
+    def test_comments_json_for_missing_post(self):
+        """Комментарии несуществующего поста возвращают 404."""
+        url = reverse('posts:post_comments', args=[self.post.pk + 100])
+        self.assertEqual(self.guest_client.get(url).status_code, 404)
@@ -0,0 +1,142 @@
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+from sorl.thumbnail import default
+from sorl.thumbnail.base import ThumbnailBackend
+from sorl.thumbnail.conf import defaults as thumbnail_defaults
+from sorl.thumbnail.conf import settings as thumbnail_settings
+from sorl.thumbnail.images import ImageFile
+from sorl.thumbnail.kvstores.base import KVStoreBase
+
+logger = logging.getLogger(__name__)
+
+# Размеры, которые используют шаблоны постов.
+PRESETS = (
+    ('960x339', {'crop': 'center', 'upscale': True}),
+)
+
+_executor = None
+_pending = set()
+_lock = threading.Lock()
+
+
+def _init_worker():
+    import django
+    django.setup()
+
+
+def _get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.THUMBNAIL_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+            )
+        return _executor
+
+
+def generate(name):
+    """Создаёт миниатюры изображения и сбрасывает карточки его постов."""
+    from . import freshness
+    from .models import Post
+
+    backend = ThumbnailBackend()
+    # Ключ миниатюры sorl включает хранилище исходника: оно должно
+    # совпадать с хранилищем поля, из которого читают шаблоны.
+    source = ImageFile(name, Post.image.field.storage)
+    for geometry, options in PRESETS:
+        backend.get_thumbnail(source, geometry, **options)
+    posts = Post.objects.filter(image=name)
+    # Версия поста входит в ключ карточки: её увеличение сбрасывает
+    # карточку, не вызывая сигналы сохранения поста.
+    posts.update(version=F('version') + 1, updated_at=timezone.now())
+    for post in posts.select_related('author', 'group'):
+        freshness.touch_post(post)
+
+
+def _done(name, future):
+    with _lock:
+        _pending.discard(name)
+    if future.exception() is not None:
+        logger.error(
+            'Не удалось создать миниатюры для %s',
+            name,
+            exc_info=future.exception(),
+        )
+
+
+def schedule(name):
+    """Ставит изображение в очередь на создание миниатюр.
+
+    При THUMBNAIL_WORKERS = 0 миниатюры создаются сразу в текущем процессе.
+    """
+    if not name:
+        return
+    if not settings.THUMBNAIL_WORKERS:
+        generate(name)
+        return
+    with _lock:
+        if name in _pending:
+            return
+        _pending.add(name)
+    future = _get_executor().submit(generate, name)
+    future.add_done_callback(lambda future: _done(name, future))
+
+
+class CacheKVStore(KVStoreBase):
+    """Хранилище ключей sorl в кэше Django, без таблицы в БД.
+
+    Стандартное хранилище при промахе кэша читает ключ из БД отдельным
+    запросом на каждое изображение страницы. Ключ, вытесненный из кэша,
+    восстанавливается при следующем показе: sorl находит готовую
+    миниатюру в хранилище файлов и не создаёт её заново.
+    """
+
+    def _get_raw(self, key):
+        return cache.get(key)
+
+    def _set_raw(self, key, value):
+        cache.set(key, value, None)
+
+    def _delete_raw(self, *keys):
+        cache.delete_many(keys)
+
+    def _find_keys_raw(self, prefix):
+        if not hasattr(cache, 'keys'):
+            raise NotImplementedError('Кэш не перечисляет ключи')
+        return cache.keys(prefix)
+
+
+class DeferredThumbnailBackend(ThumbnailBackend):
+    """Не создаёт миниатюры во время запроса.
+
+    Готовая миниатюра берётся из хранилища ключей sorl, а пока её нет,
+    отдаётся оригинал изображения и миниатюра ставится в очередь.
+    """
+
+    def get_thumbnail(self, file_, geometry_string, **options):
+        if not settings.THUMBNAIL_WORKERS or not file_:
+            return super().get_thumbnail(file_, geometry_string, **options)
+        source = ImageFile(file_)
+        if thumbnail_settings.THUMBNAIL_PRESERVE_FORMAT:
+            options.setdefault('format', self._get_format(source))
+        for key, value in self.default_options.items():
+            options.setdefault(key, value)
+        for key, attr in self.extra_options:
+            value = getattr(thumbnail_settings, attr)
+            if value != getattr(thumbnail_defaults, attr):
+                options.setdefault(key, value)
+        name = self._get_thumbnail_filename(source, geometry_string, options)
+        cached = default.kvstore.get(ImageFile(name, default.storage))
+        if cached:
+            return cached
+        schedule(source.name)
+        return source
@@ -0,0 +1,212 @@
+import csv
+import json
+import os
+from collections import Counter
+
+from django.core.files import File
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import counters, feed, freshness, media, search
+from .models import Group, Post, User
+
+FIELDS = ('author', 'group', 'text', 'pub_date', 'image')
+JSONL = 'jsonl'
+CSV = 'csv'
+FORMATS = (JSONL, CSV)
+BATCH_SIZE = 1000
+
+
+class RowError(ValueError):
+    """Строку импорта нельзя превратить в пост."""
+
+
+def detect_format(path, default=JSONL):
+    """Формат файла по расширению."""
+    extension = os.path.splitext(path or '')[1].lstrip('.').lower()
+    return extension if extension in FORMATS else default
+
+
+def export_rows(posts=None, batch_size=BATCH_SIZE):
+    """Посты в виде словарей FIELDS; читаются из базы частями."""
+    if posts is None:
+        posts = Post.objects.all()
+    rows = posts.order_by('pk').values_list(
+        'author__username',
+        'group__slug',
+        'text',
+        'pub_date',
+        'image',
+    )
+    for author, group, text, pub_date, image in rows.iterator(
+        chunk_size=batch_size,
+    ):
+        yield {
+            'author': author,
+            'group': group or '',
+            'text': text,
+            'pub_date': pub_date.isoformat(),
+            'image': image or '',
+        }
+
+
+def write_rows(rows, stream, fmt):
+    """Записывает строки в поток построчно. Возвращает их число."""
+    written = 0
+    if fmt == CSV:
+        writer = csv.DictWriter(stream, FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            written += 1
+        return written
+    for row in rows:
+        stream.write(json.dumps(row, ensure_ascii=False) + '\n')
+        written += 1
+    return written
+
+
+def read_rows(stream, fmt):
+    """Строки файла импорта по одной: (номер строки, словарь)."""
+    if fmt == CSV:
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as error:
+            yield number, RowError(f'некорректный JSON: {error}')
+            continue
+        if not isinstance(row, dict):
+            yield number, RowError('ожидался объект JSON')
+            continue
+        yield number, row
+
+
+def set_dates(model, field, dates, batch_size=BATCH_SIZE):
+    """Записывает в поле auto_now_add даты (pk, дата) после bulk_create.
+
+    bulk_create ставит во все поля auto_now_add текущее время; даты
+    переносятся отдельным bulk_update, не меняя описание поля модели.
+    """
+    model.objects.bulk_update(
+        [model(pk=pk, **{field: value}) for pk, value in dates],
+        [field],
+        batch_size=batch_size,
+    )
+
+
+class Importer:
+    """Создаёт посты из строк пакетами через bulk_create.
+
+    Авторы и группы ищутся по username и slug в словарях, загруженных
+    одним запросом. Счётчики и поисковый индекс, которые обычно ведут
+    сигналы, обновляются после каждого пакета, ленты подписчиков и
+    отметки свежести страниц — один раз в конце импорта.
+    """
+
+    def __init__(
+        self,
+        batch_size=BATCH_SIZE,
+        media_dir=None,
+        on_error=None,
+    ):
+        self.batch_size = batch_size
+        self.media_dir = media_dir
+        self.on_error = on_error
+        self.authors = dict(User.objects.values_list('username', 'pk'))
+        self.groups = dict(Group.objects.values_list('slug', 'pk'))
+        self.first_mark = None
+        self.imported = 0
+        self.skipped = 0
+
+    def _pub_date(self, value):
+        if not value:
+            return timezone.now()
+        pub_date = parse_datetime(value)
+        if pub_date is None:
+            raise RowError(f'некорректная дата {value}')
+        if timezone.is_naive(pub_date):
+            pub_date = timezone.make_aware(pub_date)
+        return pub_date
+
+    def _image(self, name):
+        if not name or self.media_dir is None:
+            return name or ''
+        path = os.path.join(self.media_dir, name)
+        if not os.path.isfile(path):
+            raise RowError(f'нет файла изображения {path}')
+        storage = Post.image.field.storage
+        if storage.exists(name):
+            return name
+        with open(path, 'rb') as file:
+            return storage.save(name, File(file))
+
+    def build(self, row):
+        """Пост из строки импорта; RowError, если строка некорректна."""
+        if isinstance(row, RowError):
+            raise row
+        author_id = self.authors.get(row.get('author'))
+        if author_id is None:
+            raise RowError(f'нет автора {row.get("author")}')
+        group_id = None
+        if row.get('group'):
+            group_id = self.groups.get(row['group'])
+            if group_id is None:
+                raise RowError(f'нет группы {row["group"]}')
+        if not row.get('text'):
+            raise RowError('пустой текст')
+        return Post(
+            author_id=author_id,
+            group_id=group_id,
+            text=row['text'],
+            pub_date=self._pub_date(row.get('pub_date')),
+            image=self._image(row.get('image')),
+        )
+
+    def _flush(self, batch):
+        if not batch:
+            return
+        with transaction.atomic():
+            mark = Post.objects.aggregate(last=Max('pk'))['last'] or 0
+            if self.first_mark is None:
+                self.first_mark = mark
+            dates = [post.pub_date for post in batch]
+            Post.objects.bulk_create(batch)
+            created = (
+                Post.objects.filter(pk__gt=mark)
+                .order_by('pk').values_list('pk', flat=True)
+            )
+            set_dates(Post, 'pub_date', zip(created, dates))
+            authors = Counter(post.author_id for post in batch)
+            for author_id, count in authors.items():
+                counters.change_posts_count(author_id, count)
+            media.acquire(*[post.image.name for post in batch])
+            search.index_posts(Post.objects.filter(pk__gt=mark))
+        self.imported += len(batch)
+
+    def run(self, rows):
+        """Импортирует строки (номер, словарь). Возвращает число постов."""
+        batch = []
+        for number, row in rows:
+            try:
+                batch.append(self.build(row))
+            except RowError as error:
+                self.skipped += 1
+                if self.on_error is not None:
+                    self.on_error(number, error)
+                continue
+            if len(batch) >= self.batch_size:
+                self._flush(batch)
+                batch = []
+        self._flush(batch)
+        if self.imported:
+            feed.fan_out_since(self.first_mark)
+            freshness.touch_all()
+        return self.imported
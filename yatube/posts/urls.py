@@ -9,6 +9,23 @@ urlpatterns = [
     path('group/<slug:slug>/', views.group_posts, name='group_list'),
     path('profile/<str:username>/', views.profile, name='profile'),
     path('posts/<int:post_id>/', views.post_detail, name='posts_detail'),
+    path(
+        'posts/<int:post_id>/comments/',
+        views.post_comments,
+        name='post_comments',
+    ),
+    path('search/', views.post_search, name='search'),
+    path('feed/<str:fmt>/', views.index_feed, name='feed'),
+    path(
+        'group/<slug:slug>/feed/<str:fmt>/',
+        views.group_feed,
+        name='group_feed',
+    ),
+    path(
+        'profile/<str:username>/feed/<str:fmt>/',
+        views.profile_feed,
+        name='profile_feed',
+    ),
     path('create/', views.post_create, name='post_create'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='posts_edit'),
     path(
@@ -1,9 +1,165 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from functools import reduce
+from operator import and_, or_
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
 from django.core.paginator import Paginator
+from django.db.models import Q
+
+CURSOR_PARAM = 'cursor'
+PAGE_PARAM = 'page'
+POST_KEYS = ('-pub_date', '-id')
+FORWARD = 'n'
+BACKWARD = 'p'
+
+
+def encode_cursor(direction, values):
+    """Упаковка направления и значений ключа в непрозрачный курсор."""
+    raw = json.dumps(
+        [direction] + [
+            value.isoformat() if isinstance(value, (date, datetime))
+            else value
+            for value in values
+        ],
+        separators=(',', ':'),
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Распаковка курсора. Возвращает (направление, значения) или None."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError, binascii.Error):
+        return None
+    if (
+        not isinstance(data, list)
+        or len(data) < 2
+        or data[0] not in (FORWARD, BACKWARD)
+    ):
+        return None
+    return data[0], data[1:]
+
+
+class CursorPaginator(Paginator):
+    """Пагинатор по ключу (keyset): одинаковая стоимость любой страницы.
+
+    Записи упорядочиваются по полям keys (по умолчанию -pub_date, -id),
+    следующая страница выбирается условием WHERE по значениям ключа
+    последней записи, без OFFSET и без COUNT(*). Один экземпляр
+    обслуживает одну страницу: номер страницы и число страниц условные
+    и нужны только для методов has_next/has_previous обычной Page.
+    """
+    is_cursor = True
+
+    def __init__(self, object_list, per_page, keys=POST_KEYS, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.keys = tuple(keys)
+        self.cursor = None
+        self.next_cursor = None
+        self.previous_cursor = None
+        self._num_pages = 1
+
+    @property
+    def num_pages(self):
+        return self._num_pages
+
+    def _fields(self):
+        return [key.lstrip('-') for key in self.keys]
+
+    def _to_python(self, field_name, value):
+        try:
+            field = self.object_list.model._meta.get_field(field_name)
+        except FieldDoesNotExist:
+            return value
+        return field.to_python(value)
+
+    def cursor_for(self, direction, obj):
+        """Курсор, указывающий на запись obj в направлении direction.
+
+        obj — объект модели или словарь из queryset.values().
+        """
+        if isinstance(obj, dict):
+            values = [obj[field] for field in self._fields()]
+        else:
+            values = [getattr(obj, field) for field in self._fields()]
+        return encode_cursor(direction, values)
+
+    def _keyset_filter(self, values, reverse):
+        """Условие «строго после values» в порядке keys."""
+        conditions = []
+        fields = self._fields()
+        for index, key in enumerate(self.keys):
+            descending = key.startswith('-') != reverse
+            lookup = '{}__{}'.format(fields[index], 'lt' if descending
+                                     else 'gt')
+            equal = [Q(**{fields[i]: values[i]}) for i in range(index)]
+            conditions.append(
+                reduce(and_, equal + [Q(**{lookup: values[index]})])
+            )
+        return reduce(or_, conditions)
+
+    def _decode(self, cursor):
+        """Значения ключа из курсора; None для пустого или битого курсора."""
+        decoded = decode_cursor(cursor) if cursor else None
+        if decoded is None or len(decoded[1]) != len(self.keys):
+            return FORWARD, None
+        direction, values = decoded
+        try:
+            return direction, [
+                self._to_python(field, value)
+                for field, value in zip(self._fields(), values)
+            ]
+        except (ValidationError, TypeError, ValueError):
+            return FORWARD, None
+
+    def page_from_cursor(self, cursor=None):
+        """Возвращает страницу, начинающуюся после курсора cursor."""
+        direction, values = self._decode(cursor)
+        if values is None:
+            cursor = None
+        reverse = direction == BACKWARD
+        if reverse:
+            ordering = [
+                key[1:] if key.startswith('-') else '-' + key
+                for key in self.keys
+            ]
+        else:
+            ordering = list(self.keys)
+        queryset = self.object_list.order_by(*ordering)
+        if values is not None:
+            queryset = queryset.filter(self._keyset_filter(values, reverse))
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if reverse:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, values is not None
+        self.cursor = cursor
+        if rows and has_next:
+            self.next_cursor = self.cursor_for(FORWARD, rows[-1])
+        if rows and has_previous:
+            self.previous_cursor = self.cursor_for(BACKWARD, rows[0])
+        number = 2 if has_previous else 1
+        self._num_pages = number + 1 if has_next else number
+        return self._get_page(rows, number, self)
+
 
+def pagination(request, object_list, per_page, keys=POST_KEYS):
+    """Разбиение постов на страницы.
 
-def pagination(request, object_list, per_page):
-    """Разбиение постов на страницы."""
-    paginator = Paginator(object_list, per_page)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    return page_obj
+    По умолчанию страницы строятся по курсору (?cursor=), номер страницы
+    (?page=) поддерживается для обратной совместимости.
+    """
+    page_number = request.GET.get(PAGE_PARAM)
+    if page_number is not None and CURSOR_PARAM not in request.GET:
+        paginator = Paginator(object_list.order_by(*keys), per_page)
+        return paginator.get_page(page_number)
+    paginator = CursorPaginator(object_list, per_page, keys=keys)
+    return paginator.page_from_cursor(request.GET.get(CURSOR_PARAM))
@@ -0,0 +1,26 @@
+OBJECT_KEY = '{label}.{pk}.{version}'
+MISSING = '-'
+
+
+def object_key(obj):
+    """Часть ключа, меняющаяся при каждом сохранении объекта.
+
+    Объект VersionedModel даёт «модель.pk.версия», None — прочерк,
+    чтобы пост без группы не совпадал по ключу с постом в группе.
+    """
+    if obj is None:
+        return MISSING
+    return OBJECT_KEY.format(
+        label=obj._meta.model_name,
+        pk=obj.pk,
+        version=obj.version,
+    )
+
+
+def cache_key(prefix, *objects):
+    """Ключ кэша фрагмента, зависящего от объектов.
+
+    Сохранение любого из них меняет ключ, поэтому прежний фрагмент
+    больше не читается и вытесняется из кэша сам, без удаления по TTL.
+    """
+    return ':'.join([prefix] + [object_key(obj) for obj in objects])
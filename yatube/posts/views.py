@@ -1,16 +1,37 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
+from django.http import Http404, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
 
+from core.concurrent import gather
+
+from . import feed, feeds, freshness, graph, recommendations, search
 from .forms import CommentForm, PostForm
-from .models import Follow, Group, Post
-from .utils import pagination
+from .models import Comment, Group, Post
+from .utils import CURSOR_PARAM, CursorPaginator, pagination
 
 User = get_user_model()
 
 POSTS_PER_PAGE = 10
+COMMENTS_PER_PAGE = 20
+COMMENT_KEYS = ('-created', '-id')
+
 
+def _post_resources(post_id):
+    author = (
+        Post.objects.filter(pk=post_id)
+        .values_list('author__username', flat=True).first()
+    )
+    if author is None:
+        return None
+    return [
+        freshness.stamp_key(freshness.POST, post_id),
+        freshness.stamp_key(freshness.AUTHOR, author),
+    ]
 
+
+@freshness.conditional(lambda: [freshness.stamp_key(freshness.SITE)])
 def index(request):
     """Главная страница."""
     posts = Post.objects.select_related('author', 'group')
@@ -21,11 +42,20 @@ def index(request):
     return render(request, 'posts/index.html', context)
 
 
+@freshness.conditional(
+    lambda slug: [freshness.stamp_key(freshness.GROUP, slug)]
+)
 def group_posts(request, slug):
-    """Страница группы."""
-    group = get_object_or_404(Group, slug=slug)
-    posts = group.group_posts.select_related('group')
-    page_obj = pagination(request, posts, POSTS_PER_PAGE)
+    """Страница группы; группа и посты выбираются одновременно."""
+    group, page_obj = gather(
+        lambda: get_object_or_404(Group, slug=slug),
+        lambda: pagination(
+            request,
+            Post.objects.filter(group__slug=slug)
+            .select_related('author', 'group'),
+            POSTS_PER_PAGE,
+        ),
+    )
     context = {
         'group': group,
         'page_obj': page_obj,
@@ -33,36 +63,59 @@ def group_posts(request, slug):
     return render(request, 'posts/group_list.html', context)
 
 
+@freshness.conditional(
+    lambda username: [freshness.stamp_key(freshness.AUTHOR, username)]
+)
 def profile(request, username):
-    """Страница пользователя."""
-    author = get_object_or_404(User, username=username)
-    posts = author.user_posts.select_related('author')
-    page_obj = pagination(request, posts, POSTS_PER_PAGE)
+    """Страница пользователя.
+
+    Автор со счётчиками, посты, подписки читателя и его рекомендации
+    выбираются одновременно.
+    """
     user = request.user
-    following = (
-            request.user != author
-            and user.is_authenticated
-            and Follow.objects.filter(
-        user=request.user,
-        author=author,
-    ).exists()
+    is_own = user.is_authenticated and user.username == username
+    author, page_obj, followed, recommended = gather(
+        lambda: get_object_or_404(
+            User.objects.select_related('stats'),
+            username=username,
+        ),
+        lambda: pagination(
+            request,
+            Post.objects.filter(author__username=username)
+            .select_related('author', 'group'),
+            POSTS_PER_PAGE,
+        ),
+        lambda: graph.following(user.pk) if user.is_authenticated else (),
+        lambda: recommendations.for_user(user.pk) if is_own else [],
     )
     context = {
         'author': author,
         'page_obj': page_obj,
-        'following': following,
+        'following': not is_own and author.pk in followed,
+        'recommended': recommended,
     }
     return render(request, 'posts/profile.html', context)
 
 
+@freshness.conditional(_post_resources)
 def post_detail(request, post_id):
-    """Страница поста."""
-    post = get_object_or_404(Post, pk=post_id)
+    """Страница поста; пост и комментарии выбираются одновременно."""
+    post, comments = gather(
+        lambda: get_object_or_404(
+            Post.objects.select_related('author__stats', 'group'),
+            pk=post_id,
+        ),
+        lambda: pagination(
+            request,
+            Comment.objects.filter(post_id=post_id).select_related('author'),
+            COMMENTS_PER_PAGE,
+            COMMENT_KEYS,
+        ),
+    )
     form = CommentForm(
         request.POST or None,
         instance=post,
     )
-    comments = post.comments.select_related('author')
     context = {
         'post': post,
         'form': form,
@@ -71,6 +124,98 @@ def post_detail(request, post_id):
     return render(request, 'posts/post_detail.html', context)
 
 
+def post_comments(request, post_id):
+    """Следующая страница комментариев поста в формате JSON."""
+    get_object_or_404(Post.objects.only('pk'), pk=post_id)
+    paginator = CursorPaginator(
+        Comment.objects.filter(post_id=post_id).select_related('author'),
+        COMMENTS_PER_PAGE,
+        COMMENT_KEYS,
+    )
+    page = paginator.page_from_cursor(request.GET.get(CURSOR_PARAM))
+    next_url = None
+    if paginator.next_cursor:
+        next_url = '{}?{}={}'.format(
+            reverse('posts:post_comments', args=[post_id]),
+            CURSOR_PARAM,
+            paginator.next_cursor,
+        )
+    return JsonResponse(
+        {
+            'comments': [
+                {
+                    'id': comment.pk,
+                    'text': comment.text,
+                    'created': comment.created,
+                    'author': comment.author.username,
+                    'author_name': comment.author.get_full_name(),
+                    'author_url': reverse(
+                        'posts:profile',
+                        args=[comment.author.username],
+                    ),
+                }
+                for comment in page
+            ],
+            'next': next_url,
+        },
+        json_dumps_params={'ensure_ascii': False},
+    )
+
+
+def post_search(request):
+    """Страница поиска по постам."""
+    query = request.GET.get('q', '').strip()
+    posts = search.search(query).select_related('author', 'group')
+    page_obj = pagination(request, posts, POSTS_PER_PAGE, search.SEARCH_KEYS)
+    context = {
+        'query': query,
+        'page_obj': page_obj,
+    }
+    return render(request, 'posts/search.html', context)
+
+
+@feeds.feed_view(lambda fmt: [freshness.stamp_key(freshness.SITE)])
+def index_feed(request, fmt):
+    """Лента последних постов для агрегаторов."""
+    return feeds.stream(
+        request,
+        fmt,
+        'Последние обновления на сайте',
+        reverse('posts:index'),
+        Post.objects.all(),
+    )
+
+
+@feeds.feed_view(
+    lambda slug, fmt: [freshness.stamp_key(freshness.GROUP, slug)]
+)
+def group_feed(request, slug, fmt):
+    """Лента постов группы для агрегаторов."""
+    group = get_object_or_404(Group, slug=slug)
+    return feeds.stream(
+        request,
+        fmt,
+        f'Записи сообщества {group.title}',
+        reverse('posts:group_list', args=[slug]),
+        group.group_posts.all(),
+    )
+
+
+@feeds.feed_view(
+    lambda username, fmt: [freshness.stamp_key(freshness.AUTHOR, username)]
+)
+def profile_feed(request, username, fmt):
+    """Лента постов автора для агрегаторов."""
+    author = get_object_or_404(User, username=username)
+    return feeds.stream(
+        request,
+        fmt,
+        f'Записи пользователя {author.get_full_name() or username}',
+        reverse('posts:profile', args=[username]),
+        author.user_posts.all(),
+    )
+
+
 @login_required
 def post_create(request):
     """Страница создания поста."""
@@ -123,11 +268,20 @@ def add_comment(request, post_id):
 
 @login_required
 def follow_index(request):
-    """Страница подписок."""
-    posts = Post.objects.filter(author__following__user=request.user)
-    page_obj = pagination(request, posts, POSTS_PER_PAGE)
+    """Страница подписок; лента и рекомендации выбираются одновременно."""
+    page_obj, recommended = gather(
+        lambda: pagination(
+            request,
+            feed.timeline(request.user.pk),
+            POSTS_PER_PAGE,
+            feed.FEED_KEYS,
+        ),
+        lambda: recommendations.for_user(request.user.pk),
+    )
+    page_obj.object_list = [entry.post for entry in page_obj]
     context = {
         'page_obj': page_obj,
+        'recommended': recommended,
     }
     return render(request, 'posts/follow.html', context)
 
@@ -135,21 +289,15 @@ def follow_index(request):
 @login_required
 def profile_follow(request, username):
     """Подписка на автора."""
-    user = get_object_or_404(User, username=username)
-    if not Follow.objects.filter(
-            user=request.user,
-            author=user,
-    ).exists() and (request.user != user):
-        Follow.objects.create(user=request.user, author=user)
+    author = get_object_or_404(User, username=username)
+    graph.follow(request.user.pk, [author.pk])
     return redirect('posts:profile', username=username)
 
 
 @login_required
 def profile_unfollow(request, username):
     """Отписка от автора."""
-    get_object_or_404(
-        Follow,
-        author__username=username,
-        user=request.user,
-    ).delete()
+    author = get_object_or_404(User, username=username)
+    if not graph.unfollow(request.user.pk, [author.pk]):
+        raise Http404('Подписки на автора нет')
     return redirect('posts:profile', username=username)
@@ -31,9 +31,15 @@ ALLOWED_HOSTS = [
     'testserver',
 ]
 
+# Общий для всех воркеров кэш в файле SQLite: не требует внешних сервисов
+# и сбрасывается сразу во всех процессах сервера.
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'BACKEND': 'core.cache.SQLiteCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache', 'cache.sqlite3'),
+        'OPTIONS': {
+            'MAX_ENTRIES': 100000,
+        },
     }
 }
 
@@ -44,6 +50,7 @@ INSTALLED_APPS = [
     'core.apps.CoreConfig',
     'users.apps.UsersConfig',
     'posts.apps.PostsConfig',
+    'api.apps.ApiConfig',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -54,8 +61,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.RequestMetricsMiddleware',
+    'core.middleware.ReplicaPinMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'core.middleware.RateLimitMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -66,6 +76,28 @@ MIDDLEWARE = [
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Как core.views.media отдаёт файлы: 'sendfile' — FileResponse через
+# wsgi.file_wrapper сервера, 'x-accel' — заголовком X-Accel-Redirect
+# для nginx (location MEDIA_ACCEL_PREFIX с internal), 'x-sendfile' —
+# заголовком X-Sendfile для Apache. Файлы с хэшем в имени кэшируются
+# клиентами навсегда, остальные — на MEDIA_MAX_AGE секунд.
+MEDIA_SERVE_MODE = 'sendfile'
+MEDIA_ACCEL_PREFIX = '/protected-media/'
+MEDIA_MAX_AGE = 60 * 60
+
+# Загрузки всегда пишутся на диск блоками, а не читаются в память.
+FILE_UPLOAD_HANDLERS = [
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+
+# Изображения постов при загрузке уменьшаются до IMAGE_MAX_SIDE по
+# большей стороне и пересжимаются; больше IMAGE_MAX_UPLOAD_SIZE байт
+# или IMAGE_MAX_PIXELS пикселей не принимаются.
+IMAGE_MAX_UPLOAD_SIZE = 20 * 1024 * 1024
+IMAGE_MAX_PIXELS = 50 * 10 ** 6
+IMAGE_MAX_SIDE = 1920
+IMAGE_JPEG_QUALITY = 82
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
@@ -84,7 +116,7 @@ TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'core.template_backends.MeasuredDjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -108,9 +140,57 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
-    }
+    },
+    # Копия основной базы для чтения, обновляется командой sync_replica.
+    # Включается добавлением в REPLICA_DATABASES.
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'db_replica.sqlite3'),
+    },
+}
+
+# Профили подключения к базе. В production соединение живёт между
+# запросами, а SQLite работает в режиме WAL: читатели не ждут писателя,
+# fsync выполняется только при контрольных точках журнала.
+DB_PROFILES = {
+    'development': {
+        'CONN_MAX_AGE': 0,
+        'OPTIONS': {'timeout': 5},
+        'PRAGMAS': {
+            'journal_mode': 'DELETE',
+            'synchronous': 'FULL',
+        },
+    },
+    'production': {
+        'CONN_MAX_AGE': 600,
+        'OPTIONS': {'timeout': 20},
+        'PRAGMAS': {
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'mmap_size': 256 * 1024 * 1024,
+            'cache_size': -64 * 1024,
+        },
+    },
 }
 
+DB_PROFILE = 'development' if DEBUG else 'production'
+
+for database in DATABASES.values():
+    database.update(
+        CONN_MAX_AGE=DB_PROFILES[DB_PROFILE]['CONN_MAX_AGE'],
+        OPTIONS=dict(DB_PROFILES[DB_PROFILE]['OPTIONS']),
+        PRAGMAS=dict(DB_PROFILES[DB_PROFILE]['PRAGMAS']),
+    )
+
+DATABASE_ROUTERS = ['core.db_router.ReplicaRouter']
+
+# Псевдонимы реплик, из которых читают GET-запросы. Клиент, который
+# только что писал в базу, REPLICA_PIN_SECONDS читает из основной,
+# чтобы видеть свои изменения до того, как они дойдут до реплик.
+REPLICA_DATABASES = []
+
+REPLICA_PIN_SECONDS = 5
+
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
 
@@ -148,3 +228,111 @@ USE_TZ = True
 STATIC_URL = '/static/'
 
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
+
+# Лента подписок: посты авторов, у которых подписчиков больше
+# FEED_FANOUT_LIMIT, не раскладываются по лентам при публикации,
+# а подтягиваются при чтении.
+FEED_FANOUT_LIMIT = 1000
+
+FEED_BACKFILL_SIZE = 200
+
+# Сколько авторов рекомендовать пользователю. Рекомендации считает
+# команда refresh_recommendations, страницы только читают их.
+RECOMMENDATIONS_SIZE = 5
+
+# Миниатюры создаются в фоновых процессах и не задерживают запрос;
+# при THUMBNAIL_WORKERS = 0 они создаются сразу, как раньше.
+THUMBNAIL_BACKEND = 'posts.thumbnails.DeferredThumbnailBackend'
+
+THUMBNAIL_WORKERS = 0 if DEBUG else 2
+
+# Ключи готовых миниатюр хранятся только в кэше: страница с картинками
+# не делает запросов к БД за каждой миниатюрой.
+THUMBNAIL_KVSTORE = 'posts.thumbnails.CacheKVStore'
+
+# Страницы постов выполняют независимые чтения (автор или группа,
+# список постов, подписки, рекомендации) одновременно в пуле из
+# VIEW_LOOKUP_WORKERS потоков; при 0 — по очереди в потоке запроса.
+VIEW_LOOKUP_WORKERS = 0 if DEBUG else 4
+
+# Карточки постов сбрасываются по версии при изменении поста, группы
+# или автора; время жизни только ограничивает объём кэша.
+POST_CARD_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Ленты Atom, RSS и JSON: записей на странице и сколько секунд их могут
+# хранить общие кэши (прокси, CDN) без проверки.
+FEED_PAGE_SIZE = 50
+
+FEED_MAX_AGE = 60
+
+# Поиск: сколько секунд хранится число постов и частоты слов запроса,
+# по которым считается релевантность. Пока они в кэше, порядок
+# результатов между страницами не сдвигается от новых постов.
+SEARCH_STATISTICS_TIMEOUT = 60 * 10
+
+# JSON API: размер страницы по умолчанию и наибольший (?limit=), время
+# жизни ответов в кэше по представлениям. Изменения данных сбрасывают
+# ответы сразу через штампы свежести.
+API_PAGE_SIZE = 20
+
+API_MAX_PAGE_SIZE = 100
+
+API_CACHE_TIMEOUTS = {
+    'posts': 60,
+    'post': 60 * 5,
+    'comments': 60,
+    'groups': 60 * 60,
+    'group': 60 * 60,
+}
+
+# Допустимое число запросов к БД на страницу. Превышение пишется в лог,
+# а при QUERY_BUDGET_STRICT (в тестах) приводит к ошибке.
+QUERY_BUDGETS = {
+    'posts:index': 4,
+    'posts:group_list': 5,
+    'posts:profile': 9,
+    'posts:posts_detail': 6,
+    'posts:post_comments': 4,
+    'posts:follow_index': 8,
+    'posts:search': 6,
+    'posts:feed': 2,
+    'posts:group_feed': 3,
+    'posts:profile_feed': 3,
+    'api:posts': 1,
+    'api:post': 1,
+    'api:comments': 2,
+    'api:groups': 1,
+    'api:group': 1,
+    'api:follows': 3,
+}
+
+QUERY_BUDGET_STRICT = False
+
+# Сколько запросов к странице (по имени URL) клиент может сделать за
+# окно: '10/m' — 10 в минуту, '5/10m' — 5 за 10 минут (единицы s, m, h,
+# d). Сверх лимита core.middleware.RateLimitMiddleware отвечает 429.
+# Считаются POST и другие изменяющие запросы; GET — только у страниц из
+# RATE_LIMIT_ANY_METHOD, которые меняют данные по ссылке.
+RATE_LIMITS = {
+    'posts:post_create': '20/m',
+    'posts:add_comment': '20/m',
+    'posts:profile_follow': '30/m',
+    'posts:profile_unfollow': '30/m',
+    'users:signup': '20/h',
+    'users:login': '20/m',
+}
+
+RATE_LIMIT_ANY_METHOD = {
+    'posts:profile_follow',
+    'posts:profile_unfollow',
+}
+
+# Ключ request.META с адресом клиента, который ставит доверенный прокси,
+# например 'HTTP_X_REAL_IP' для nginx с proxy_set_header X-Real-IP
+# $remote_addr. None — сайт открыт напрямую, адрес берётся из
+# REMOTE_ADDR. За прокси без него лимиты анонимных клиентов общие.
+RATE_LIMIT_IP_HEADER = None
+
+# Сессии читаются из кэша, поэтому ограничение запросов узнаёт
+# пользователя без запроса к БД.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
@@ -0,0 +1,22 @@
+import atexit
+import os
+import shutil
+import tempfile
+
+from .settings import *  # noqa: F401,F403
+from .settings import CACHES
+
+# Тесты очищают кэш и пишут в него сессии и счётчики лимитов, поэтому
+# каждый прогон получает свой файл кэша вместо общего BASE_DIR/cache.
+CACHE_DIR = tempfile.mkdtemp(prefix='yatube-cache-')
+atexit.register(shutil.rmtree, CACHE_DIR, ignore_errors=True)
+
+CACHES = {
+    'default': {
+        **CACHES['default'],
+        'LOCATION': os.path.join(CACHE_DIR, 'cache.sqlite3'),
+    },
+}
+
+# Любая страница тестов сверх бюджета запросов из QUERY_BUDGETS — ошибка.
+QUERY_BUDGET_STRICT = True